@@ -9,11 +9,8 @@ from typing import Optional
 
 # Import custom modules from your project structure
 from auths.auth import AuthManager
-from core.data_fetcher import DataFetcher
-from core.visualization import Visualization
-from core.news_analyzer import NewsAnalyzer
-from core.predictor import Predictor
-from core.trading_engine import TradingEngine
+from core.lazy import LazyService
+from core.config import PREDICTION_MONTE_CARLO_SAMPLES
 from utils.session_utils import SessionManager
 from db.user_manager import UserManager
 from utils.formatting import Formatting
@@ -24,11 +21,13 @@ os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
 
 # Initialize Managers
 auth_manager = AuthManager()
-data_fetcher = DataFetcher()
-visualization = Visualization()
-news_analyzer = NewsAnalyzer()
-predictor = Predictor()
-trading_engine = TradingEngine()
+# Heavy subsystems (yfinance, plotting, NLTK, the model) are imported on first use,
+# so the login page renders without them.
+data_fetcher = LazyService("core.data_fetcher", "DataFetcher")
+visualization = LazyService("core.visualization", "Visualization")
+news_analyzer = LazyService("core.news_analyzer", "NewsAnalyzer")
+predictor = LazyService("core.predictor", "Predictor")
+trading_engine = LazyService("core.trading_engine", "TradingEngine")
 session_manager = SessionManager()
 user_db = UserManager()
 
@@ -78,6 +77,8 @@ def auth_sidebar_ui():
 
 def main_app_ui():
     currency_converter = CurrencyConverter()
+    # Load the model in the background while the user picks a ticker.
+    predictor.warm(lambda p: p.preload())
 
     st.sidebar.title(f"Welcome, {session_manager.get_current_user_email()}!")
     st.sidebar.write(f"Role: **{session_manager.get_current_user_role().capitalize()}**")
@@ -107,6 +108,9 @@ def main_app_ui():
             index=default_currency_index,
             key="currency_selector"
         )
+    # Off by default: the band samples the generator PREDICTION_MONTE_CARLO_SAMPLES times per forecast.
+    show_confidence_band = PREDICTION_MONTE_CARLO_SAMPLES > 1 and st.checkbox(
+        "Show prediction confidence band", value=False, key="confidence_band_checkbox")
 
 
     if st.button("Analyze Stock", use_container_width=True, key="analyze_button"):
@@ -142,9 +146,8 @@ def main_app_ui():
             st.metric(label=f"Current Close Price ({currency_symbol})", value=Formatting.format_currency(df_converted['Close'].iloc[-1], currency_symbol=currency_symbol))
 
         with st.spinner("Calculating technical indicators..."):
-            df['RSI'] = data_fetcher.calculate_rsi(df)
-            macd_df = data_fetcher.calculate_macd(df)
-            df = df.join(macd_df)
+            indicators_df = data_fetcher.get_indicators(ticker_symbol, df)
+            df = df.join(indicators_df)
 
         st.markdown("### Stock Charts")
         if session_manager.has_permission("view_charts_basic"):
@@ -192,16 +195,19 @@ def main_app_ui():
         predicted_prices_df = pd.DataFrame()
         if session_manager.has_permission("get_predictions"):
             with st.spinner("Predicting future prices..."):
-                predictor.load_model()
+                predictor.load_model(ticker_symbol)
                 if predictor.model:
-                    predicted_prices_df = predictor.predict_prices(df)
+                    predicted_prices_df = predictor.predict_prices(df, num_samples=PREDICTION_MONTE_CARLO_SAMPLES if show_confidence_band else 1)
                     if not predicted_prices_df.empty:
                         st.write(f"Predicted Open and Close prices for the next few trading days in {selected_currency}:")
                         if conversion_rate is not None:
-                            predicted_prices_df['Predicted Open'] *= conversion_rate
-                            predicted_prices_df['Predicted Close'] *= conversion_rate
+                            predicted_prices_df *= conversion_rate # includes the median and band columns
                         st.dataframe(predicted_prices_df.style.format(formatter=lambda x: f"{currency_symbol}{x:.2f}"), use_container_width=True)
-                        st.plotly_chart(visualization.plot_prediction_chart(df, predicted_prices_df['Predicted Close']), use_container_width=True)
+                        lower, upper = (f"Predicted Close P{round(q * 100):02d}" for q in (min(predictor.quantiles), max(predictor.quantiles)))
+                        st.plotly_chart(visualization.plot_prediction_chart(
+                            df, predicted_prices_df['Predicted Close'],
+                            lower_series=predicted_prices_df.get(lower), upper_series=predicted_prices_df.get(upper),
+                            median_series=predicted_prices_df.get('Predicted Close Median')), use_container_width=True)
                         user_db._log_activity(session_manager.get_current_user_email(), "prediction_success", f"Ticker: {ticker_symbol}")
                     else:
                         st.warning("Could not generate price prediction. Ensure model is trained and data is sufficient.")
@@ -215,7 +221,7 @@ def main_app_ui():
         current_volatility = 0.0
         if session_manager.has_permission("view_volatility"):
             with st.spinner("Calculating market volatility..."):
-                current_volatility = trading_engine.calculate_volatility(df['Close'])
+                current_volatility = df['Volatility'].iloc[-1] if 'Volatility' in df.columns and pd.notna(df['Volatility'].iloc[-1]) else 0.0
                 st.info(f"Current Annualized Volatility (last 20 days): **{Formatting.format_percentage(current_volatility)}**")
         else:
             st.info("Upgrade to Premium to view market volatility.")
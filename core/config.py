@@ -17,6 +17,36 @@ NEWS_API_KEY = os.getenv("NEWS_API_KEY")
 # Alpha Vantage or alternative stock price API key
 STOCK_API_KEY = os.getenv("STOCK_API_KEY")
 
+# Price cache: seconds a bar fetched during market hours is considered fresh
+PRICE_CACHE_INTRADAY_TTL = int(os.getenv("PRICE_CACHE_INTRADAY_TTL", 900))
+# Price cache: memory budget in bytes for price histories kept in-process across sessions
+PRICE_CACHE_MEMORY_BYTES = int(os.getenv("PRICE_CACHE_MEMORY_BYTES", 256 * 1024 * 1024))
+# Indicator cache: memory budget in bytes, and an optional directory for the on-disk tier
+INDICATOR_CACHE_MEMORY_BYTES = int(os.getenv("INDICATOR_CACHE_MEMORY_BYTES", 64 * 1024 * 1024))
+INDICATOR_CACHE_DIR = os.getenv("INDICATOR_CACHE_DIR") or None
+# Prediction cache: memory budget in bytes, and an optional directory for the on-disk tier
+PREDICTION_CACHE_MEMORY_BYTES = int(os.getenv("PREDICTION_CACHE_MEMORY_BYTES", 16 * 1024 * 1024))
+PREDICTION_CACHE_DIR = os.getenv("PREDICTION_CACHE_DIR") or None
+# Model pool: weight bytes of loaded models kept in-process, and the root of the per-ticker model registry
+MODEL_POOL_MAX_BYTES = int(os.getenv("MODEL_POOL_MAX_BYTES", 512 * 1024 * 1024))
+MODEL_REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR", "data/model")
+# Inference queue: coalesce concurrent predictions into batches, waiting at most this many milliseconds
+INFERENCE_MICRO_BATCHING = os.getenv("INFERENCE_MICRO_BATCHING", "1").lower() not in ("0", "false", "no")
+INFERENCE_BATCH_WAIT_MS = float(os.getenv("INFERENCE_BATCH_WAIT_MS", 5))
+# Inference workers: run models in this many separate processes (0 = in the app process), and their request timeout
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 0))
+INFERENCE_WORKER_TIMEOUT = float(os.getenv("INFERENCE_WORKER_TIMEOUT", 60))
+# Inference workers: models served by worker pools at once; the least recently used pool is shut down beyond this
+INFERENCE_WORKER_MAX_MODELS = int(os.getenv("INFERENCE_WORKER_MAX_MODELS", 4))
+# GAN sampling: base seed for deterministic noise per ticker and input window; "none" samples freshly each time
+PREDICTION_SAMPLING_SEED = None if os.getenv("PREDICTION_SAMPLING_SEED", "0").lower() == "none" else int(os.getenv("PREDICTION_SAMPLING_SEED", "0"))
+# Monte Carlo samples per forecast when the app's confidence band is switched on (1 removes the option)
+PREDICTION_MONTE_CARLO_SAMPLES = int(os.getenv("PREDICTION_MONTE_CARLO_SAMPLES", 256))
+# Training: memory-mapped cache of preprocessed datasets, shared by concurrent training runs (empty disables)
+DATASET_CACHE_DIR = os.getenv("DATASET_CACHE_DIR", "data/dataset_cache") or None
+# Serving: load a model's int8 file when its mean error vs. the float model (scaled units) is within this budget; 0 disables
+PREDICTION_QUANTIZED_MAX_ERROR = float(os.getenv("PREDICTION_QUANTIZED_MAX_ERROR", 0))
+
 # Set up logging
 def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
@@ -2,83 +2,304 @@
 
 import yfinance as yf
 import pandas as pd
-import ta # Technical Analysis library
+import numpy as np
 import os
+from typing import Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from core.price_store import PriceStore
+from core.market_calendar import MarketCalendar
+from core.single_flight import SingleFlight, KeyedLocks
+from core.frame_cache import FrameCache
+from core.indicators import IndicatorEngine, IndicatorState, IndicatorCache
+from core.config import PRICE_CACHE_INTRADAY_TTL, PRICE_CACHE_MEMORY_BYTES, INDICATOR_CACHE_MEMORY_BYTES, INDICATOR_CACHE_DIR
 
 class DataFetcher:
-    def __init__(self):
-        self.cache_dir = "data/ticker_cache"
+    cache_dir = "data/ticker_cache"
+    # Shared by every DataFetcher in the process (Streamlit creates one per script run).
+    _in_flight = SingleFlight()
+    _ticker_locks = KeyedLocks()
+    _memory_cache = FrameCache(PRICE_CACHE_MEMORY_BYTES)
+    _indicator_cache = IndicatorCache(INDICATOR_CACHE_MEMORY_BYTES, disk_dir=INDICATOR_CACHE_DIR)
+
+    def __init__(self, intraday_ttl: Optional[int] = None):
         os.makedirs(self.cache_dir, exist_ok=True)
+        self.store = PriceStore(self.cache_dir)
+        self.calendar = MarketCalendar()
+        # Seconds a bar fetched while the market is open stays fresh.
+        self.intraday_ttl = PRICE_CACHE_INTRADAY_TTL if intraday_ttl is None else intraday_ttl
+
+    def _is_fresh(self, df: pd.DataFrame, meta: dict) -> bool:
+        """Cached history is fresh if it holds the latest completed session (see MarketCalendar.is_fresh)."""
+        fetched_at = meta.get('fetched_at')
+        return self.calendar.is_fresh(df.index[-1], pd.Timestamp(fetched_at) if fetched_at else None, self.intraday_ttl)
+
+    @classmethod
+    def cache_stats(cls) -> dict:
+        """Hit/miss/eviction counters and memory usage of the process-wide price frame cache."""
+        return cls._memory_cache.stats()
+
+    @classmethod
+    def indicator_cache_stats(cls) -> dict:
+        """Hit/miss/eviction counters of the process-wide indicator result cache."""
+        return cls._indicator_cache.stats()
 
     def fetch_historical_data(self, ticker_symbol: str, period: str = "1y") -> pd.DataFrame:
         """
         Fetches historical stock data using yfinance.
-        Caches data locally to reduce API calls.
+        Caches one history per ticker locally and serves every period as a slice of it.
         'period' can be '1d', '5d', '1mo', '3mo', '6mo', '1y', '2y', '5y', '10y', 'ytd', 'max'.
         """
-        cache_path = os.path.join(self.cache_dir, f"{ticker_symbol}_{period}.csv")
-        
-        # Simple caching logic: load from cache if file exists
-        # For a more robust cache, you might check if the cached data is recent enough
-        if os.path.exists(cache_path):
-            try:
-                df = pd.read_csv(cache_path, index_col=0, parse_dates=True)
-                # Check if data is up-to-date (e.g., if last date in cache is yesterday or today)
-                # For simplicity, we just load if exists. Implement more complex logic if needed.
-                if not df.empty and df.index[-1].date() == pd.Timestamp.today().date():
-                     print(f"Loaded {ticker_symbol} for {period} from fresh cache.")
-                     return df
+        try:
+            return self._fetch_coalesced(ticker_symbol, period)
+        except Exception as e:
+            print(f"Error fetching data for {ticker_symbol}: {e}")
+            return pd.DataFrame()
+
+    def fetch_many(self, tickers: List[str], period: str = "1y",
+                   max_workers: int = 8) -> Tuple[Dict[str, pd.DataFrame], Dict[str, str]]:
+        """
+        Fetches several tickers concurrently through a bounded thread pool, populating the
+        same per-ticker cache as fetch_historical_data (fresh tickers never hit the network).
+        Returns (frames, failures): frames maps each ticker that produced data to its history,
+        failures maps every other ticker to the reason it failed.
+        """
+        tickers = list(dict.fromkeys(tickers))
+        frames, failures = {}, {}
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers) or 1))) as executor:
+            futures = {executor.submit(self._fetch_coalesced, ticker, period): ticker for ticker in tickers}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    df = future.result()
+                except Exception as e:
+                    failures[ticker] = str(e) or type(e).__name__
+                    continue
+                if df.empty:
+                    failures[ticker] = f"No data found for period {period}."
                 else:
-                    print(f"Cached data for {ticker_symbol} is stale or incomplete, re-fetching.")
-                    os.remove(cache_path) # Remove old cache to force re-download
-            except Exception as e:
-                print(f"Error loading {ticker_symbol} from cache: {e}. Re-fetching data.")
-                if os.path.exists(cache_path):
-                    os.remove(cache_path) # Remove corrupted cache file
+                    frames[ticker] = df
+
+        print(f"Fetched {len(frames)}/{len(tickers)} tickers for {period} ({len(failures)} failed).")
+        return {ticker: frames[ticker] for ticker in tickers if ticker in frames}, failures
+
+    def _fetch_coalesced(self, ticker_symbol: str, period: str) -> pd.DataFrame:
+        """
+        Concurrent requests for the same (ticker, period) share one in-flight fetch. Each caller
+        gets its own shallow copy: it may add indicator columns, while the shared price arrays
+        stay read-only.
+        """
+        df = self._in_flight.do((ticker_symbol, period), self._load_or_fetch, ticker_symbol, period).copy(deep=False)
+        df.attrs['ticker'] = ticker_symbol # Namespaces indicator cache entries
+        return df
+
+    def _load_or_fetch(self, ticker_symbol: str, period: str) -> pd.DataFrame:
+        """Serves 'period' from the price store, refreshing or downloading it as needed. Raises on network errors."""
+        # Different periods of one ticker share a store file, so its read-modify-write is serialized.
+        with self._ticker_locks.get(ticker_symbol):
+            return self._load_or_fetch_locked(ticker_symbol, period)
+
+    def _load_history(self, ticker_symbol: str) -> Optional[Tuple[pd.DataFrame, dict]]:
+        """Full stored history of a ticker, from memory if the file on disk hasn't changed since it was cached."""
+        version = self.store.version(ticker_symbol)
+        if version is None:
+            return None
+        cached = self._memory_cache.get(ticker_symbol, version)
+        if cached is not None:
+            return cached
+        cached = self.store.load(ticker_symbol)
+        if cached is None:
+            return None
+        df, meta = cached
+        return self._memory_cache.put(ticker_symbol, df, meta, version), meta
+
+    def _save_history(self, ticker_symbol: str, df: pd.DataFrame, period: str) -> pd.DataFrame:
+        """Writes a history to disk and replaces the in-memory copy. Returns the read-only cached view."""
+        meta = self.store.save(ticker_symbol, df, period)
+        return self._memory_cache.put(ticker_symbol, df, meta, self.store.version(ticker_symbol))
+
+    def _load_or_fetch_locked(self, ticker_symbol: str, period: str) -> pd.DataFrame:
+        cached = self._load_history(ticker_symbol)
+        stored_period = None
+        if cached is not None:
+            df, meta = cached
+            stored_period = meta.get('period')
+            if not df.empty and self.store.covers(meta, period):
+                if self._is_fresh(df, meta):
+                    print(f"Loaded {ticker_symbol} for {period} from fresh cache.")
+                    return PriceStore.slice_period(df, period)
+                return PriceStore.slice_period(self._refresh_incremental(ticker_symbol, df, meta), period)
+            print(f"Cached data for {ticker_symbol} is too short for {period}, re-fetching.")
+
+        # Always re-fetch the longest history we know of so the store never shrinks.
+        fetch_period = PriceStore.longer_period(period, stored_period)
+        ticker = yf.Ticker(ticker_symbol)
+        df = ticker.history(period=fetch_period)
+
+        if df.empty:
+            print(f"No data found for {ticker_symbol} using yfinance for period {period}.")
+            return pd.DataFrame()
 
+        # Save to cache
+        df = self._save_history(ticker_symbol, df, fetch_period)
+        print(f"Fetched and cached {ticker_symbol} data for {fetch_period}.")
+        return PriceStore.slice_period(df, period)
+
+    def _refresh_incremental(self, ticker_symbol: str, df: pd.DataFrame, meta: dict) -> pd.DataFrame:
+        """
+        Brings a stale stored history up to date by fetching only the bars from the last
+        cached session onward and merging them in. Falls back to the stale history on failure.
+        """
+        last_bar = df.index[-1]
         try:
-            ticker = yf.Ticker(ticker_symbol)
-            df = ticker.history(period=period)
-            
-            if not df.empty:
-                # Save to cache
-                df.to_csv(cache_path)
-                print(f"Fetched and cached {ticker_symbol} data for {period}.")
-                return df
-            else:
-                print(f"No data found for {ticker_symbol} using yfinance for period {period}.")
-                return pd.DataFrame()
+            new_bars = yf.Ticker(ticker_symbol).history(start=last_bar.strftime('%Y-%m-%d'))
         except Exception as e:
-            print(f"Error fetching data for {ticker_symbol}: {e}")
+            print(f"Error refreshing {ticker_symbol} from {last_bar.date()}: {e}. Serving stale cache.")
+            return df
+
+        if new_bars.empty:
+            # Record the check so the next read doesn't ask again before the TTL/next session.
+            print(f"No new bars for {ticker_symbol} since {last_bar.date()}.")
+            return self._save_history(ticker_symbol, df, meta['period'])
+
+        merged = self._save_history(ticker_symbol, PriceStore.merge_bars(df, new_bars), meta['period'])
+        print(f"Merged {len(new_bars)} bar(s) into cached {ticker_symbol} history.")
+        return merged
+
+    def calculate_indicators(self, df: pd.DataFrame, rsi_window: int = 14, window_slow: int = 26, window_fast: int = 12,
+                             window_sign: int = 9, bb_window: int = 20, window_dev: int = 2,
+                             volatility_window: int = 20) -> pd.DataFrame:
+        """Calculates RSI, MACD, Bollinger Bands and rolling volatility in one pass (see IndicatorEngine)."""
+        if 'Close' not in df.columns or df['Close'].empty:
+            print("Cannot calculate indicators: 'Close' column missing or empty.")
             return pd.DataFrame()
+        engine = IndicatorEngine(rsi_window=rsi_window, macd_slow=window_slow, macd_fast=window_fast, macd_sign=window_sign,
+                                 bb_window=bb_window, bb_dev=window_dev, volatility_window=volatility_window)
+        return self._memoized(df, 'indicators', vars(engine), lambda: engine.compute(df['Close']))
+
+    def get_indicators(self, ticker_symbol: str, df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """
+        Default-parameter indicators (IndicatorEngine.COLUMNS) over the full stored history of a ticker.
+        Bars appended since the last call advance the persisted IndicatorState one bar at a time;
+        a rewritten history is recomputed in full. Rows are aligned to 'df' when it is given.
+        """
+        with self._ticker_locks.get(ticker_symbol):
+            cached = self._load_history(ticker_symbol)
+            if cached is None or cached[0].empty or 'Close' not in cached[0].columns:
+                return self.calculate_indicators(df) if df is not None else pd.DataFrame()
+            indicators = self._update_indicators(ticker_symbol, cached[0]['Close'])
+
+        if df is None:
+            return indicators
+        if not df.index.isin(indicators.index).all():
+            return self.calculate_indicators(df)
+        return indicators.reindex(df.index)
+
+    def _update_indicators(self, ticker_symbol: str, close: pd.Series) -> pd.DataFrame:
+        x = IndicatorEngine.prepare(close)
+        stored = self._load_stored_indicators(ticker_symbol)
+        resumed = self._resume_indicators(stored, close.index, x) if stored is not None else None
+
+        if resumed is None:
+            engine = IndicatorEngine()
+            frame = engine.compute(close)
+            state = IndicatorState.from_history(close, engine)
+            previous = IndicatorState.from_history(close.iloc[:-1], engine) if len(close) > 1 else None
+        else:
+            state, start = resumed
+            if start == len(x):
+                return stored[0]
+            rows, previous = [], None
+            for i in range(start, len(x)):
+                if i == len(x) - 1:
+                    previous = state.copy()
+                rows.append(state.update(close.index[i], float(x[i])))
+            new_rows = pd.DataFrame(rows, index=close.index[start:], columns=IndicatorEngine.COLUMNS)
+            frame = pd.concat([stored[0].iloc[:start], new_rows])
+            print(f"Advanced {ticker_symbol} indicators by {len(rows)} bar(s).")
+
+        states = {
+            'current': state.to_dict(),
+            'previous': previous.to_dict() if previous is not None else None,
+        }
+        meta = self.store.save_indicators(ticker_symbol, frame, states)
+        return self._memory_cache.put(('indicators', ticker_symbol), frame, meta, self.store.indicators_version(ticker_symbol))
+
+    def _load_stored_indicators(self, ticker_symbol: str) -> Optional[Tuple[pd.DataFrame, dict]]:
+        """Persisted indicator frame and state, from memory if the file hasn't changed since it was cached."""
+        key = ('indicators', ticker_symbol)
+        version = self.store.indicators_version(ticker_symbol)
+        if version is None:
+            return None
+        cached = self._memory_cache.get(key, version)
+        if cached is None:
+            cached = self.store.load_indicators(ticker_symbol)
+            if cached is not None:
+                cached = self._memory_cache.put(key, cached[0], cached[1], version), cached[1]
+        return cached
+
+    @staticmethod
+    def _resume_indicators(stored: Tuple[pd.DataFrame, dict], index: pd.DatetimeIndex,
+                           x: np.ndarray) -> Optional[Tuple[IndicatorState, int]]:
+        """
+        Finds a persisted state that the current history extends: either the state at the last
+        stored bar, or the one before it (when only the last, partial bar was revised).
+        Returns (state, position of the first bar to apply), or None if history was rewritten.
+        """
+        frame, meta = stored
+        states = meta.get('state', {})
+        for key in ('current', 'previous'):
+            if not states.get(key):
+                continue
+            state = IndicatorState.from_dict(states[key])
+            if state.params() != vars(IndicatorEngine()) or state.last_timestamp is None:
+                return None
+            pos = index.searchsorted(state.last_timestamp)
+            if pos < len(index) and index[pos] == state.last_timestamp and x[pos] == state.last_close \
+                    and len(frame) > pos and frame.index[:pos + 1].equals(index[:pos + 1]):
+                return state, pos + 1
+        return None
+
+    def _memoized(self, df: pd.DataFrame, indicator: str, params: dict, compute) -> pd.DataFrame:
+        """Serves an indicator from the shared result cache, keyed by ticker, input fingerprint and params."""
+        return self._indicator_cache.get_or_compute(df.attrs.get('ticker', ''), df['Close'], indicator, params, compute)
 
     def calculate_rsi(self, df: pd.DataFrame, window: int = 14) -> pd.Series:
         """Calculates Relative Strength Index (RSI)."""
         if 'Close' not in df.columns or df['Close'].empty:
             print("Cannot calculate RSI: 'Close' column missing or empty.")
             return pd.Series(dtype='float64')
-        return ta.momentum.RSIIndicator(df['Close'], window=window, fillna=True).rsi()
+        rsi = self._memoized(df, 'rsi', {'window': window}, lambda: pd.DataFrame({
+            'rsi': IndicatorEngine.rsi(IndicatorEngine.prepare(df['Close']), window)
+        }, index=df.index))
+        return rsi['rsi']
 
     def calculate_macd(self, df: pd.DataFrame, window_slow: int = 26, window_fast: int = 12, window_sign: int = 9) -> pd.DataFrame:
         """Calculates Moving Average Convergence Divergence (MACD)."""
         if 'Close' not in df.columns or df['Close'].empty:
             print("Cannot calculate MACD: 'Close' column missing or empty.")
             return pd.DataFrame()
-        macd_indicator = ta.trend.MACD(df['Close'], window_slow=window_slow, window_fast=window_fast, window_sign=window_sign, fillna=True)
-        return pd.DataFrame({
-            'MACD': macd_indicator.macd(),
-            'MACD_Signal': macd_indicator.macd_signal(),
-            'MACD_Diff': macd_indicator.macd_diff() # Histogram
-        })
+
+        def compute():
+            macd, signal, hist = IndicatorEngine.macd(IndicatorEngine.prepare(df['Close']), window_slow, window_fast, window_sign)
+            return pd.DataFrame({
+                'MACD': macd,
+                'MACD_Signal': signal,
+                'MACD_Diff': hist # Histogram
+            }, index=df.index)
+        params = {'window_slow': window_slow, 'window_fast': window_fast, 'window_sign': window_sign}
+        return self._memoized(df, 'macd', params, compute)
 
     def calculate_bollinger_bands(self, df: pd.DataFrame, window: int = 20, window_dev: int = 2) -> pd.DataFrame:
         """Calculates Bollinger Bands."""
         if 'Close' not in df.columns or df['Close'].empty:
             print("Cannot calculate Bollinger Bands: 'Close' column missing or empty.")
             return pd.DataFrame()
-        bb = ta.volatility.BollingerBands(df['Close'], window=window, window_dev=window_dev, fillna=True)
-        return pd.DataFrame({
-            'BBL': bb.bollinger_lband(),
-            'BBM': bb.bollinger_mavg(),
-            'BBU': bb.bollinger_hband()
-        })
+
+        def compute():
+            lower, middle, upper = IndicatorEngine.bollinger(IndicatorEngine.prepare(df['Close']), window, window_dev)
+            return pd.DataFrame({
+                'BBL': lower,
+                'BBM': middle,
+                'BBU': upper
+            }, index=df.index)
+        return self._memoized(df, 'bollinger_bands', {'window': window, 'window_dev': window_dev}, compute)
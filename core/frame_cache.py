@@ -0,0 +1,92 @@
+# your_project/core/frame_cache.py
+
+import threading
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+class FrameCache:
+    """
+    Thread-safe in-memory LRU of DataFrames, bounded by their deep memory usage in bytes.
+    Stored frames are backed by read-only arrays and handed out as shallow copies, so
+    callers may add columns or replace the index but cannot modify the shared values.
+    Each entry carries an optional 'version' (e.g. the file it was read from); a lookup
+    with a different version drops the entry.
+    """
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict() # key -> (frame, meta, version, nbytes)
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _freeze(df: pd.DataFrame) -> pd.DataFrame:
+        columns = {}
+        for column in df.columns:
+            values = np.array(df[column].to_numpy(), copy=True)
+            values.flags.writeable = False
+            columns[column] = values
+        return pd.DataFrame(columns, index=df.index.copy(), copy=False)
+
+    def get(self, key: Hashable, version: Any = None) -> Optional[Tuple[pd.DataFrame, dict]]:
+        """Returns a read-only view of the cached frame and a copy of its metadata, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] != version:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0].copy(deep=False), dict(entry[1])
+
+    def put(self, key: Hashable, df: pd.DataFrame, meta: Optional[dict] = None,
+            version: Any = None) -> pd.DataFrame:
+        """
+        Caches a read-only copy of 'df', replacing any older entry for 'key', and evicts least
+        recently used entries until the budget holds. Returns a read-only view of what was stored.
+        """
+        frozen = self._freeze(df)
+        nbytes = int(frozen.memory_usage(deep=True).sum())
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            if nbytes <= self.max_bytes:
+                self._entries[key] = (frozen, dict(meta or {}), version, nbytes)
+                self.current_bytes += nbytes
+                while self.current_bytes > self.max_bytes:
+                    oldest = next(iter(self._entries))
+                    self._drop(oldest)
+                    self.evictions += 1
+        return frozen.copy(deep=False)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+    def _drop(self, key: Hashable):
+        # Caller holds the lock.
+        self.current_bytes -= self._entries.pop(key)[3]
@@ -0,0 +1,319 @@
+# your_project/core/indicators.py
+
+import os
+import json
+import math
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+from collections import deque
+from typing import Callable, Optional
+from core.frame_cache import FrameCache
+
+class IndicatorEngine:
+    """
+    Computes RSI, MACD (line, signal, histogram), Bollinger Bands and annualized rolling
+    volatility together, over one contiguous float64 copy of the close prices.
+    Outputs match the 'ta' library with fillna=True (and TradingEngine's volatility).
+    Missing closes are forward/back-filled before computing.
+    """
+    COLUMNS = ['RSI', 'MACD', 'MACD_Signal', 'MACD_Diff', 'BBL', 'BBM', 'BBU', 'Volatility']
+
+    def __init__(self, rsi_window: int = 14, macd_slow: int = 26, macd_fast: int = 12, macd_sign: int = 9,
+                 bb_window: int = 20, bb_dev: float = 2, volatility_window: int = 20):
+        self.rsi_window = rsi_window
+        self.macd_slow = macd_slow
+        self.macd_fast = macd_fast
+        self.macd_sign = macd_sign
+        self.bb_window = bb_window
+        self.bb_dev = bb_dev
+        self.volatility_window = volatility_window
+
+    @staticmethod
+    def prepare(close: pd.Series) -> np.ndarray:
+        """Contiguous float64 array of closes with gaps filled."""
+        x = np.ascontiguousarray(close.to_numpy(dtype='float64'))
+        if np.isnan(x).any():
+            x = np.ascontiguousarray(close.astype('float64').ffill().bfill().to_numpy())
+        return x
+
+    @staticmethod
+    def rolling_mean_std(x: np.ndarray, window: int, ddof: int):
+        """Mean and standard deviation of every full window of 'x' (len(x) - window + 1 values)."""
+        csum = np.cumsum(np.concatenate(([0.0], x)))
+        mean = (csum[window:] - csum[:-window]) / window
+        deviations = sliding_window_view(x, window) - mean[:, None]
+        std = np.sqrt(np.einsum('ij,ij->i', deviations, deviations) / (window - ddof))
+        return mean, std
+
+    @staticmethod
+    def ema(x: np.ndarray, alpha: float) -> np.ndarray:
+        """Exponential moving average seeded with the first value (pandas ewm(adjust=False))."""
+        return lfilter([alpha], [1.0, alpha - 1.0], x, zi=[(1.0 - alpha) * x[0]])[0]
+
+    @classmethod
+    def rsi(cls, x: np.ndarray, window: int, diff: np.ndarray = None) -> np.ndarray:
+        diff = np.diff(x, prepend=x[0]) if diff is None else diff
+        avg_gain = cls.ema(np.maximum(diff, 0.0), 1.0 / window)
+        avg_loss = cls.ema(np.maximum(-diff, 0.0), 1.0 / window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(avg_loss == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+
+    @classmethod
+    def macd(cls, x: np.ndarray, slow: int, fast: int, sign: int):
+        line = cls.ema(x, 2.0 / (fast + 1)) - cls.ema(x, 2.0 / (slow + 1))
+        signal = cls.ema(line, 2.0 / (sign + 1))
+        return line, signal, line - signal
+
+    @classmethod
+    def bollinger(cls, x: np.ndarray, window: int, dev: float):
+        mavg, mstd = np.empty(len(x)), np.empty(len(x))
+        # The first window-1 bands use the partial window, like rolling(min_periods=0).
+        head = x[:window - 1] - x[0]
+        counts = np.arange(1, len(head) + 1)
+        head_mean = np.cumsum(head) / counts
+        mavg[:len(head)] = head_mean + x[0]
+        mstd[:len(head)] = np.sqrt(np.maximum(np.cumsum(head * head) / counts - head_mean * head_mean, 0.0))
+        if len(x) >= window:
+            mavg[window - 1:], mstd[window - 1:] = cls.rolling_mean_std(x, window, ddof=0)
+        return mavg - dev * mstd, mavg, mavg + dev * mstd
+
+    @classmethod
+    def volatility(cls, x: np.ndarray, window: int) -> np.ndarray:
+        """Annualized rolling std of log returns; NaN until 'window' returns are available."""
+        out = np.full(len(x), np.nan)
+        if len(x) > window:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                log_returns = np.log(x[1:] / x[:-1])
+            out[window:] = cls.rolling_mean_std(log_returns, window, ddof=1)[1] * np.sqrt(252)
+        return out
+
+    def compute(self, close: pd.Series) -> pd.DataFrame:
+        """Returns every indicator as one DataFrame aligned to 'close'."""
+        if close.empty:
+            return pd.DataFrame(columns=self.COLUMNS, dtype='float64')
+        x = self.prepare(close)
+        diff = np.diff(x, prepend=x[0])
+        macd, signal, hist = self.macd(x, self.macd_slow, self.macd_fast, self.macd_sign)
+        bbl, bbm, bbu = self.bollinger(x, self.bb_window, self.bb_dev)
+        values = np.column_stack([
+            self.rsi(x, self.rsi_window, diff), macd, signal, hist, bbl, bbm, bbu,
+            self.volatility(x, self.volatility_window),
+        ])
+        return pd.DataFrame(values, index=close.index, columns=self.COLUMNS, copy=False)
+
+class EMAState:
+    """Running exponential average, seeded with the first value like IndicatorEngine.ema."""
+    def __init__(self, alpha: float, value: Optional[float] = None):
+        self.alpha = alpha
+        self.value = value
+
+    def update(self, x: float) -> float:
+        self.value = x if self.value is None else self.alpha * x + (1.0 - self.alpha) * self.value
+        return self.value
+
+    def to_dict(self) -> dict:
+        return {'alpha': self.alpha, 'value': self.value}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'EMAState':
+        return cls(data['alpha'], data['value'])
+
+class RollingWindowState:
+    """Ring buffer of the last 'window' values; mean and std cost O(window), independent of history length."""
+    def __init__(self, window: int, ddof: int, values: Optional[list] = None):
+        self.window = window
+        self.ddof = ddof
+        self.values = deque(values or [], maxlen=window)
+
+    def update(self, x: float):
+        self.values.append(x)
+        return self.mean_std()
+
+    def mean_std(self):
+        n = len(self.values)
+        if n <= self.ddof:
+            return (sum(self.values) / n if n else math.nan), math.nan
+        mean = sum(self.values) / n
+        return mean, math.sqrt(sum((v - mean) ** 2 for v in self.values) / (n - self.ddof))
+
+    def to_dict(self) -> dict:
+        return {'window': self.window, 'ddof': self.ddof, 'values': list(self.values)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RollingWindowState':
+        return cls(data['window'], data['ddof'], data['values'])
+
+class IndicatorState:
+    """
+    Serializable running state for every IndicatorEngine output, advanced one bar at a time:
+    Wilder averages for RSI, three EMAs for MACD and ring buffers for Bollinger Bands and volatility.
+    Each update produces the same row IndicatorEngine.compute would for that bar.
+    """
+    def __init__(self, engine: IndicatorEngine):
+        self.engine = engine
+        self.avg_gain = EMAState(1.0 / engine.rsi_window)
+        self.avg_loss = EMAState(1.0 / engine.rsi_window)
+        self.ema_fast = EMAState(2.0 / (engine.macd_fast + 1))
+        self.ema_slow = EMAState(2.0 / (engine.macd_slow + 1))
+        self.ema_signal = EMAState(2.0 / (engine.macd_sign + 1))
+        self.bollinger = RollingWindowState(engine.bb_window, ddof=0)
+        self.log_returns = RollingWindowState(engine.volatility_window, ddof=1)
+        self.last_close = None
+        self.last_timestamp = None
+
+    def params(self) -> dict:
+        return vars(self.engine).copy()
+
+    def update(self, timestamp: pd.Timestamp, close: float) -> list:
+        """Advances the state by one bar and returns its indicator row, in IndicatorEngine.COLUMNS order."""
+        prev_close = close if self.last_close is None else self.last_close
+        diff = close - prev_close
+        gain, loss = self.avg_gain.update(max(diff, 0.0)), self.avg_loss.update(max(-diff, 0.0))
+        rsi = 100.0 if loss == 0 else 100.0 - 100.0 / (1.0 + gain / loss)
+
+        macd = self.ema_fast.update(close) - self.ema_slow.update(close)
+        signal = self.ema_signal.update(macd)
+
+        mavg, mstd = self.bollinger.update(close)
+        mstd = 0.0 if math.isnan(mstd) else mstd
+
+        volatility = math.nan
+        if self.last_close is not None:
+            self.log_returns.update(math.log(close / prev_close))
+            if len(self.log_returns.values) == self.log_returns.window:
+                volatility = self.log_returns.mean_std()[1] * math.sqrt(252)
+
+        self.last_close = close
+        self.last_timestamp = pd.Timestamp(timestamp)
+        dev = self.engine.bb_dev
+        return [rsi, macd, signal, macd - signal, mavg - dev * mstd, mavg, mavg + dev * mstd, volatility]
+
+    @classmethod
+    def from_history(cls, close: pd.Series, engine: IndicatorEngine) -> 'IndicatorState':
+        """Builds the state at the last bar of 'close' with vectorized kernels instead of replaying every bar."""
+        state = cls(engine)
+        x = IndicatorEngine.prepare(close)
+        if len(x) == 0:
+            return state
+        diff = np.diff(x, prepend=x[0])
+        state.avg_gain.value = float(IndicatorEngine.ema(np.maximum(diff, 0.0), state.avg_gain.alpha)[-1])
+        state.avg_loss.value = float(IndicatorEngine.ema(np.maximum(-diff, 0.0), state.avg_loss.alpha)[-1])
+        fast = IndicatorEngine.ema(x, state.ema_fast.alpha)
+        slow = IndicatorEngine.ema(x, state.ema_slow.alpha)
+        state.ema_fast.value, state.ema_slow.value = float(fast[-1]), float(slow[-1])
+        state.ema_signal.value = float(IndicatorEngine.ema(fast - slow, state.ema_signal.alpha)[-1])
+        state.bollinger.values.extend(x[-engine.bb_window:].tolist())
+        with np.errstate(divide='ignore', invalid='ignore'):
+            state.log_returns.values.extend(np.log(x[1:] / x[:-1])[-engine.volatility_window:].tolist())
+        state.last_close = float(x[-1])
+        state.last_timestamp = pd.Timestamp(close.index[-1])
+        return state
+
+    def to_dict(self) -> dict:
+        return {
+            'params': self.params(),
+            'avg_gain': self.avg_gain.to_dict(),
+            'avg_loss': self.avg_loss.to_dict(),
+            'ema_fast': self.ema_fast.to_dict(),
+            'ema_slow': self.ema_slow.to_dict(),
+            'ema_signal': self.ema_signal.to_dict(),
+            'bollinger': self.bollinger.to_dict(),
+            'log_returns': self.log_returns.to_dict(),
+            'last_close': self.last_close,
+            'last_timestamp': self.last_timestamp.isoformat() if self.last_timestamp is not None else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'IndicatorState':
+        state = cls(IndicatorEngine(**data['params']))
+        for name in ('avg_gain', 'avg_loss', 'ema_fast', 'ema_slow', 'ema_signal'):
+            setattr(state, name, EMAState.from_dict(data[name]))
+        state.bollinger = RollingWindowState.from_dict(data['bollinger'])
+        state.log_returns = RollingWindowState.from_dict(data['log_returns'])
+        state.last_close = data['last_close']
+        state.last_timestamp = pd.Timestamp(data['last_timestamp']) if data['last_timestamp'] else None
+        return state
+
+    def copy(self) -> 'IndicatorState':
+        return IndicatorState.from_dict(self.to_dict())
+
+class IndicatorCache:
+    """
+    Memoizes indicator results keyed by (ticker, fingerprint of the index and closes, indicator, params).
+    Results live in a byte-bounded in-memory LRU and, if 'disk_dir' is set, in an LRU of .npz files
+    holding just the values (the fingerprint pins the index, so it is rebuilt from the caller's frame).
+    """
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None, max_disk_entries: int = 2000):
+        self.memory = FrameCache(max_bytes)
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.disk_hits = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def fingerprint(close: pd.Series) -> str:
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(np.ascontiguousarray(pd.DatetimeIndex(close.index).asi8).tobytes())
+        digest.update(np.ascontiguousarray(close.to_numpy(dtype='float64')).tobytes())
+        return digest.hexdigest()
+
+    @staticmethod
+    def make_key(ticker_symbol: str, fingerprint: str, indicator: str, params: dict) -> str:
+        raw = json.dumps([ticker_symbol, fingerprint, indicator, sorted(params.items())])
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def get_or_compute(self, ticker_symbol: str, close: pd.Series, indicator: str, params: dict,
+                       compute: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Returns the cached result for this input and params, computing and storing it on a miss."""
+        key = self.make_key(ticker_symbol, self.fingerprint(close), indicator, params)
+        cached = self.memory.get(key)
+        if cached is not None:
+            return cached[0]
+
+        result = self._read_disk(key, close.index)
+        if result is None:
+            result = compute()
+            self._write_disk(key, result)
+        else:
+            self.disk_hits += 1
+        return self.memory.put(key, result)
+
+    def stats(self) -> dict:
+        return dict(self.memory.stats(), disk_hits=self.disk_hits)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.npz")
+
+    def _read_disk(self, key: str, index: pd.Index) -> Optional[pd.DataFrame]:
+        if not self.disk_dir or not os.path.exists(self._disk_path(key)):
+            return None
+        try:
+            with np.load(self._disk_path(key), allow_pickle=False) as npz:
+                result = pd.DataFrame(npz['values'], index=index, columns=npz['columns'].tolist())
+            os.utime(self._disk_path(key)) # Mark as recently used
+            return result
+        except Exception as e:
+            print(f"Error reading cached indicator {key}: {e}")
+            return None
+
+    def _write_disk(self, key: str, result: pd.DataFrame):
+        if not self.disk_dir:
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, values=result.to_numpy(dtype='float64'), columns=np.array([str(c) for c in result.columns]))
+            os.replace(tmp_path, self._disk_path(key))
+
+            entries = [entry for entry in os.scandir(self.disk_dir) if entry.name.endswith('.npz')]
+            if len(entries) > self.max_disk_entries:
+                entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+                for entry in entries[:len(entries) - self.max_disk_entries]:
+                    os.remove(entry.path)
+        except OSError as e:
+            print(f"Error writing cached indicator {key}: {e}")
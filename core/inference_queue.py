@@ -0,0 +1,149 @@
+# your_project/core/inference_queue.py
+
+import time
+import queue
+import threading
+import numpy as np
+from collections import Counter
+from typing import Callable, List, Optional
+
+def _bucket(n: int) -> int:
+    """Power-of-two histogram bucket (upper bound) for n >= 1; 0 stays 0."""
+    return 0 if n <= 0 else 1 << (int(n) - 1).bit_length()
+
+class BatchStats:
+    """Thread-safe counters and histograms shared by every MicroBatcher in the process."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.batches = 0
+        self.rows = 0
+        self.batch_size_histogram = Counter()   # rows per forward pass, power-of-two buckets
+        self.requests_per_batch = Counter()     # callers coalesced into one forward pass
+        self.queue_depth_histogram = Counter()  # requests still waiting when a batch starts
+
+    def record_batch(self, requests: int, rows: int, queue_depth: int):
+        with self._lock:
+            self.requests += requests
+            self.batches += 1
+            self.rows += rows
+            self.batch_size_histogram[_bucket(rows)] += 1
+            self.requests_per_batch[_bucket(requests)] += 1
+            self.queue_depth_histogram[_bucket(queue_depth)] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'batches': self.batches,
+                'mean_batch_size': self.rows / self.batches if self.batches else 0.0,
+                'batch_size_histogram': dict(sorted(self.batch_size_histogram.items())),
+                'requests_per_batch_histogram': dict(sorted(self.requests_per_batch.items())),
+                'queue_depth_histogram': dict(sorted(self.queue_depth_histogram.items())),
+            }
+
+class _Request:
+    def __init__(self, windows: np.ndarray, horizon: int, seeds: Optional[List[int]]):
+        self.windows = windows
+        self.horizon = horizon
+        self.seeds = seeds
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class MicroBatcher:
+    """
+    Coalesces concurrent forecast requests for one model into batched forward passes.
+    A worker thread takes the first waiting request, keeps collecting for up to 'max_wait'
+    seconds or until 'max_batch_size' windows are queued, runs
+    run_batch(windows, horizon, seeds) once with the longest horizon asked for, and hands
+    each caller its own rows truncated to its horizon. Autoregressive steps and seeded
+    noise don't depend on the total horizon, so the truncated rows match a solo run.
+    Up to 'concurrency' workers collect and run batches in parallel (e.g. one per inference
+    worker process). Workers exit after 'idle_timeout' seconds without requests; the last one
+    calls 'on_idle', so batchers of evicted models don't keep them alive.
+    """
+    def __init__(self, run_batch: Callable, max_batch_size: int = 256, max_wait: float = 0.005,
+                 idle_timeout: float = 30.0, stats: Optional[BatchStats] = None,
+                 on_idle: Optional[Callable[[], None]] = None, concurrency: int = 1):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.idle_timeout = idle_timeout
+        self.stats = stats or BatchStats()
+        self.on_idle = on_idle
+        self.concurrency = max(1, concurrency)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = 0
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, windows: np.ndarray, horizon: int, seeds: Optional[List[int]] = None) -> np.ndarray:
+        """Queues windows shaped (n, look_back, features) and blocks until their forecasts are ready."""
+        request = _Request(windows, horizon, seeds)
+        with self._lock:
+            self._queue.put(request)
+            if self._workers < self.concurrency:
+                self._workers += 1
+                threading.Thread(target=self._run, name="inference-batcher", daemon=True).start()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _run(self):
+        while True:
+            try:
+                first = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    if not self._queue.empty():
+                        continue
+                    self._workers -= 1
+                    last = self._workers == 0
+                if last and self.on_idle is not None:
+                    self.on_idle()
+                return
+
+            batch, rows = [first], len(first.windows)
+            deadline = time.monotonic() + self.max_wait
+            while rows < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(request)
+                rows += len(request.windows)
+            self._execute(batch, rows)
+
+    def _execute(self, batch: List[_Request], rows: int):
+        self.stats.record_batch(len(batch), rows, self._queue.qsize())
+        try:
+            horizon = max(request.horizon for request in batch)
+            windows = np.concatenate([request.windows for request in batch], axis=0)
+            seeds = None
+            if any(request.seeds is not None for request in batch):
+                # Unseeded callers in a mixed batch get fresh random seeds.
+                seeds = []
+                for request in batch:
+                    seeds.extend(request.seeds if request.seeds is not None else
+                                 np.random.randint(0, 2**63 - 1, size=len(request.windows), dtype=np.int64).tolist())
+            outputs = self.run_batch(windows, horizon, seeds)
+
+            offset = 0
+            for request in batch:
+                count = len(request.windows)
+                request.result = outputs[offset:offset + count, :request.horizon]
+                offset += count
+        except BaseException as e:
+            for request in batch:
+                request.error = e
+        finally:
+            for request in batch:
+                request.done.set()
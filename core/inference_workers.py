@@ -0,0 +1,313 @@
+# your_project/core/inference_workers.py
+
+import os
+import time
+import queue
+import weakref
+import threading
+import itertools
+import numpy as np
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from typing import List, Optional
+
+class ModelClosedError(RuntimeError):
+    """The model was closed (e.g. evicted from the ModelPool); acquire it again from the pool."""
+
+def _worker_main(conn, model_path: str, scaler_path: str, look_back: int, max_batch_size: int, model_input: str = "noise"):
+    """Worker process: loads the model once, then serves forecasts until told to stop or the pipe closes."""
+    from core.model_pool import ModelPool
+    from core.predictor import Predictor
+
+    ModelPool.remote_workers = 0 # load the real model here, not another pool of workers
+    entry = ModelPool.acquire(model_path, scaler_path, look_back, model_input=model_input)
+    predictor = Predictor()
+    predictor.model, predictor.scaler = entry.model, entry.scaler
+    predictor.look_back, predictor.max_batch_size = look_back, max_batch_size
+    predictor.micro_batching = False
+    conn.send(('ready', entry.model is not None))
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        op = message[0]
+        if op == 'stop':
+            return
+        if op == 'ping':
+            conn.send(('pong',))
+            continue
+        try:
+            if op == 'predict':
+                conn.send(('ok', np.asarray(predictor.model.predict_on_batch(message[1]))))
+                continue
+            _, in_name, in_shape, out_name, out_shape, horizon, seeds, model_input = message
+            shm_in = shared_memory.SharedMemory(name=in_name)
+            shm_out = shared_memory.SharedMemory(name=out_name)
+            try:
+                windows = np.ndarray(in_shape, dtype='float32', buffer=shm_in.buf)
+                out = np.ndarray(out_shape, dtype='float32', buffer=shm_out.buf)
+                predictor.model_input = model_input
+                out[...] = predictor._forward(windows.copy(), horizon, seeds)
+                del windows, out # release the buffers before closing
+            finally:
+                shm_in.close()
+                shm_out.close()
+            conn.send(('ok', None))
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}"))
+
+class _Worker:
+    def __init__(self, slot: int, process, conn):
+        self.slot = slot
+        self.process = process
+        self.conn = conn
+
+class InferenceWorkerPool:
+    """
+    Pool of worker processes, each holding its own copy of one model, so inference doesn't
+    compete with page rendering for the GIL and a crashing or leaking model can't take down
+    the UI process. Windows and forecasts travel through shared memory; only small control
+    messages go over the pipes. Idle workers are pinged every 'health_interval' seconds, and
+    dead or unresponsive workers are replaced automatically.
+    """
+    def __init__(self, model_path: str, scaler_path: str, look_back: int, num_workers: int = 2,
+                 max_batch_size: int = 256, timeout: float = 60.0, health_interval: float = 5.0,
+                 model_input: str = "noise"):
+        self.model_path = model_path
+        self.scaler_path = scaler_path
+        self.look_back = look_back
+        self.num_workers = num_workers
+        self.max_batch_size = max_batch_size
+        self.model_input = model_input # lets workers warm up the forecast path they will serve
+        self.timeout = timeout
+        self.health_interval = health_interval
+        self.requests = 0
+        self.restarts = 0
+        self.failures = 0
+        self._context = mp.get_context('spawn') # never fork the threaded UI process
+        self._idle = queue.Queue()
+        self._workers = {}
+        self._start_failures = {} # slot -> consecutive failed starts, for the restart backoff
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+        for slot in range(num_workers):
+            self._start_worker(slot)
+        # The monitor holds only a weak reference, so dropping the pool (e.g. on hot reload) shuts it down.
+        threading.Thread(target=InferenceWorkerPool._monitor, args=(weakref.ref(self), self._closed, health_interval),
+                         name="inference-health", daemon=True).start()
+        self._finalizer = weakref.finalize(self, InferenceWorkerPool._shutdown, self._workers, self._closed)
+
+    def _start_worker(self, slot: int):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, name=f"inference-worker-{slot}", daemon=True,
+            args=(child_conn, self.model_path, self.scaler_path, self.look_back, self.max_batch_size, self.model_input))
+        process.start()
+        child_conn.close()
+        worker = _Worker(slot, process, parent_conn)
+        with self._lock:
+            self._workers[slot] = worker
+        # Loading can take seconds (TensorFlow); the worker joins the idle queue once it reports ready.
+        threading.Thread(target=self._await_ready, args=(worker,), daemon=True).start()
+
+    def _await_ready(self, worker: _Worker):
+        try:
+            if worker.conn.poll(self.timeout):
+                status, loaded = worker.conn.recv()[:2]
+                if status == 'ready' and loaded:
+                    with self._lock:
+                        self._start_failures[worker.slot] = 0
+                    self._idle.put(worker)
+                    return
+                print(f"Inference worker {worker.slot} could not load {self.model_path}.")
+        except (EOFError, OSError, ValueError):
+            pass
+        # Back off exponentially, so a model that can't load doesn't respawn workers in a tight loop.
+        with self._lock:
+            failures = self._start_failures[worker.slot] = self._start_failures.get(worker.slot, 0) + 1
+        self._closed.wait(min(2.0 ** (failures - 1), 60.0))
+        self._restart(worker)
+
+    def _restart(self, worker: _Worker):
+        with self._lock:
+            if self._closed.is_set() or self._workers.get(worker.slot) is not worker:
+                return
+            self.restarts += 1
+        print(f"Restarting inference worker {worker.slot} (pid {worker.process.pid}).")
+        self._stop_worker(worker)
+        self._start_worker(worker.slot)
+
+    @staticmethod
+    def _stop_worker(worker: _Worker):
+        try:
+            worker.conn.close()
+        except OSError:
+            pass
+        if worker.process.is_alive():
+            worker.process.terminate()
+        worker.process.join(timeout=5)
+
+    def _checkout(self) -> _Worker:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if self._closed.is_set():
+                raise ModelClosedError("The inference worker pool is closed.")
+            if remaining <= 0:
+                raise TimeoutError("No inference worker became available.")
+            try:
+                worker = self._idle.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                continue
+            if worker.process.is_alive():
+                return worker
+            self._restart(worker)
+
+    def _call(self, message) -> tuple:
+        """Sends one request to an idle worker; a worker that dies or hangs is replaced and the request retried once."""
+        for attempt in range(2):
+            worker = self._checkout()
+            try:
+                worker.conn.send(message)
+                if not worker.conn.poll(self.timeout):
+                    raise TimeoutError(f"Inference worker {worker.slot} did not answer in {self.timeout}s.")
+                reply = worker.conn.recv()
+            except (EOFError, OSError, TimeoutError) as e:
+                with self._lock:
+                    self.failures += 1
+                self._restart(worker)
+                if attempt == 1:
+                    raise RuntimeError(f"Inference worker failed: {e}") from e
+                continue
+            self._idle.put(worker)
+            if reply[0] == 'error':
+                raise RuntimeError(f"Inference worker error: {reply[1]}")
+            return reply
+
+    def forecast(self, windows: np.ndarray, horizon: int, seeds: Optional[List[int]], model_input: str) -> np.ndarray:
+        """Runs Predictor._forward in a worker; returns scaled forecasts shaped (n, horizon, 2)."""
+        windows = np.ascontiguousarray(windows, dtype='float32')
+        out_shape = (len(windows), horizon, 2)
+        shm_in = shared_memory.SharedMemory(create=True, size=max(windows.nbytes, 1))
+        shm_out = shared_memory.SharedMemory(create=True, size=max(int(np.prod(out_shape)) * 4, 1))
+        try:
+            np.ndarray(windows.shape, dtype='float32', buffer=shm_in.buf)[...] = windows
+            with self._lock:
+                self.requests += 1
+            self._call(('forecast', shm_in.name, windows.shape, shm_out.name, out_shape, horizon, seeds, model_input))
+            view = np.ndarray(out_shape, dtype='float32', buffer=shm_out.buf)
+            result = view.copy()
+            del view
+            return result
+        finally:
+            for shm in (shm_in, shm_out):
+                shm.close()
+                shm.unlink()
+
+    def predict_on_batch(self, x: np.ndarray) -> np.ndarray:
+        return self._call(('predict', np.asarray(x, dtype='float32')))[1]
+
+    @staticmethod
+    def _monitor(pool_ref, closed: threading.Event, interval: float):
+        while not closed.wait(interval):
+            pool = pool_ref()
+            if pool is None:
+                return
+            pool.check_health()
+            del pool
+
+    def check_health(self):
+        """Pings idle workers and replaces dead or unresponsive ones."""
+        # Only idle workers, so health checks never interleave with a request on the same pipe.
+        for _ in range(self._idle.qsize()):
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            healthy = False
+            try:
+                if worker.process.is_alive():
+                    worker.conn.send(('ping',))
+                    healthy = worker.conn.poll(min(self.timeout, 10.0)) and worker.conn.recv()[0] == 'pong'
+            except (EOFError, OSError):
+                healthy = False
+            if healthy:
+                self._idle.put(worker)
+            else:
+                self._restart(worker)
+
+    def stats(self) -> dict:
+        with self._lock:
+            alive = sum(worker.process.is_alive() for worker in self._workers.values())
+        return {'workers': self.num_workers, 'alive': alive, 'idle': self._idle.qsize(),
+                'requests': self.requests, 'failures': self.failures, 'restarts': self.restarts}
+
+    def close(self):
+        self._finalizer()
+
+    @staticmethod
+    def _shutdown(workers: dict, closed: threading.Event):
+        closed.set()
+        for worker in list(workers.values()):
+            try:
+                worker.conn.send(('stop',))
+            except (OSError, ValueError):
+                pass
+            InferenceWorkerPool._stop_worker(worker)
+
+class RemoteModel:
+    """
+    Stand-in the ModelPool binds instead of the model itself when inference runs in worker
+    processes. Predictor sends whole forecasts to it; the UI process only keeps the scaler.
+    Calls in flight are counted, so closing it (e.g. on eviction) waits for them to finish;
+    calls made after close() raise ModelClosedError.
+    """
+    _ids = itertools.count(1)
+
+    def __init__(self, model_path: str, scaler_path: str, look_back: int, num_workers: int, **pool_kwargs):
+        self.pool = InferenceWorkerPool(model_path, scaler_path, look_back, num_workers, **pool_kwargs)
+        self.input_shape = (None, look_back, 2)
+        self.concurrency = num_workers
+        # Every worker holds its own copy of the weights; the file size is a close estimate of one copy.
+        self.nbytes = os.path.getsize(model_path) * num_workers
+        self.id = next(self._ids)
+        self._users = 0
+        self._closing = False
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            if self._closing:
+                raise ModelClosedError("The model was closed.")
+            self._users += 1
+
+    def _exit(self):
+        with self._lock:
+            self._users -= 1
+            last = self._closing and self._users == 0
+        if last:
+            self.pool.close()
+
+    def forecast(self, windows: np.ndarray, horizon: int, seeds: Optional[List[int]], model_input: str) -> np.ndarray:
+        self._enter()
+        try:
+            return self.pool.forecast(windows, horizon, seeds, model_input)
+        finally:
+            self._exit()
+
+    def predict_on_batch(self, x) -> np.ndarray:
+        self._enter()
+        try:
+            return self.pool.predict_on_batch(x)
+        finally:
+            self._exit()
+
+    def close(self):
+        """Shuts the workers down now, or after the last call in flight if there are any."""
+        with self._lock:
+            self._closing = True
+            idle = self._users == 0
+        if idle:
+            self.pool.close()
@@ -0,0 +1,116 @@
+# your_project/core/lazy.py
+
+import sys
+import time
+import importlib
+import threading
+from typing import Callable, Dict, List, Optional
+
+class ImportReport:
+    """Process-wide record of how long each lazily loaded subsystem took to import and construct."""
+    _lock = threading.Lock()
+    _timings: Dict[str, dict] = {}
+
+    @classmethod
+    def record(cls, name: str, import_seconds: float, init_seconds: float, cached: bool):
+        with cls._lock:
+            if name not in cls._timings or not cached:
+                cls._timings[name] = {'module': name, 'import_seconds': import_seconds,
+                                      'init_seconds': init_seconds, 'cached': cached}
+
+    @classmethod
+    def entries(cls) -> List[dict]:
+        with cls._lock:
+            return sorted((dict(e) for e in cls._timings.values()), key=lambda e: -e['import_seconds'])
+
+    @classmethod
+    def format(cls) -> str:
+        lines = [f"{'module':<28}{'import (s)':>12}{'init (s)':>10}"]
+        for entry in cls.entries():
+            note = "  (already imported)" if entry['cached'] else ""
+            lines.append(f"{entry['module']:<28}{entry['import_seconds']:>12.3f}{entry['init_seconds']:>10.3f}{note}")
+        return "\n".join(lines)
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._timings.clear()
+
+class LazyService:
+    """
+    Stands in for an instance of 'module_name.class_name' and only imports the module and
+    constructs the instance on first attribute access. Pages that never touch a subsystem
+    (e.g. the login page) never pay for importing TensorFlow, NLTK or the plotting stack.
+    """
+    _warmed = set() # (module, class) already warmed in this process; Streamlit re-creates proxies every rerun
+    _warmed_lock = threading.Lock()
+
+    def __init__(self, module_name: str, class_name: str, *args, **kwargs):
+        self._module_name = module_name
+        self._class_name = class_name
+        self._args = args
+        self._kwargs = kwargs
+        self._instance = None
+        self._lock = threading.Lock()
+
+    def _resolve(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    cached = self._module_name in sys.modules
+                    start = time.perf_counter()
+                    module = importlib.import_module(self._module_name)
+                    imported = time.perf_counter()
+                    instance = getattr(module, self._class_name)(*self._args, **self._kwargs)
+                    constructed = time.perf_counter()
+                    ImportReport.record(self._module_name, imported - start, constructed - imported, cached)
+                    if not cached:
+                        print(f"Loaded {self._module_name} in {imported - start:.2f}s.")
+                    self._instance = instance
+        return self._instance
+
+    @property
+    def loaded(self) -> bool:
+        return self._instance is not None
+
+    def warm(self, then: Optional[Callable] = None) -> bool:
+        """
+        Imports and constructs the service on a background thread, then calls then(instance).
+        Only the first call per module and class in the process starts a thread; returns whether this one did.
+        """
+        with self._warmed_lock:
+            if (self._module_name, self._class_name) in self._warmed:
+                return False
+            self._warmed.add((self._module_name, self._class_name))
+
+        def run():
+            try:
+                instance = self._resolve()
+                if then is not None:
+                    then(instance)
+            except Exception as e:
+                print(f"WARNING: Background load of {self._module_name} failed: {e}")
+        threading.Thread(target=run, name=f"warm-{self._module_name}", daemon=True).start()
+        return True
+
+    def __getattr__(self, name: str):
+        # Only called for attributes not found on the proxy itself.
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._resolve(), name)
+
+if __name__ == "__main__":
+    # Startup report: import each heavy subsystem of app.py in turn, as the first feature using it would.
+    services = [
+        ("core.data_fetcher", "DataFetcher"),
+        ("core.trading_engine", "TradingEngine"),
+        ("core.visualization", "Visualization"),
+        ("core.predictor", "Predictor"),
+        ("core.news_analyzer", "NewsAnalyzer"),
+    ]
+    for module_name, class_name in services:
+        try:
+            LazyService(module_name, class_name)._resolve()
+        except Exception as e:
+            print(f"ERROR: Could not load {module_name}: {e}")
+    print(ImportReport.format())
@@ -0,0 +1,133 @@
+# your_project/core/market_calendar.py
+
+import datetime
+import pandas as pd
+from functools import lru_cache
+from typing import Optional
+
+class MarketCalendar:
+    """
+    Rule-based NYSE trading calendar: weekends, the exchange's full-day holidays and
+    regular 9:30-16:00 America/New_York sessions. Early closes are treated as full
+    sessions, which only means the intraday TTL applies a little longer on those days.
+    """
+    TIMEZONE = "America/New_York"
+    OPEN_TIME = datetime.time(9, 30)
+    CLOSE_TIME = datetime.time(16, 0)
+
+    def now(self) -> pd.Timestamp:
+        return pd.Timestamp.now(tz=self.TIMEZONE)
+
+    @staticmethod
+    def _easter(year: int) -> datetime.date:
+        """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+        a, b, c = year % 19, year // 100, year % 100
+        d, e = divmod(b, 4)
+        g = (8 * b + 13) // 25
+        h = (19 * a + b - d - g + 15) % 30
+        i, k = divmod(c, 4)
+        l = (32 + 2 * e + 2 * i - h - k) % 7
+        m = (a + 11 * h + 19 * l) // 433
+        month = (h + l - 7 * m + 90) // 25
+        day = (h + l - 7 * m + 33 * month + 19) % 32
+        return datetime.date(year, month, day)
+
+    @staticmethod
+    def _nth_weekday(year: int, month: int, weekday: int, n: int) -> datetime.date:
+        """n-th given weekday of a month (n=-1 for the last one)."""
+        if n > 0:
+            first = datetime.date(year, month, 1)
+            return first + datetime.timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+        last = datetime.date(year + (month == 12), month % 12 + 1, 1) - datetime.timedelta(days=1)
+        return last - datetime.timedelta(days=(last.weekday() - weekday) % 7)
+
+    @staticmethod
+    def _observed(day: datetime.date) -> datetime.date:
+        """Saturday holidays are observed on Friday, Sunday holidays on Monday."""
+        if day.weekday() == 5:
+            return day - datetime.timedelta(days=1)
+        if day.weekday() == 6:
+            return day + datetime.timedelta(days=1)
+        return day
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def holidays(cls, year: int) -> frozenset:
+        days = {
+            cls._nth_weekday(year, 1, 0, 3),                        # Martin Luther King Jr. Day
+            cls._nth_weekday(year, 2, 0, 3),                        # Washington's Birthday
+            cls._easter(year) - datetime.timedelta(days=2),         # Good Friday
+            cls._nth_weekday(year, 5, 0, -1),                       # Memorial Day
+            cls._observed(datetime.date(year, 7, 4)),               # Independence Day
+            cls._nth_weekday(year, 9, 0, 1),                        # Labor Day
+            cls._nth_weekday(year, 11, 3, 4),                       # Thanksgiving
+            cls._observed(datetime.date(year, 12, 25)),             # Christmas
+        }
+        # New Year's Day falling on a Saturday is not observed on the previous Friday.
+        new_year = datetime.date(year, 1, 1)
+        if new_year.weekday() != 5:
+            days.add(cls._observed(new_year))
+        if year >= 2022:
+            days.add(cls._observed(datetime.date(year, 6, 19)))     # Juneteenth
+        return frozenset(days)
+
+    def is_trading_day(self, day: datetime.date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays(day.year)
+
+    def previous_trading_day(self, day: datetime.date) -> datetime.date:
+        """Latest trading day strictly before 'day'."""
+        day -= datetime.timedelta(days=1)
+        while not self.is_trading_day(day):
+            day -= datetime.timedelta(days=1)
+        return day
+
+    def session_open(self, day: datetime.date) -> pd.Timestamp:
+        return pd.Timestamp.combine(day, self.OPEN_TIME).tz_localize(self.TIMEZONE)
+
+    def session_close(self, day: datetime.date) -> pd.Timestamp:
+        return pd.Timestamp.combine(day, self.CLOSE_TIME).tz_localize(self.TIMEZONE)
+
+    def is_open(self, now: Optional[pd.Timestamp] = None) -> bool:
+        now = self._localize(now)
+        today = now.date()
+        return self.is_trading_day(today) and self.session_open(today) <= now < self.session_close(today)
+
+    def last_completed_session(self, now: Optional[pd.Timestamp] = None) -> datetime.date:
+        """Date of the most recent session whose close is at or before 'now'."""
+        now = self._localize(now)
+        today = now.date()
+        if self.is_trading_day(today) and now >= self.session_close(today):
+            return today
+        return self.previous_trading_day(today)
+
+    def is_fresh(self, last_bar: pd.Timestamp, fetched_at: Optional[pd.Timestamp],
+                 intraday_ttl: int, now: Optional[pd.Timestamp] = None) -> bool:
+        """
+        Daily history is fresh if it contains the most recent completed session.
+        While the market is open it must also have been fetched during the current
+        session, no more than 'intraday_ttl' seconds ago.
+        """
+        now = self._localize(now)
+        last_bar_date = self._localize(last_bar).date() if last_bar.tzinfo is not None else last_bar.date()
+        last_session = self.last_completed_session(now)
+        if last_bar_date < last_session:
+            return False
+
+        fetched_at = self._localize(fetched_at) if fetched_at is not None else None
+        if self.is_open(now):
+            session_open = self.session_open(now.date())
+            return fetched_at is not None and fetched_at >= session_open and \
+                (now - fetched_at).total_seconds() <= intraday_ttl
+
+        # A bar fetched before its session closed is still partial.
+        if last_bar_date == last_session and fetched_at is not None:
+            return fetched_at >= self.session_close(last_session)
+        return True
+
+    def _localize(self, ts: Optional[pd.Timestamp]) -> pd.Timestamp:
+        if ts is None:
+            return self.now()
+        ts = pd.Timestamp(ts)
+        if ts.tzinfo is None:
+            return ts.tz_localize(self.TIMEZONE)
+        return ts.tz_convert(self.TIMEZONE)
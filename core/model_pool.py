@@ -0,0 +1,231 @@
+# your_project/core/model_pool.py
+
+import os
+import sys
+import hashlib
+import threading
+import itertools
+import joblib
+from collections import OrderedDict
+import numpy as np
+from typing import Dict, Optional, Tuple
+from sklearn.preprocessing import MinMaxScaler
+from core.single_flight import KeyedLocks
+from core.numpy_lstm import NumpyLSTMModel
+from core.inference_workers import RemoteModel
+from core.config import MODEL_POOL_MAX_BYTES, INFERENCE_WORKERS, INFERENCE_WORKER_TIMEOUT, INFERENCE_WORKER_MAX_MODELS
+
+def _file_stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _file_hash(path: str) -> Optional[str]:
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class PooledModel:
+    """A loaded model and scaler plus the artifact identities they were loaded from."""
+    def __init__(self, model, scaler, model_hash: Optional[str], scaler_hash: Optional[str],
+                 model_stat, scaler_stat, version: int, nbytes: int = 0):
+        self.model = model
+        self.scaler = scaler
+        self.model_hash = model_hash
+        self.scaler_hash = scaler_hash
+        self.model_stat = model_stat
+        self.scaler_stat = scaler_stat
+        self.version = version
+        self.nbytes = nbytes
+
+class ModelPool:
+    """
+    Process-wide pool of loaded models and scalers, shared by every session.
+    Each (model_path, scaler_path) pair is loaded once and warmed up with a dummy predict,
+    so the first user doesn't pay graph tracing. Every acquire stats the artifacts; when
+    their mtime/size changes and the content hash differs, the changed artifact is reloaded.
+    Loaded models are kept in an LRU bounded by their weight bytes ('max_bytes'), so one process
+    can serve many per-ticker models. Models running in worker processes count every worker's
+    copy, are capped at 'max_remote_models', and have their workers shut down when evicted
+    (after the forecasts in flight finish; later calls make the Predictor acquire the model again).
+    """
+    max_bytes = MODEL_POOL_MAX_BYTES
+    remote_workers = INFERENCE_WORKERS # > 0: run models in that many worker processes instead
+    max_remote_models = INFERENCE_WORKER_MAX_MODELS
+    _entries: "OrderedDict[tuple, PooledModel]" = OrderedDict()
+    _key_locks = KeyedLocks()
+    _versions = itertools.count(1)
+    _preloading = set()
+    _lock = threading.Lock()
+
+    @classmethod
+    def acquire(cls, model_path: str, scaler_path: str, look_back: int, n_features: int = 2,
+                model_input: str = "noise") -> PooledModel:
+        key = (os.path.abspath(model_path), os.path.abspath(scaler_path))
+        entry = cls._lookup(key)
+        if entry is not None and cls._is_current(entry, model_path, scaler_path):
+            return entry
+
+        # One loader per artifact pair; concurrent sessions wait for it instead of loading again.
+        with cls._key_locks.get(key):
+            entry = cls._lookup(key)
+            if entry is not None and cls._is_current(entry, model_path, scaler_path):
+                return entry
+
+            model_stat, scaler_stat = _file_stat(model_path), _file_stat(scaler_path)
+            model_hash, scaler_hash = _file_hash(model_path), _file_hash(scaler_path)
+            if entry is not None and (entry.model_hash, entry.scaler_hash) == (model_hash, scaler_hash):
+                # Touched but unchanged: keep the loaded objects.
+                entry.model_stat, entry.scaler_stat = model_stat, scaler_stat
+                return entry
+
+            reload_model = entry is None or entry.model_hash != model_hash
+            model = cls._load_model(model_path, scaler_path, look_back, model_input) if reload_model else entry.model
+            scaler = cls._load_scaler(scaler_path) if entry is None or entry.scaler_hash != scaler_hash else entry.scaler
+            if model is not None and reload_model and not isinstance(model, RemoteModel):
+                cls._warm_up(model, look_back, n_features, model_input) # workers warm up their own copy
+
+            entry = PooledModel(model, scaler, model_hash, scaler_hash, model_stat, scaler_stat,
+                                next(cls._versions), cls._model_bytes(model))
+            cls._insert(key, entry)
+            return entry
+
+    @classmethod
+    def _lookup(cls, key: tuple) -> Optional[PooledModel]:
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is not None:
+                cls._entries.move_to_end(key)
+            return entry
+
+    @classmethod
+    def _insert(cls, key: tuple, entry: PooledModel):
+        evicted = []
+        with cls._lock:
+            replaced = cls._entries.get(key)
+            if replaced is not None and replaced.model is not entry.model:
+                evicted.append(replaced.model)
+            cls._entries[key] = entry
+            cls._entries.move_to_end(key)
+            # Evict least recently used models; the one just loaded always stays.
+            while len(cls._entries) > 1 and (sum(e.nbytes for e in cls._entries.values()) > cls.max_bytes
+                                             or cls._remote_count() > cls.max_remote_models):
+                evicted_key, evicted_entry = cls._entries.popitem(last=False)
+                cls._preloading.discard(evicted_key)
+                evicted.append(evicted_entry.model)
+                print(f"Evicted model {evicted_key[0]} from the pool.")
+        for model in evicted:
+            cls._close(model)
+
+    @classmethod
+    def _remote_count(cls) -> int:
+        return sum(isinstance(e.model, RemoteModel) for e in cls._entries.values())
+
+    @staticmethod
+    def _close(model):
+        """Releases what an evicted model holds outside this process, i.e. a RemoteModel's workers."""
+        if hasattr(model, 'close'):
+            try:
+                model.close()
+            except Exception as e:
+                print(f"WARNING: Failed to close evicted model: {e}")
+
+    @classmethod
+    def stats(cls) -> dict:
+        with cls._lock:
+            return {
+                'models': len(cls._entries),
+                'bytes': sum(e.nbytes for e in cls._entries.values()),
+                'max_bytes': cls.max_bytes,
+            }
+
+    @staticmethod
+    def _model_bytes(model) -> int:
+        if model is None:
+            return 0
+        if hasattr(model, 'nbytes'):
+            return int(model.nbytes)
+        try:
+            return int(model.count_params()) * 4 # float32 weights
+        except Exception:
+            return 0
+
+    @classmethod
+    def preload(cls, model_path: str, scaler_path: str, look_back: int, n_features: int = 2, model_input: str = "noise"):
+        """Loads and warms up a model on a background thread, once per process."""
+        key = (os.path.abspath(model_path), os.path.abspath(scaler_path))
+        with cls._lock:
+            if key in cls._entries or key in cls._preloading:
+                return
+            cls._preloading.add(key)
+        threading.Thread(target=cls.acquire, args=(model_path, scaler_path, look_back, n_features, model_input),
+                         name="model-preload", daemon=True).start()
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            models = [entry.model for entry in cls._entries.values()]
+            cls._entries.clear()
+            cls._preloading.clear()
+        for model in models:
+            cls._close(model)
+
+    @staticmethod
+    def _is_current(entry: PooledModel, model_path: str, scaler_path: str) -> bool:
+        return entry.model_stat == _file_stat(model_path) and entry.scaler_stat == _file_stat(scaler_path)
+
+    @classmethod
+    def _load_model(cls, model_path: str, scaler_path: str, look_back: int, model_input: str = "noise"):
+        print(f"Attempting to load model from: {model_path}")
+        if not os.path.exists(model_path):
+            print(f"WARNING: Model file not found at {model_path}. Please ensure it is trained and committed.")
+            return None
+        try:
+            if cls.remote_workers > 0:
+                model = RemoteModel(model_path, scaler_path, look_back, cls.remote_workers,
+                                    timeout=INFERENCE_WORKER_TIMEOUT, model_input=model_input)
+                print(f"Started {cls.remote_workers} inference workers for {model_path}.")
+                return model
+            if model_path.endswith(".npz"):
+                model = NumpyLSTMModel.load(model_path)
+            else:
+                import tensorflow as tf
+                model = tf.keras.models.load_model(model_path)
+            print("Generator model loaded successfully.")
+            return model
+        except Exception as e:
+            print(f"ERROR: Failed to load Generator model from {model_path}: {e}")
+            return None
+
+    @staticmethod
+    def _load_scaler(scaler_path: str):
+        print(f"Attempting to load scaler from: {scaler_path}")
+        if not os.path.exists(scaler_path):
+            print(f"WARNING: Scaler file not found at {scaler_path}.")
+            print("Using a new, unfitted scaler. Prediction results will be inaccurate until a model is trained.")
+            return MinMaxScaler(feature_range=(0, 1))
+        try:
+            scaler = joblib.load(scaler_path)
+            print("Scaler loaded successfully.")
+            return scaler
+        except Exception as e:
+            print(f"ERROR: Failed to load scaler from {scaler_path}: {e}")
+            return None
+
+    @staticmethod
+    def _warm_up(model, look_back: int, n_features: int, model_input: str = "noise"):
+        try:
+            model.predict_on_batch(np.zeros((1, look_back, n_features), dtype="float32"))
+            # Window-fed Keras models forecast through a compiled rollout; trace it now, not on the first request.
+            tf = sys.modules.get('tensorflow')
+            if model_input == "window" and tf is not None and isinstance(model, tf.keras.Model):
+                from core.predictor import Predictor
+                Predictor._compiled_rollout(model)(tf.zeros((1, look_back, n_features)), tf.constant(1, dtype=tf.int32))
+        except Exception as e:
+            print(f"WARNING: Model warm-up predict failed: {e}")
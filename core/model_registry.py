@@ -0,0 +1,184 @@
+# your_project/core/model_registry.py
+
+import os
+import json
+import shutil
+import tempfile
+import threading
+import contextlib
+import pandas as pd
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError: # Windows: only in-process locking
+    fcntl = None
+
+DEFAULT_KEY = "default"
+
+class ModelRegistry:
+    """
+    Versioned registry of model/scaler artifacts in '<root>/registry.json'. Entries are keyed by
+    ticker, by 'sector:<name>' or by 'default'; each key has numbered versions and one promoted
+    'current' version. Artifacts are copied into '<root>/<key>/<version>/', so a published version
+    is never modified in place. Writes take a file lock and replace the index atomically, so
+    training processes can publish while the app is serving.
+    """
+    INDEX_FILE = "registry.json"
+
+    def __init__(self, root: str = "data/model"):
+        self.root = root
+        self._lock = threading.RLock()
+        self._cached_index = None
+        self._cached_stat = None
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.root, self.INDEX_FILE)
+
+    def _read_index(self) -> dict:
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return {'entries': {}}
+        stat = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        with self._lock:
+            if stat != self._cached_stat:
+                try:
+                    with open(self.index_path) as f:
+                        self._cached_index = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Error reading model registry {self.index_path}: {e}")
+                    return {'entries': {}}
+                self._cached_stat = stat
+            return self._cached_index
+
+    def _write_index(self, index: dict):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix=".json.tmp")
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(index, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, self.index_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    @contextlib.contextmanager
+    def _locked(self):
+        """Serializes read-modify-write of the index across threads and processes."""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, open(os.path.join(self.root, ".registry.lock"), 'w') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _spec(self, key: str, version: str, record: dict) -> dict:
+        spec = dict(record)
+        spec.update({
+            'key': key,
+            'version': version,
+            'model': os.path.join(self.root, record['model']),
+            'scaler': os.path.join(self.root, record['scaler']),
+            'artifacts': {name: os.path.join(self.root, path) for name, path in record.get('artifacts', {}).items()},
+        })
+        return spec
+
+    def get(self, key: str, version: Optional[str] = None) -> Optional[dict]:
+        """Spec (absolute artifact paths plus metadata) of a key's current or given version."""
+        entry = self._read_index()['entries'].get(key)
+        if entry is None:
+            return None
+        version = version or entry.get('current')
+        record = entry['versions'].get(version) if version else None
+        return self._spec(key, version, record) if record else None
+
+    def resolve(self, ticker_symbol: Optional[str], sector: Optional[str] = None) -> Optional[dict]:
+        """The most specific promoted model for a ticker: its own, then its sector's, then the default."""
+        for key in (ticker_symbol, f"sector:{sector}" if sector else None, DEFAULT_KEY):
+            if key:
+                spec = self.get(key)
+                if spec is not None:
+                    return spec
+        return None
+
+    def sector_of(self, ticker_symbol: Optional[str]) -> Optional[str]:
+        """The sector whose promoted 'sector:<name>' model was trained on the ticker (its 'tickers' metadata), if any."""
+        if not ticker_symbol:
+            return None
+        for key in self.keys():
+            if key.startswith("sector:"):
+                spec = self.get(key)
+                if spec is not None and ticker_symbol in spec.get('tickers', []):
+                    return key[len("sector:"):]
+        return None
+
+    def keys(self) -> List[str]:
+        return sorted(self._read_index()['entries'])
+
+    def versions(self, key: str) -> Dict[str, dict]:
+        entry = self._read_index()['entries'].get(key, {})
+        return {version: self._spec(key, version, record) for version, record in entry.get('versions', {}).items()}
+
+    def register(self, key: str, model_path: str, scaler_path: str, metadata: Optional[dict] = None,
+                 promote: bool = True, artifacts: Optional[Dict[str, str]] = None) -> dict:
+        """
+        Copies the artifacts into a new version of 'key', optionally promotes it, and returns its spec.
+        'artifacts' maps names to further files kept with the version (e.g. the Keras checkpoint).
+        """
+        with self._locked():
+            index = self._read_index_for_update()
+            entry = index['entries'].setdefault(key, {'current': None, 'versions': {}})
+            version = f"v{len(entry['versions']) + 1}"
+            while version in entry['versions']:
+                version = f"v{int(version[1:]) + 1}"
+
+            version_dir = os.path.join(self.root, self._directory_name(key), version)
+            os.makedirs(version_dir, exist_ok=True)
+            model_dest = os.path.join(version_dir, os.path.basename(model_path))
+            scaler_dest = os.path.join(version_dir, os.path.basename(scaler_path))
+            shutil.copy2(model_path, model_dest)
+            shutil.copy2(scaler_path, scaler_dest)
+            extra = {}
+            for name, path in (artifacts or {}).items():
+                dest = os.path.join(version_dir, os.path.basename(path))
+                shutil.copy2(path, dest)
+                extra[name] = os.path.relpath(dest, self.root)
+
+            record = dict(metadata or {})
+            record.update({
+                'model': os.path.relpath(model_dest, self.root),
+                'scaler': os.path.relpath(scaler_dest, self.root),
+                'artifacts': extra,
+                'created_at': pd.Timestamp.now(tz='UTC').isoformat(),
+            })
+            entry['versions'][version] = record
+            if promote or entry['current'] is None:
+                entry['current'] = version
+            self._write_index(index)
+        print(f"Registered {key} {version} ({'promoted' if entry['current'] == version else 'not promoted'}).")
+        return self._spec(key, version, record)
+
+    def promote(self, key: str, version: str):
+        with self._locked():
+            index = self._read_index_for_update()
+            entry = index['entries'].get(key)
+            if entry is None or version not in entry['versions']:
+                raise KeyError(f"No version {version} registered for {key}")
+            entry['current'] = version
+            self._write_index(index)
+
+    def _read_index_for_update(self) -> dict:
+        # Caller holds the lock; re-read from disk and copy, so the cached index is never mutated.
+        with self._lock:
+            self._cached_stat = None
+        return json.loads(json.dumps(self._read_index()))
+
+    @staticmethod
+    def _directory_name(key: str) -> str:
+        return "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
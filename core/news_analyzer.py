@@ -5,24 +5,31 @@ import nltk
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 import pandas as pd
 
-# Download VADER lexicon for sentiment analysis if not already downloaded
-try:
-    nltk.data.find('sentiment/vader_lexicon.zip')
-# Original: except nltk.downloader.DownloadError:
-except Exception: # <--- CHANGE THIS LINE TO CATCH A GENERAL EXCEPTION
-    print("VADER lexicon not found, attempting to download...")
-    try:
-        nltk.download('vader_lexicon')
-        print("VADER lexicon downloaded successfully.")
-    except Exception as e:
-        print(f"Error downloading VADER lexicon: {e}")
-        print("Sentiment analysis may not work correctly.")
-
 class NewsAnalyzer:
+    _lexicon_checked = False
+
     def __init__(self):
         self.api_manager = APIManager()
+        self._ensure_vader_lexicon()
         self.sid = SentimentIntensityAnalyzer()
 
+    @classmethod
+    def _ensure_vader_lexicon(cls):
+        """Downloads the VADER lexicon if needed, once per process, when sentiment is first used."""
+        if cls._lexicon_checked:
+            return
+        cls._lexicon_checked = True
+        try:
+            nltk.data.find('sentiment/vader_lexicon.zip')
+        except Exception:
+            print("VADER lexicon not found, attempting to download...")
+            try:
+                nltk.download('vader_lexicon')
+                print("VADER lexicon downloaded successfully.")
+            except Exception as e:
+                print(f"Error downloading VADER lexicon: {e}")
+                print("Sentiment analysis may not work correctly.")
+
     def get_news_headlines(self, query: str, limit: int = 5) -> list:
         """
         Fetches news articles for a given query (e.g., ticker symbol)
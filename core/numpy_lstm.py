@@ -0,0 +1,188 @@
+# your_project/core/numpy_lstm.py
+
+import os
+import json
+import tempfile
+import numpy as np
+from typing import List, Optional
+
+FORMAT_VERSION = 1
+QUANTIZED_FORMAT_VERSION = 2 # int8 kernels; older servers refuse these files instead of misreading them
+QUANTIZED_WEIGHTS = ('kernel', 'recurrent_kernel') # biases stay in float
+
+def _sigmoid(x: np.ndarray) -> np.ndarray:
+    # tanh form: cannot overflow and avoids the masking a split exp() would need.
+    return 0.5 * np.tanh(0.5 * x) + 0.5
+
+def _hard_sigmoid(x: np.ndarray) -> np.ndarray:
+    return np.clip(x / 6.0 + 0.5, 0.0, 1.0)
+
+class Int8Weight:
+    """
+    A weight matrix quantized per output channel: values = round(w / scale) in int8, with one
+    float scale per column. This is the storage format of quantized exports (a quarter of the
+    float32 file size); NumpyLSTMModel.load expands it to float once, since NumPy has no fast
+    int8 matmul, so serving runs at float speed and memory.
+    """
+    def __init__(self, values: np.ndarray, scale: np.ndarray):
+        self.values = values
+        self.scale = scale
+
+    @classmethod
+    def quantize(cls, weight: np.ndarray) -> "Int8Weight":
+        weight = np.asarray(weight, dtype='float32')
+        scale = np.abs(weight).max(axis=0) / 127.0
+        scale[scale == 0] = 1.0 # all-zero columns
+        return cls(np.clip(np.round(weight / scale), -127, 127).astype(np.int8), scale.astype('float32'))
+
+    @property
+    def nbytes(self) -> int:
+        return self.values.nbytes + self.scale.nbytes
+
+    def dequantize(self, dtype=np.float32) -> np.ndarray:
+        return self.values.astype(dtype) * self.scale.astype(dtype)
+
+def _float(weight, dtype) -> np.ndarray:
+    return weight.dequantize(dtype) if isinstance(weight, Int8Weight) else weight
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'tanh': np.tanh,
+    'sigmoid': _sigmoid,
+    'hard_sigmoid': _hard_sigmoid,
+    'relu': lambda x: np.maximum(x, 0.0),
+}
+
+class LSTMLayer:
+    """Keras-compatible LSTM forward pass; gates are packed in Keras order i, f, c, o."""
+    def __init__(self, kernel: np.ndarray, recurrent_kernel: np.ndarray, bias: Optional[np.ndarray],
+                 return_sequences: bool = False, activation: str = 'tanh', recurrent_activation: str = 'sigmoid'):
+        self.kernel = kernel
+        self.recurrent_kernel = recurrent_kernel
+        self.bias = bias
+        self.units = recurrent_kernel.shape[0]
+        self.return_sequences = return_sequences
+        self.activation = ACTIVATIONS[activation]
+        self.recurrent_activation = ACTIVATIONS[recurrent_activation]
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        batch, timesteps, _ = x.shape
+        units = self.units
+        # Input projections for every timestep in one matmul; only the recurrence is sequential.
+        projected = x @ self.kernel
+        if self.bias is not None:
+            projected += self.bias
+        h = np.zeros((batch, units), dtype=x.dtype)
+        c = np.zeros((batch, units), dtype=x.dtype)
+        sequence = np.empty((batch, timesteps, units), dtype=x.dtype) if self.return_sequences else None
+        for t in range(timesteps):
+            z = projected[:, t, :] + h @ self.recurrent_kernel
+            gates = self.recurrent_activation(z) # i, f and o; the c slice is recomputed below
+            i, f, o = gates[:, :units], gates[:, units:2 * units], gates[:, 3 * units:]
+            g = self.activation(z[:, 2 * units:3 * units])
+            c = f * c + i * g
+            h = o * self.activation(c)
+            if sequence is not None:
+                sequence[:, t, :] = h
+        return sequence if sequence is not None else h
+
+class DenseLayer:
+    def __init__(self, kernel: np.ndarray, bias: Optional[np.ndarray], activation: str = 'linear'):
+        self.kernel = kernel
+        self.bias = bias
+        self.activation = ACTIVATIONS[activation]
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        out = x @ self.kernel
+        if self.bias is not None:
+            out += self.bias
+        return self.activation(out)
+
+class NumpyLSTMModel:
+    """
+    Inference-only LSTM/Dense stack exported from a Keras model by scripts/export_numpy_model.py.
+    Exposes the subset of the Keras model API the Predictor uses (predict_on_batch, predict,
+    input_shape), so serving never has to import TensorFlow.
+    """
+    def __init__(self, layers: List, input_shape: tuple, dtype: str = 'float32', quantization: Optional[str] = None):
+        self.layers = layers
+        self.input_shape = input_shape
+        self.dtype = np.dtype(dtype)
+        self.quantization = quantization # how the weights were stored on disk, e.g. "int8-per-channel"
+
+    @property
+    def nbytes(self) -> int:
+        return sum(value.nbytes for layer in self.layers for value in vars(layer).values() if isinstance(value, np.ndarray))
+
+    def predict_on_batch(self, x) -> np.ndarray:
+        out = np.asarray(x, dtype=self.dtype)
+        for layer in self.layers:
+            out = layer(out)
+        return out
+
+    def predict(self, x, batch_size: int = 256, verbose: int = 0) -> np.ndarray:
+        x = np.asarray(x, dtype=self.dtype)
+        return np.concatenate([self.predict_on_batch(x[i:i + batch_size]) for i in range(0, len(x), batch_size)], axis=0)
+
+    @classmethod
+    def load(cls, path: str) -> "NumpyLSTMModel":
+        with np.load(path, allow_pickle=False) as data:
+            meta = json.loads(str(data['meta']))
+            if meta.get('format') not in (FORMAT_VERSION, QUANTIZED_FORMAT_VERSION):
+                raise ValueError(f"Unsupported model format {meta.get('format')} in {path}")
+            arrays = {name: data[name] for name in data.files if name != 'meta'}
+
+        dtype = np.dtype(meta.get('dtype', 'float32'))
+        layers = []
+        for i, spec in enumerate(meta['layers']):
+            def weight(name):
+                key = f"layer{i}_{name}"
+                if key not in arrays:
+                    return None
+                if arrays[key].dtype == np.int8:
+                    # Expanded once here rather than on every forward pass.
+                    return Int8Weight(arrays[key], arrays[f"{key}_scale"].astype('float32')).dequantize(dtype)
+                return arrays[key].astype(dtype)
+            if spec['type'] == 'lstm':
+                layers.append(LSTMLayer(weight('kernel'), weight('recurrent_kernel'), weight('bias'),
+                                        spec['return_sequences'], spec['activation'], spec['recurrent_activation']))
+            elif spec['type'] == 'dense':
+                layers.append(DenseLayer(weight('kernel'), weight('bias'), spec['activation']))
+            else:
+                raise ValueError(f"Unsupported layer type '{spec['type']}' in {path}")
+        return cls(layers, (None,) + tuple(meta['input_shape']), dtype.name, meta.get('quantization'))
+
+    @staticmethod
+    def save(path: str, layer_specs: List[dict], weights: List[dict], input_shape: tuple, dtype: str = 'float32',
+             quantize: bool = False):
+        """
+        Writes layer specs and their weights atomically, so a hot-reloading server never reads a partial file.
+        With 'quantize', kernels are stored as per-channel int8 (see Int8Weight) and biases stay float.
+        """
+        arrays = {}
+        for i, layer_weights in enumerate(weights):
+            for name, value in layer_weights.items():
+                if value is None:
+                    continue
+                if quantize and name in QUANTIZED_WEIGHTS:
+                    value = value if isinstance(value, Int8Weight) else Int8Weight.quantize(value)
+                    arrays[f"layer{i}_{name}"] = value.values
+                    arrays[f"layer{i}_{name}_scale"] = value.scale
+                else:
+                    arrays[f"layer{i}_{name}"] = np.asarray(_float(value, dtype), dtype=dtype)
+        meta = {'format': QUANTIZED_FORMAT_VERSION if quantize else FORMAT_VERSION, 'dtype': dtype,
+                'input_shape': list(input_shape), 'layers': layer_specs}
+        if quantize:
+            meta['quantization'] = "int8-per-channel"
+
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz.tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
@@ -0,0 +1,96 @@
+# your_project/core/prediction_cache.py
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+from core.frame_cache import FrameCache
+
+class PredictionCache:
+    """
+    Caches forecasts keyed by (model artifact, ticker, last-bar timestamp, horizon, input window digest,
+    sampling seed[, variant]), versioned by the (model hash, scaler hash) they were produced with. In memory the
+    version is checked on every lookup, so a hot-reloaded model drops its stale entries; the optional
+    disk tier names files after key and version together, and old ones age out of its LRU.
+    """
+    def __init__(self, max_bytes: int, disk_dir: Optional[str] = None, max_disk_entries: int = 5000):
+        self.memory = FrameCache(max_bytes)
+        self.disk_dir = disk_dir
+        self.max_disk_entries = max_disk_entries
+        self.disk_hits = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(artifact: str, ticker_symbol: str, last_bar: pd.Timestamp, horizon: int,
+                 window: np.ndarray, seed: Optional[int], variant: Tuple = ()) -> Tuple:
+        """'variant' distinguishes other outputs for the same input, e.g. Monte Carlo sample count and quantiles."""
+        window_digest = hashlib.blake2b(np.ascontiguousarray(window, dtype='float64').tobytes(), digest_size=16).hexdigest()
+        key = (os.path.abspath(artifact), ticker_symbol, pd.Timestamp(last_bar).isoformat(), horizon, window_digest, seed)
+        return key + (tuple(variant),) if variant else key
+
+    def get(self, key: Tuple, version: Tuple) -> Optional[pd.DataFrame]:
+        cached = self.memory.get(key, version)
+        if cached is not None:
+            return cached[0]
+        result = self._read_disk(key, version)
+        if result is not None:
+            self.disk_hits += 1
+            return self.memory.put(key, result, version=version)
+        return None
+
+    def put(self, key: Tuple, version: Tuple, result: pd.DataFrame) -> pd.DataFrame:
+        self._write_disk(key, version, result)
+        return self.memory.put(key, result, version=version)
+
+    def clear(self):
+        self.memory.clear()
+
+    def stats(self) -> dict:
+        return dict(self.memory.stats(), disk_hits=self.disk_hits)
+
+    def _disk_path(self, key: Tuple, version: Tuple) -> str:
+        digest = hashlib.blake2b(json.dumps([list(key), list(version)]).encode(), digest_size=16).hexdigest()
+        return os.path.join(self.disk_dir, f"{digest}.npz")
+
+    def _read_disk(self, key: Tuple, version: Tuple) -> Optional[pd.DataFrame]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key, version)
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                index = pd.DatetimeIndex(npz['index'].astype('datetime64[ns]'))
+                if str(npz['tz']):
+                    index = index.tz_localize('UTC').tz_convert(str(npz['tz']))
+                result = pd.DataFrame(npz['values'], index=index, columns=npz['columns'].tolist())
+            os.utime(path) # Mark as recently used
+            return result
+        except Exception as e:
+            print(f"Error reading cached prediction {path}: {e}")
+            return None
+
+    def _write_disk(self, key: Tuple, version: Tuple, result: pd.DataFrame):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key, version)
+        try:
+            index = pd.DatetimeIndex(result.index)
+            fd, tmp_path = tempfile.mkstemp(dir=self.disk_dir, suffix=".tmp")
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, values=result.to_numpy(dtype='float64'), index=index.asi8,
+                         tz=np.array(str(index.tz) if index.tz is not None else ""),
+                         columns=np.array([str(c) for c in result.columns]))
+            os.replace(tmp_path, path)
+
+            entries = [entry for entry in os.scandir(self.disk_dir) if entry.name.endswith('.npz')]
+            if len(entries) > self.max_disk_entries:
+                entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+                for entry in entries[:len(entries) - self.max_disk_entries]:
+                    os.remove(entry.path)
+        except OSError as e:
+            print(f"Error writing cached prediction {path}: {e}")
@@ -1,53 +1,120 @@
 # your_project/core/predictor.py
 
-import tensorflow as tf
 import numpy as np
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
 import os
-from typing import Optional
+import json
+import sys
+import hashlib
+import copy
+import functools
+import weakref
+import threading
+from typing import Dict, List, Optional
 import joblib
+from core.model_pool import ModelPool
+from core.model_registry import ModelRegistry
+from core.prediction_cache import PredictionCache
+from core.inference_queue import MicroBatcher, BatchStats
+from core.inference_workers import RemoteModel, ModelClosedError
+from core.config import PREDICTION_CACHE_MEMORY_BYTES, PREDICTION_CACHE_DIR, PREDICTION_SAMPLING_SEED, MODEL_REGISTRY_DIR, \
+    INFERENCE_MICRO_BATCHING, INFERENCE_BATCH_WAIT_MS, PREDICTION_QUANTIZED_MAX_ERROR
 
 class Predictor:
+    _rollouts = weakref.WeakKeyDictionary() # model -> compiled rollout
+    # Shared by every Predictor in the process (Streamlit creates one per script run).
+    _prediction_cache = PredictionCache(PREDICTION_CACHE_MEMORY_BYTES, disk_dir=PREDICTION_CACHE_DIR)
+    _batchers = {} # (id(model), model_input, max_batch_size) -> (model, MicroBatcher) coalescing requests across sessions
+    _batchers_lock = threading.Lock()
+    _batch_stats = BatchStats()
+
     def __init__(self):
         self.model_path = "data/model/generator_model.h5" # <-- CORRECT PATH FOR GAN
         self.scaler_path = "data/model/scaler.pkl"
         self.model = None
         self.scaler = None
         self.look_back = 60
+        self.model_version = None
+        self.model_hashes = None # (model hash, scaler hash) of the pooled artifacts; None disables caching
+        self.sampling_seed = PREDICTION_SAMPLING_SEED
+        self.model_input = "noise" # "noise" for the GAN generator, "window" for models fed the look-back window
+        self.max_batch_size = 2048
+        self.quantiles = (0.1, 0.9) # Monte Carlo band edges reported when sampling more than once
+        self.micro_batching = INFERENCE_MICRO_BATCHING
+        self.quantized_max_error = PREDICTION_QUANTIZED_MAX_ERROR # accuracy budget for serving int8 variants
+        self.registry = ModelRegistry(MODEL_REGISTRY_DIR)
+        self.spec = None # artifacts and metadata the model was bound from
 
-    def _load_scaler(self):
-        print(f"Attempting to load scaler from: {self.scaler_path}")
-        if os.path.exists(self.scaler_path):
-            try:
-                self.scaler = joblib.load(self.scaler_path)
-                print("Scaler loaded successfully.")
-            except Exception as e:
-                print(f"ERROR: Failed to load scaler from {self.scaler_path}: {e}")
-                self.scaler = None
-        else:
-            print(f"WARNING: Scaler file not found at {self.scaler_path}.")
-            self.scaler = MinMaxScaler(feature_range=(0, 1))
-            print("Using a new, unfitted scaler. Prediction results will be inaccurate until a model is trained.")
+    def default_spec(self) -> dict:
+        """The unregistered fallback model at 'model_path'/'scaler_path'."""
+        return {'key': None, 'version': None, 'model': self.artifact_path(), 'scaler': self.scaler_path,
+                'model_input': "noise", 'look_back': 60}
+
+    def resolve_spec(self, ticker_symbol: Optional[str] = None) -> dict:
+        """The registry's model for a ticker (its own, its sector's or the registered default), else the fallback."""
+        return self.registry.resolve(ticker_symbol, self.registry.sector_of(ticker_symbol)) or self.default_spec()
+
+    def load_model(self, ticker_symbol: Optional[str] = None):
+        """
+        Binds the model and scaler for 'ticker_symbol' from the process-wide pool. They are
+        loaded once per process and reloaded only when the artifacts on disk change.
+        """
+        self._bind(self.resolve_spec(ticker_symbol))
 
-    def load_model(self):
-        """Loads the pre-trained Generator model."""
-        print(f"Attempting to load model from: {self.model_path}")
-        if self.model is None:
-            if os.path.exists(self.model_path):
+    def _bind(self, spec: dict):
+        self.model_input = spec.get('model_input', self.model_input)
+        self.look_back = int(spec.get('look_back', self.look_back))
+        entry = ModelPool.acquire(self.serving_artifact(spec), spec['scaler'], self.look_back, model_input=self.model_input)
+        self.model = entry.model
+        self.scaler = entry.scaler
+        self.model_version = entry.version
+        self.model_hashes = (entry.model_hash, entry.scaler_hash)
+        self.spec = spec
+
+    def _bound_for(self, spec: dict) -> "Predictor":
+        """This predictor if it is already bound to 'spec', otherwise a copy bound to it."""
+        if self.spec is not None and (self.spec['model'], self.spec['scaler']) == (spec['model'], spec['scaler']):
+            return self
+        bound = copy.copy(self)
+        bound._bind(spec)
+        return bound
+
+    def preload(self):
+        """Starts loading and warming up the model in the background, once per process."""
+        ModelPool.preload(self.serving_artifact(self.default_spec()), self.scaler_path, self.look_back)
+
+    def artifact_path(self) -> str:
+        """
+        The NumPy export next to 'model_path' (see scripts/export_numpy_model.py) when there is one,
+        so serving doesn't need TensorFlow; otherwise the Keras model itself.
+        """
+        numpy_path = os.path.splitext(self.model_path)[0] + ".npz"
+        return numpy_path if os.path.exists(numpy_path) else self.model_path
+
+    def serving_artifact(self, spec: dict) -> str:
+        """
+        The model file to load for 'spec': its int8 variant (scripts/quantize_model.py) when the
+        quantization report's mean error is within 'quantized_max_error' (0, the default, never),
+        else the float model. The int8 file is smaller to store and load; once loaded it runs as float.
+        Registered versions carry the report in their metadata; the fallback model in a sidecar file.
+        """
+        quantized = spec.get('artifacts', {}).get('quantized_model')
+        report = spec.get('quantization')
+        if quantized is None and spec['model'].endswith(".npz"):
+            quantized = os.path.splitext(spec['model'])[0] + ".int8.npz"
+            report_path = os.path.splitext(quantized)[0] + ".json"
+            if os.path.exists(report_path):
                 try:
-                    self.model = tf.keras.models.load_model(self.model_path)
-                    print("Generator model loaded successfully.")
-                except Exception as e:
-                    print(f"ERROR: Failed to load Generator model from {self.model_path}: {e}")
-                    self.model = None
-            else:
-                print(f"WARNING: Model file not found at {self.model_path}. Please ensure it is trained and committed.")
-                self.model = None
-        else:
-            print("Model already loaded.")
-        
-        self._load_scaler()
+                    with open(report_path) as f:
+                        report = json.load(f)
+                except (OSError, ValueError) as e:
+                    print(f"Error reading quantization report {report_path}: {e}")
+        if (self.quantized_max_error > 0 and quantized and report
+                and report.get('mean_abs_error', float('inf')) <= self.quantized_max_error
+                and os.path.exists(quantized)):
+            return quantized
+        return spec['model']
 
     def preprocess_data_for_prediction(self, df: pd.DataFrame) -> Optional[np.ndarray]:
         """
@@ -78,29 +145,249 @@ class Predictor:
         x_input = x_input.reshape(1, self.look_back, 2)
         return x_input
 
-    def predict_prices(self, df: pd.DataFrame, num_predictions: int = 5) -> pd.DataFrame:
+    def _batched_forward(self, windows: np.ndarray, horizon: int, seeds: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Runs _forward through the model's shared inference queue, so concurrent sessions share passes.
+        If the pool closed the model since it was bound (e.g. evicted it), binds it again and retries once.
+        """
+        try:
+            return self._run_forward(windows, horizon, seeds)
+        except ModelClosedError:
+            if self.spec is None:
+                raise
+            print("Model was closed by the pool; binding it again.")
+            self._bind(self.spec)
+            return self._run_forward(windows, horizon, seeds)
+
+    def _run_forward(self, windows: np.ndarray, horizon: int, seeds: Optional[List[int]] = None) -> np.ndarray:
+        if not self.micro_batching:
+            return self._forward(windows, horizon, seeds)
+        return self._batcher().submit(windows, horizon, seeds)
+
+    def _batcher(self) -> MicroBatcher:
+        model, model_input, max_batch_size = self.model, self.model_input, self.max_batch_size
+        key = (id(model), model_input, max_batch_size)
+        with self._batchers_lock:
+            entry = self._batchers.get(key)
+            # The entry holds the model it was built for, so a new model reusing the id gets its own batcher.
+            if entry is None or entry[0] is not model:
+                run_batch = functools.partial(self._forward_with, model, model_input, max_batch_size)
+                batcher = MicroBatcher(run_batch, max_batch_size=max_batch_size,
+                                       max_wait=INFERENCE_BATCH_WAIT_MS / 1000.0, stats=self._batch_stats,
+                                       concurrency=model.concurrency if isinstance(model, RemoteModel) else 1)
+                batcher.on_idle = lambda: self._discard_batcher(key, batcher)
+                entry = self._batchers[key] = (model, batcher)
+            return entry[1]
+
+    @classmethod
+    def _discard_batcher(cls, key, batcher: MicroBatcher):
+        with cls._batchers_lock:
+            entry = cls._batchers.get(key)
+            if entry is not None and entry[1] is batcher:
+                del cls._batchers[key]
+
+    @classmethod
+    def inference_stats(cls) -> dict:
+        """Batch-size and queue-depth histograms of the inference queue, plus the current depth."""
+        with cls._batchers_lock:
+            depth = sum(batcher.queue_depth for _, batcher in cls._batchers.values())
+            active = len(cls._batchers)
+        return dict(cls._batch_stats.snapshot(), queue_depth=depth, active_models=active)
+
+    def _forward(self, windows: np.ndarray, horizon: int, seeds: Optional[List[int]] = None) -> np.ndarray:
+        """
+        Forecasts 'horizon' steps for a stack of look-back windows, in chunks of at most
+        'max_batch_size', and returns scaled predictions shaped (tickers, horizon, 2).
+        A RemoteModel runs the whole forecast in one of its worker processes.
+        With 'seeds', each window's noise is drawn from its own seeded generator, so a
+        ticker's forecast doesn't depend on which other tickers share the batch.
+        """
+        return self._forward_with(self.model, self.model_input, self.max_batch_size, windows, horizon, seeds)
+
+    @classmethod
+    def _forward_with(cls, model, model_input: str, max_batch_size: int, windows: np.ndarray, horizon: int,
+                      seeds: Optional[List[int]] = None) -> np.ndarray:
+        """_forward for an explicit model and settings, as pinned by a batcher."""
+        if isinstance(model, RemoteModel):
+            return model.forecast(windows, horizon, seeds, model_input)
+
+        if model_input == "noise":
+            # The GAN generator consumes noise shaped like a window; draw one per step
+            # and run them all in a single pass.
+            shape = (horizon,) + windows.shape[1:]
+            if seeds is None:
+                noise = np.random.normal(0, 1, size=(len(windows),) + shape)
+            else:
+                noise = np.stack([np.random.default_rng(seed).normal(0, 1, size=shape) for seed in seeds])
+            noise = noise.reshape((-1,) + windows.shape[1:]).astype('float32')
+            outputs = [cls._predict_last_step(model, noise[i:i + max_batch_size])
+                       for i in range(0, len(noise), max_batch_size)]
+            return np.concatenate(outputs, axis=0).reshape(len(windows), horizon, 2)
+
+        outputs = [cls._rollout_with(model, windows[i:i + max_batch_size], horizon)
+                   for i in range(0, len(windows), max_batch_size)]
+        return np.concatenate(outputs, axis=0)
+
+    @staticmethod
+    def _predict_last_step(model, inputs: np.ndarray) -> np.ndarray:
+        outputs = np.asarray(model.predict_on_batch(inputs))
+        return outputs.reshape(len(inputs), -1, 2)[:, -1, :]
+
+    def _rollout(self, windows: np.ndarray, horizon: int) -> np.ndarray:
+        """Autoregressive forecast: each prediction is appended to the window for the next step."""
+        return self._rollout_with(self.model, windows, horizon)
+
+    @classmethod
+    def _rollout_with(cls, model, windows: np.ndarray, horizon: int) -> np.ndarray:
+        # Only a model loaded by TensorFlow can be a Keras model, so don't import it otherwise.
+        tf = sys.modules.get('tensorflow')
+        if tf is not None and isinstance(model, tf.keras.Model):
+            rollout = cls._compiled_rollout(model)
+            return rollout(tf.constant(windows), tf.constant(horizon, dtype=tf.int32)).numpy()
+
+        predictions = []
+        for _ in range(horizon):
+            step = cls._predict_last_step(model, windows)
+            predictions.append(step)
+            windows = np.concatenate([windows[:, 1:, :], step[:, None, :].astype(windows.dtype)], axis=1)
+        return np.stack(predictions, axis=1)
+
+    @classmethod
+    def _compiled_rollout(cls, model):
+        """
+        One tf.function per model, shared by every Predictor in the process. Batch size and
+        horizon are runtime inputs, so neither triggers a retrace.
+        """
+        rollout = cls._rollouts.get(model)
+        if rollout is None:
+            import tensorflow as tf
+            look_back, n_features = model.input_shape[1], model.input_shape[2]
+
+            @tf.function(input_signature=[tf.TensorSpec([None, look_back, n_features], tf.float32),
+                                          tf.TensorSpec([], tf.int32)])
+            def rollout(window, horizon):
+                predictions = tf.TensorArray(tf.float32, size=horizon)
+                for step in tf.range(horizon):
+                    output = tf.reshape(model(window, training=False), [tf.shape(window)[0], -1, n_features])[:, -1, :]
+                    predictions = predictions.write(step, output)
+                    window = tf.concat([window[:, 1:, :], output[:, None, :]], axis=1)
+                return tf.transpose(predictions.stack(), [1, 0, 2])
+
+            cls._rollouts[model] = rollout
+        return rollout
+
+    def predict_prices_batch(self, frames: Dict[str, pd.DataFrame], num_predictions: int = 5,
+                             num_samples: int = 1) -> Dict[str, pd.DataFrame]:
+        """
+        Forecasts 'num_predictions' days of Open and Close prices for many tickers at once:
+        all look-back windows are stacked and rolled forward together. Forecasts are cached per
+        model and scaler version, ticker, last bar, horizon and input window, so only tickers
+        without a cached forecast reach the model. Tickers without enough history or whose forecast fails are left out.
+        With registered models, tickers are grouped by the model the registry resolves for them.
+        """
+        if not self.registry.keys():
+            return self._predict_group(frames, num_predictions, num_samples)
+
+        groups = {}
+        for ticker, df in frames.items():
+            spec = self.resolve_spec(ticker)
+            groups.setdefault((spec['model'], spec['scaler']), (spec, {}))[1][ticker] = df
+        results = {}
+        for spec, group in groups.values():
+            results.update(self._bound_for(spec)._predict_group(group, num_predictions, num_samples))
+        return {ticker: results[ticker] for ticker in frames if ticker in results}
+
+    def _predict_group(self, frames: Dict[str, pd.DataFrame], num_predictions: int,
+                       num_samples: int = 1) -> Dict[str, pd.DataFrame]:
+        """Forecasts tickers that all use this predictor's model."""
+        if not self.model:
+            return {}
+        # Only the generator is stochastic; a window-fed model gives the same forecast every time.
+        num_samples = max(1, num_samples) if self.model_input == "noise" else 1
+        variant = (num_samples,) + tuple(self.quantiles) if num_samples > 1 else ()
+
+        tickers, windows, keys = [], [], []
+        results = {}
+        for ticker, df in frames.items():
+            x_input = self.preprocess_data_for_prediction(df)
+            if x_input is None:
+                continue
+            artifact = self.spec['model'] if self.spec is not None else self.artifact_path()
+            key = PredictionCache.make_key(artifact, ticker, df.index[-1], num_predictions, x_input, self.sampling_seed, variant)
+            cached = self._prediction_cache.get(key, self.model_hashes) if self.model_hashes is not None else None
+            if cached is not None:
+                # Forecasts are tiny; hand out a writable copy (callers convert currency in place).
+                results[ticker] = cached.copy()
+                continue
+            tickers.append(ticker)
+            windows.append(x_input[0])
+            keys.append(key)
+
+        if windows:
+            # Monte Carlo samples are just more windows in the same batched pass.
+            stacked = np.repeat(np.stack(windows).astype('float32'), num_samples, axis=0)
+            seeds = None
+            if self.sampling_seed is not None:
+                seeds = [self._sample_seed(self._sampling_seed(key), k) for key in keys for k in range(num_samples)]
+            try:
+                predicted_scaled = self._batched_forward(stacked, num_predictions, seeds)
+            except Exception as e:
+                # Like tickers without enough history, failed forecasts are left out instead of failing the page.
+                print(f"Error forecasting {', '.join(map(str, tickers))}: {e}")
+                predicted_scaled = None
+            if predicted_scaled is not None:
+                predicted_scaled = predicted_scaled.reshape(len(windows), num_samples, num_predictions, 2)
+                for ticker, key, samples in zip(tickers, keys, predicted_scaled):
+                    results[ticker] = self._to_frame(frames[ticker], samples, key)
+        return {ticker: results[ticker] for ticker in frames if ticker in results}
+
+    def _to_frame(self, df: pd.DataFrame, samples: np.ndarray, key) -> pd.DataFrame:
+        """
+        Inverse-transforms one ticker's forecast samples, shaped (samples, horizon, 2), and stores the
+        result in the prediction cache. 'Predicted Open/Close' are the sample means; with more than one
+        sample, per-day medians and the 'quantiles' band are added as extra columns.
+        """
+        num_samples, horizon = samples.shape[:2]
+        prices = np.asarray(self.scaler.inverse_transform(samples.reshape(-1, 2)), dtype='float64').reshape(num_samples, horizon, 2)
+        future_dates = pd.date_range(start=df.index[-1], periods=horizon + 1, freq='B')[1:]
+        predicted_df = pd.DataFrame(prices.mean(axis=0), index=future_dates, columns=['Predicted Open', 'Predicted Close'])
+        if num_samples > 1:
+            for i, name in enumerate(['Predicted Open', 'Predicted Close']):
+                predicted_df[f"{name} Median"] = np.median(prices[:, :, i], axis=0)
+                for q in self.quantiles:
+                    predicted_df[f"{name} P{round(q * 100):02d}"] = np.quantile(prices[:, :, i], q, axis=0)
+        if self.model_hashes is not None:
+            self._prediction_cache.put(key, self.model_hashes, predicted_df)
+        return predicted_df
+
+    def _sampling_seed(self, key) -> int:
+        """Noise seed for one forecast: derived from the base seed and the ticker, last bar, horizon and window."""
+        raw = repr((self.sampling_seed, key[1:5]))
+        return int.from_bytes(hashlib.blake2b(raw.encode(), digest_size=8).digest(), 'little')
+
+    @staticmethod
+    def _sample_seed(seed: int, k: int) -> int:
+        # Sample 0 keeps the forecast's own seed, so a single sample matches the non-Monte Carlo path.
+        if k == 0:
+            return seed
+        return int.from_bytes(hashlib.blake2b(repr((seed, k)).encode(), digest_size=8).digest(), 'little')
+
+    @classmethod
+    def prediction_cache_stats(cls) -> dict:
+        return cls._prediction_cache.stats()
+
+    def predict_prices(self, df: pd.DataFrame, num_predictions: int = 5, num_samples: int = 1) -> pd.DataFrame:
         """
         Predicts future Open and Close prices using the trained Generator model.
+        With num_samples > 1 the generator is sampled that many times in one batch, and
+        median and quantile band columns are added (see _to_frame). Returns an empty frame when
+        there is not enough data or inference fails.
         """
         if self.model:
-            # We will use a noise vector as input for the GAN to generate new data
-            noise = np.random.normal(0, 1, size=[1, self.look_back, 2])
-            
-            # Predict the scaled prices using the generator model
-            predicted_scaled_prices = self.model.predict(noise, verbose=0)
-            
-            # The GAN predicts the next day's price. We will repeat this to get multiple predictions.
-            # This is a simplified approach for demonstration.
-            predictions_list = predicted_scaled_prices.reshape(-1, 2)
-            
-            predicted_prices = self.scaler.inverse_transform(predictions_list)
-            
-            last_date = df.index[-1]
-            future_dates = pd.date_range(start=last_date, periods=num_predictions + 1, freq='B')[1:]
-            
-            predicted_df = pd.DataFrame(predicted_prices, index=future_dates, columns=['Predicted Open', 'Predicted Close'])
-            return predicted_df
-        
+            ticker = df.attrs.get('ticker', '')
+            # The model bound by load_model(ticker_symbol), rather than a fresh registry lookup.
+            return self._predict_group({ticker: df}, num_predictions, num_samples).get(ticker, pd.DataFrame())
+
         else: # Placeholder logic if model is not loaded
             if df.empty or len(df) < 5:
                 return pd.DataFrame()
@@ -0,0 +1,196 @@
+# your_project/core/price_store.py
+
+import os
+import json
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Optional, Tuple
+
+class PriceStore:
+    """
+    Columnar on-disk store for historical prices, one file per ticker.
+    Each file is an uncompressed .npz holding the date index as int64 nanoseconds,
+    one typed array per column and a small JSON metadata record. The store always
+    keeps the longest history fetched so far; every yfinance 'period' is served as
+    a slice of it.
+    """
+    # Row-based periods are trading sessions, the rest are calendar offsets.
+    SESSION_PERIODS = {'1d': 1, '5d': 5}
+    PERIOD_OFFSETS = {
+        '1d': pd.offsets.BDay(1),
+        '5d': pd.offsets.BDay(5),
+        '1mo': pd.DateOffset(months=1),
+        '3mo': pd.DateOffset(months=3),
+        '6mo': pd.DateOffset(months=6),
+        '1y': pd.DateOffset(years=1),
+        '2y': pd.DateOffset(years=2),
+        '5y': pd.DateOffset(years=5),
+        '10y': pd.DateOffset(years=10),
+    }
+
+    def __init__(self, store_dir: str):
+        self.store_dir = store_dir
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    def path_for(self, ticker_symbol: str) -> str:
+        return os.path.join(self.store_dir, f"{ticker_symbol}.npz")
+
+    def version(self, ticker_symbol: str) -> Optional[tuple]:
+        """Cheap identity of the stored file (changes whenever it is rewritten), or None if absent."""
+        return self._file_version(self.path_for(ticker_symbol))
+
+    def indicators_version(self, ticker_symbol: str) -> Optional[tuple]:
+        return self._file_version(self.indicators_path_for(ticker_symbol))
+
+    @staticmethod
+    def _file_version(path: str) -> Optional[tuple]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    @classmethod
+    def period_start(cls, period: str, anchor: Optional[pd.Timestamp] = None) -> Optional[pd.Timestamp]:
+        """
+        Returns the (tz-naive, normalized) first date a 'period' reaches back to from 'anchor'.
+        Returns None for 'max', which has no lower bound.
+        """
+        anchor = (anchor if anchor is not None else pd.Timestamp.today()).normalize()
+        if anchor.tzinfo is not None:
+            anchor = anchor.tz_localize(None)
+        if period == 'max':
+            return None
+        if period == 'ytd':
+            return pd.Timestamp(year=anchor.year, month=1, day=1)
+        if period not in cls.PERIOD_OFFSETS:
+            raise ValueError(f"Unsupported period '{period}'.")
+        return anchor - cls.PERIOD_OFFSETS[period]
+
+    @classmethod
+    def longer_period(cls, period_a: str, period_b: Optional[str]) -> str:
+        """Returns whichever of the two periods reaches further back in time."""
+        if period_b is None:
+            return period_a
+        start_a, start_b = cls.period_start(period_a), cls.period_start(period_b)
+        if start_a is None:
+            return period_a
+        if start_b is None:
+            return period_b
+        return period_a if start_a <= start_b else period_b
+
+    @classmethod
+    def covers(cls, meta: dict, period: str) -> bool:
+        """Checks whether the stored history reaches back far enough to serve 'period'."""
+        covered_start = meta.get('covered_start')
+        if covered_start is None:
+            return True
+        requested_start = cls.period_start(period)
+        if requested_start is None:
+            return False
+        return pd.Timestamp(covered_start) <= requested_start
+
+    @classmethod
+    def slice_period(cls, df: pd.DataFrame, period: str) -> pd.DataFrame:
+        """Returns the rows of a full history that fall inside 'period', counted back from the last bar."""
+        if df.empty or period == 'max':
+            return df
+        if period in cls.SESSION_PERIODS:
+            return df.iloc[-cls.SESSION_PERIODS[period]:]
+        start = cls.period_start(period, anchor=df.index[-1])
+        naive_index = df.index.tz_localize(None) if df.index.tz is not None else df.index
+        return df.iloc[naive_index.searchsorted(start):]
+
+    @staticmethod
+    def merge_bars(df: pd.DataFrame, new_bars: pd.DataFrame) -> pd.DataFrame:
+        """
+        Appends freshly fetched bars to a stored history. Stored bars at or after the first
+        new bar are dropped, so a partial last session is replaced by its final values.
+        """
+        if new_bars.empty:
+            return df
+        if df.empty:
+            return new_bars
+        kept = df.iloc[:df.index.searchsorted(new_bars.index[0])]
+        return pd.concat([kept, new_bars])
+
+    def load(self, ticker_symbol: str) -> Optional[Tuple[pd.DataFrame, dict]]:
+        """
+        Loads the full stored history of a ticker and its metadata.
+        Returns None if nothing is stored or the file cannot be read.
+        """
+        return self._read_frame(self.path_for(ticker_symbol), f"price store for {ticker_symbol}")
+
+    def save(self, ticker_symbol: str, df: pd.DataFrame, period: str) -> dict:
+        """
+        Replaces the stored history of a ticker with 'df', which was fetched for 'period'.
+        Returns the metadata written alongside the arrays.
+        """
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+
+        # A 'max' history has no lower bound. Otherwise a young ticker whose first bar is later
+        # than the period start still counts as covering that period.
+        covered_start = None
+        if period != 'max':
+            covered_start = self.period_start(period)
+            if not df.empty:
+                first_bar = index[0].tz_localize(None) if tz else index[0]
+                covered_start = min(first_bar.normalize(), covered_start)
+            covered_start = covered_start.isoformat()
+
+        meta = {
+            'period': period,
+            'covered_start': covered_start,
+            'fetched_at': pd.Timestamp.now(tz='UTC').isoformat(),
+        }
+        return self._write_frame(self.path_for(ticker_symbol), ticker_symbol, df, meta)
+
+    def indicators_path_for(self, ticker_symbol: str) -> str:
+        return os.path.join(self.store_dir, f"{ticker_symbol}.indicators.npz")
+
+    def load_indicators(self, ticker_symbol: str) -> Optional[Tuple[pd.DataFrame, dict]]:
+        """Loads the indicator columns stored next to a ticker's history, and the streaming state in their metadata."""
+        return self._read_frame(self.indicators_path_for(ticker_symbol), f"indicators for {ticker_symbol}")
+
+    def save_indicators(self, ticker_symbol: str, df: pd.DataFrame, state: dict) -> dict:
+        return self._write_frame(self.indicators_path_for(ticker_symbol), ticker_symbol, df, {'state': state})
+
+    def _read_frame(self, path: str, description: str) -> Optional[Tuple[pd.DataFrame, dict]]:
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                meta = json.loads(str(npz['meta']))
+                index = pd.DatetimeIndex(npz['index'].view('datetime64[ns]'), name=meta.get('index_name'))
+                if meta.get('tz'):
+                    index = index.tz_localize('UTC').tz_convert(meta['tz'])
+                columns = {name: npz[f"col{i}"] for i, name in enumerate(meta['columns'])}
+            return pd.DataFrame(columns, index=index, copy=False), meta
+        except Exception as e:
+            print(f"Error reading {description}: {e}")
+            return None
+
+    def _write_frame(self, path: str, ticker_symbol: str, df: pd.DataFrame, meta: dict) -> dict:
+        index = pd.DatetimeIndex(df.index)
+        tz = str(index.tz) if index.tz is not None else None
+        utc_index = index.tz_convert('UTC').tz_localize(None) if tz else index
+        meta = dict(meta, tz=tz, index_name=index.name, columns=[str(c) for c in df.columns])
+
+        arrays = {f"col{i}": np.ascontiguousarray(df[c].to_numpy()) for i, c in enumerate(df.columns)}
+        arrays['index'] = utc_index.to_numpy(dtype='datetime64[ns]').view('int64')
+        arrays['meta'] = np.array(json.dumps(meta))
+
+        # Write to a temporary file and rename it over the old one, so readers in other
+        # threads or processes never see a partially written file.
+        fd, tmp_path = tempfile.mkstemp(dir=self.store_dir, prefix=f".{ticker_symbol}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(f, **arrays)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return meta
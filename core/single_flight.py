@@ -0,0 +1,56 @@
+# your_project/core/single_flight.py
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller runs the function,
+    callers arriving while it is in flight wait for it and receive the same result
+    (or exception). Nothing is cached once the call completes.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Runs fn(*args, **kwargs) unless a call with the same key is in flight, and returns its result."""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+class KeyedLocks:
+    """Hands out one re-entrant lock per key, e.g. to serialize read-modify-write of a file."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks: Dict[Hashable, threading.RLock] = {}
+
+    def get(self, key: Hashable) -> threading.RLock:
+        with self._lock:
+            return self._locks.setdefault(key, threading.RLock())
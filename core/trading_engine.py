@@ -3,6 +3,7 @@
 import pandas as pd
 import numpy as np
 import math
+from core.indicators import IndicatorEngine
 
 class TradingEngine:
     def calculate_volatility(self, prices: pd.Series, window: int = 20) -> float:
@@ -12,12 +13,8 @@ class TradingEngine:
         if prices.empty or len(prices) < window + 1:
             return 0.0
 
-        log_returns = np.log(prices / prices.shift(1)).dropna()
-        if log_returns.empty or len(log_returns) < window:
-             return 0.0
-
-        volatility = log_returns.rolling(window=window).std() * np.sqrt(252)
-        return volatility.iloc[-1] if not volatility.empty else 0.0
+        volatility = IndicatorEngine.volatility(IndicatorEngine.prepare(prices), window)
+        return float(volatility[-1]) if not np.isnan(volatility[-1]) else 0.0
 
     def generate_recommendation(self, 
                                 predicted_close_price: float, 
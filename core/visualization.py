@@ -5,6 +5,7 @@ import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import pandas as pd
 import matplotlib.pyplot as plt
+from typing import Optional
 
 class Visualization:
     def plot_candlestick(self, df: pd.DataFrame, ticker: str):
@@ -83,7 +84,10 @@ class Visualization:
         
         return fig
 
-    def plot_prediction_chart(self, historical_df: pd.DataFrame, predicted_series: pd.Series) -> go.Figure:
+    def plot_prediction_chart(self, historical_df: pd.DataFrame, predicted_series: pd.Series,
+                              lower_series: Optional[pd.Series] = None, upper_series: Optional[pd.Series] = None,
+                              median_series: Optional[pd.Series] = None) -> go.Figure:
+        """Historical close and forecast; with lower/upper quantile series the forecast gets a shaded confidence band."""
         if historical_df.empty or predicted_series.empty:
             return go.Figure().add_annotation(text="No data for prediction chart.", showarrow=False, xref="paper", yref="paper", x=0.5, y=0.5)
 
@@ -94,6 +98,11 @@ class Visualization:
         fig = go.Figure()
 
         fig.add_trace(go.Scatter(x=historical_df.index, y=historical_df['Close'], mode='lines', name='Historical Close', line=dict(color='blue')))
+        if lower_series is not None and upper_series is not None:
+            fig.add_trace(go.Scatter(x=lower_series.index, y=lower_series.values, mode='lines', name='Lower Band', line=dict(width=0), showlegend=False, hoverinfo='skip'))
+            fig.add_trace(go.Scatter(x=upper_series.index, y=upper_series.values, mode='lines', name='Confidence Band', line=dict(width=0), fill='tonexty', fillcolor='rgba(255, 165, 0, 0.2)'))
+        if median_series is not None:
+            fig.add_trace(go.Scatter(x=median_series.index, y=median_series.values, mode='lines', name='Predicted Median', line=dict(color='orange', dash='dot', width=1)))
         fig.add_trace(go.Scatter(x=predicted_series.index, y=predicted_series.values, mode='lines+markers', name='Predicted Close', line=dict(color='orange', dash='dash'), marker=dict(symbol='circle', size=8)))
 
         fig.update_layout(title='Stock Price Prediction',
@@ -14,4 +14,9 @@ if project_root not in sys.path:
 from scripts import train_model
 
 if __name__ == "__main__":
-    train_model.train_lstm_model()
+    if len(sys.argv) > 1:
+        # python run.py <universe file>: train every ticker in it in parallel
+        from scripts.train_universe import train_universe
+        train_universe(sys.argv[1])
+    else:
+        train_model.train_lstm_model()
@@ -0,0 +1,98 @@
+# your_project/scripts/dataset_cache.py
+
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import joblib
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Optional, Tuple
+
+class DatasetCache:
+    """
+    On-disk cache of preprocessed training data: the scaled, concatenated price rows,
+    the per-series window bounds and the fitted scaler, one directory per key. Arrays
+    are plain .npy files opened with mmap_mode='r', so every training process reading
+    the same entry shares one physical copy in the page cache and nothing is parsed or
+    copied up front. Entries are written to a temporary directory and renamed into
+    place, so concurrent writers of the same key never expose a partial entry.
+    """
+    def __init__(self, cache_dir: str, max_entries: int = 200):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(raw: Dict[str, Tuple[pd.DatetimeIndex, np.ndarray]], features: List[str], look_back: int,
+                 scaler=None) -> str:
+        """
+        Digest of (tickers, date ranges, features, look_back, scaler type) plus the raw values
+        themselves, so revised bars make a new entry. A given scaler's fitted parameters are
+        part of the key; without one, the entry stores a scaler fitted to the data.
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        description = [[ticker, index[0].isoformat(), index[-1].isoformat(), len(index)] for ticker, (index, _) in raw.items()]
+        if scaler is None:
+            scaler_description = "MinMaxScaler(0, 1) fitted"
+        else:
+            scaler_description = [type(scaler).__name__] + [np.asarray(getattr(scaler, name)).tolist()
+                                                            for name in ('scale_', 'min_') if hasattr(scaler, name)]
+        digest.update(json.dumps([description, list(features), look_back, scaler_description]).encode())
+        for _, values in raw.values():
+            digest.update(np.ascontiguousarray(values, dtype='float64').tobytes())
+        return digest.hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key: str) -> Optional[Tuple[np.ndarray, np.ndarray, object]]:
+        """(memory-mapped scaled rows, window bounds, scaler) of a cached entry, or None."""
+        entry_dir = self._entry_dir(key)
+        if not os.path.isdir(entry_dir):
+            self.misses += 1
+            return None
+        try:
+            data = np.load(os.path.join(entry_dir, "data.npy"), mmap_mode='r')
+            bounds = np.load(os.path.join(entry_dir, "bounds.npy"))
+            scaler = joblib.load(os.path.join(entry_dir, "scaler.pkl"))
+            os.utime(entry_dir) # Mark as recently used
+        except Exception as e:
+            print(f"Error reading cached dataset {entry_dir}: {e}")
+            self.misses += 1
+            return None
+        self.hits += 1
+        return data, bounds, scaler
+
+    def store(self, key: str, data: np.ndarray, bounds: np.ndarray, scaler, meta: Optional[dict] = None) -> np.ndarray:
+        """Writes an entry and returns its rows memory-mapped, so the writer shares the cached copy too."""
+        entry_dir = self._entry_dir(key)
+        tmp_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix=f".{key}.")
+        try:
+            np.save(os.path.join(tmp_dir, "data.npy"), np.ascontiguousarray(data, dtype='float32'))
+            np.save(os.path.join(tmp_dir, "bounds.npy"), np.asarray(bounds, dtype=np.int64))
+            joblib.dump(scaler, os.path.join(tmp_dir, "scaler.pkl"))
+            with open(os.path.join(tmp_dir, "meta.json"), 'w') as f:
+                json.dump(dict(meta or {}, created_at=pd.Timestamp.now(tz='UTC').isoformat()), f, indent=2)
+            try:
+                os.rename(tmp_dir, entry_dir)
+            except OSError:
+                shutil.rmtree(tmp_dir) # another process stored the same key first
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        self._evict()
+        return np.load(os.path.join(entry_dir, "data.npy"), mmap_mode='r')
+
+    def _evict(self):
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.is_dir() and not entry.name.startswith('.')]
+        if len(entries) > self.max_entries:
+            entries.sort(key=lambda entry: entry.stat().st_mtime_ns)
+            for entry in entries[:len(entries) - self.max_entries]:
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,170 @@
+# your_project/scripts/dataset_pipeline.py
+
+import itertools
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from sklearn.preprocessing import MinMaxScaler
+from typing import Dict, Iterator, List, Optional, Tuple
+from scripts.dataset_cache import DatasetCache
+
+FEATURES = ['Open', 'Close']
+
+class WindowedDataset:
+    """
+    Training windows over one or more price series, without materializing them.
+    The scaled series are concatenated into a single float32 array, and
+    sliding_window_view exposes every (look_back, features) window of it as a
+    zero-copy view. A window is identified by its start row; starts whose window
+    would cross from one ticker into the next are never produced. Only the rows of
+    the batch being served are copied, so memory stays proportional to the raw data
+    (plus one int64 start per window) rather than look_back times it.
+    """
+    def __init__(self, data: np.ndarray, starts: np.ndarray, look_back: int,
+                 bounds: Optional[List[Tuple[int, int]]] = None):
+        self.data = data
+        self.starts = starts
+        self.look_back = look_back
+        # [first, last) window start of each series, for callers that pick their own windows (see subset)
+        self.bounds = bounds or []
+        self.cache_key = None # DatasetCache entry holding these rows, if any
+        self.windows_view = sliding_window_view(data, (look_back, data.shape[1]))[:, 0]
+
+    @classmethod
+    def from_series(cls, series: List[np.ndarray], look_back: int = 60,
+                    split_ratio: float = 1.0) -> Tuple['WindowedDataset', Optional['WindowedDataset']]:
+        """
+        Builds datasets from already-scaled arrays shaped (rows, features). With split_ratio < 1,
+        each series is split chronologically and a (train, validation) pair is returned;
+        otherwise the second element is None.
+        """
+        arrays = [np.asarray(s, dtype='float32') for s in series if len(s) > look_back]
+        if not arrays:
+            raise ValueError(f"Not enough data points to create sequences with look_back={look_back}.")
+        data = np.ascontiguousarray(np.concatenate(arrays, axis=0))
+
+        bounds, offset = [], 0
+        for array in arrays:
+            # A window starting at s predicts row s + look_back, which must be in the same series.
+            bounds.append((offset, offset + len(array) - look_back))
+            offset += len(array)
+        return cls.from_rows(data, bounds, look_back, split_ratio)
+
+    @classmethod
+    def from_rows(cls, data: np.ndarray, bounds: List[Tuple[int, int]], look_back: int,
+                  split_ratio: float = 1.0) -> Tuple['WindowedDataset', Optional['WindowedDataset']]:
+        """Builds datasets over concatenated rows (possibly memory-mapped) and their per-series window bounds."""
+        bounds = [(int(first), int(last)) for first, last in bounds]
+        train_starts, val_starts = [], []
+        for first, last in bounds:
+            starts = np.arange(first, last, dtype=np.int64)
+            cut = int(round(len(starts) * split_ratio))
+            train_starts.append(starts[:cut])
+            val_starts.append(starts[cut:])
+
+        train = cls(data, np.concatenate(train_starts), look_back, bounds)
+        if split_ratio >= 1.0:
+            return train, None
+        return train, cls(data, np.concatenate(val_starts), look_back, bounds)
+
+    @classmethod
+    def from_price_store(cls, tickers: List[str], period: str = "5y", look_back: int = 60,
+                         split_ratio: float = 0.8, scaler: Optional[MinMaxScaler] = None,
+                         data_fetcher=None, cache: Optional[DatasetCache] = None
+                         ) -> Tuple['WindowedDataset', Optional['WindowedDataset'], MinMaxScaler]:
+        """
+        Loads Open/Close histories through the DataFetcher (served from the local price store),
+        scales them with 'scaler' or one fitted incrementally across all tickers, and returns
+        (train, validation, scaler). Tickers without enough history are skipped. With a
+        DatasetCache, the scaled rows and scaler are reused (memory-mapped) whenever the same
+        data was prepared before.
+        """
+        if data_fetcher is None:
+            from core.data_fetcher import DataFetcher
+            data_fetcher = DataFetcher()
+
+        raw: Dict[str, Tuple[pd.DatetimeIndex, np.ndarray]] = {}
+        for ticker_symbol in tickers:
+            df = data_fetcher.fetch_historical_data(ticker_symbol, period=period)
+            if df.empty or not set(FEATURES).issubset(df.columns) or len(df) <= look_back:
+                print(f"Skipping {ticker_symbol}: not enough price history for training.")
+                continue
+            raw[ticker_symbol] = (pd.DatetimeIndex(df.index), df[FEATURES].to_numpy(dtype='float64'))
+        if not raw:
+            raise ValueError("No ticker had enough price history for training.")
+
+        key = DatasetCache.make_key(raw, FEATURES, look_back, scaler) if cache is not None else None
+        cached = cache.load(key) if cache is not None else None
+        if cached is not None:
+            data, bounds, scaler = cached
+            train, validation = cls.from_rows(data, bounds.tolist(), look_back, split_ratio)
+            return cls._with_cache_key(key, train, validation) + (scaler,)
+
+        if scaler is None:
+            scaler = MinMaxScaler(feature_range=(0, 1))
+            for _, values in raw.values():
+                scaler.partial_fit(values)
+        train, validation = cls.from_series([scaler.transform(values) for _, values in raw.values()],
+                                            look_back=look_back, split_ratio=split_ratio)
+        if cache is not None:
+            data = cache.store(key, train.data, np.array(train.bounds, dtype=np.int64).reshape(-1, 2), scaler, meta={
+                'tickers': list(raw), 'features': FEATURES, 'look_back': look_back,
+                'date_ranges': {ticker: [index[0].isoformat(), index[-1].isoformat()] for ticker, (index, _) in raw.items()},
+            })
+            train, validation = cls._with_cache_key(key, *cls.from_rows(data, train.bounds, look_back, split_ratio))
+        return train, validation, scaler
+
+    @staticmethod
+    def _with_cache_key(key: str, *datasets) -> tuple:
+        for dataset in datasets:
+            if dataset is not None:
+                dataset.cache_key = key
+        return datasets
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, scaler: MinMaxScaler, look_back: int = 60,
+                   split_ratio: float = 1.0) -> Tuple['WindowedDataset', Optional['WindowedDataset']]:
+        return cls.from_series([scaler.transform(df[FEATURES].to_numpy(dtype='float64'))],
+                               look_back=look_back, split_ratio=split_ratio)
+
+    def subset(self, starts: np.ndarray) -> 'WindowedDataset':
+        """Another dataset over the same rows, serving only the windows at 'starts'."""
+        return type(self)(self.data, np.asarray(starts, dtype=np.int64), self.look_back, self.bounds)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def num_features(self) -> int:
+        return self.data.shape[1]
+
+    def take(self, starts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Copies the windows starting at 'starts' and their next-row targets."""
+        return self.windows_view[starts], np.asarray(self.data[starts + self.look_back])
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Every window at once, for small datasets and evaluation."""
+        return self.take(self.starts)
+
+    def batches(self, batch_size: int = 32, shuffle: bool = False, seed: Optional[int] = None) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        starts = self.starts
+        if shuffle:
+            starts = np.random.default_rng(seed).permutation(starts)
+        for i in range(0, len(starts), batch_size):
+            yield self.take(starts[i:i + batch_size])
+
+    def to_tf_dataset(self, batch_size: int = 32, shuffle: bool = False, seed: Optional[int] = None):
+        """
+        A tf.data pipeline over batches(). Each epoch re-runs the generator (reshuffled when
+        'shuffle' is set), and prefetching overlaps batch assembly with the training step.
+        """
+        import tensorflow as tf
+
+        epochs = itertools.count()
+        def generate():
+            epoch_seed = None if seed is None else seed + next(epochs)
+            yield from self.batches(batch_size, shuffle=shuffle, seed=epoch_seed)
+
+        signature = (tf.TensorSpec(shape=(None, self.look_back, self.num_features), dtype=tf.float32),
+                     tf.TensorSpec(shape=(None, self.num_features), dtype=tf.float32))
+        return tf.data.Dataset.from_generator(generate, output_signature=signature).prefetch(tf.data.AUTOTUNE)
@@ -0,0 +1,62 @@
+# your_project/scripts/export_numpy_model.py
+
+import os
+import sys
+import argparse
+from core.numpy_lstm import NumpyLSTMModel
+
+SKIPPED_LAYERS = {'Dropout', 'InputLayer'}
+
+def export_numpy_model(model_path: str = "data/model/lstm_model.h5", output_path: str = None) -> str:
+    """
+    Converts a trained Keras LSTM/Dense model into the compact .npz format served by
+    core.numpy_lstm, so the app can predict without importing TensorFlow. This works for
+    the LSTM from train_model.py and for the GAN generator (data/model/generator_model.h5,
+    exported to the generator_model.npz the Predictor looks for by default).
+    """
+    import tensorflow as tf
+
+    output_path = output_path or os.path.splitext(model_path)[0] + ".npz"
+    model = tf.keras.models.load_model(model_path, compile=False)
+
+    layer_specs, weights = [], []
+    for layer in model.layers:
+        if layer.__class__.__name__ == 'TimeDistributed':
+            layer = layer.layer # NumPy matmuls already apply a Dense layer to every timestep
+        kind = layer.__class__.__name__
+        config = layer.get_config()
+        if kind in SKIPPED_LAYERS:
+            continue # Dropout is the identity at inference time
+        if kind == 'LSTM':
+            params = layer.get_weights()
+            layer_specs.append({
+                'type': 'lstm',
+                'units': config['units'],
+                'return_sequences': config['return_sequences'],
+                'activation': config['activation'],
+                'recurrent_activation': config['recurrent_activation'],
+            })
+            weights.append({'kernel': params[0], 'recurrent_kernel': params[1],
+                            'bias': params[2] if config.get('use_bias', True) else None})
+        elif kind == 'Dense':
+            params = layer.get_weights()
+            layer_specs.append({'type': 'dense', 'units': config['units'], 'activation': config['activation']})
+            weights.append({'kernel': params[0], 'bias': params[1] if config.get('use_bias', True) else None})
+        else:
+            raise ValueError(f"Layer '{layer.name}' of type {kind} is not supported by the NumPy engine.")
+
+    NumpyLSTMModel.save(output_path, layer_specs, weights, model.input_shape[1:])
+    print(f"Exported {model_path} ({len(layer_specs)} layers) to {output_path}")
+    return output_path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export a Keras LSTM model to the NumPy inference format.")
+    parser.add_argument("model_path", nargs="?", default="data/model/lstm_model.h5",
+                        help="Keras model to export, e.g. data/model/generator_model.h5 for the GAN generator.")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args()
+    try:
+        export_numpy_model(args.model_path, args.output)
+    except Exception as e:
+        print(f"ERROR: Export failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,123 @@
+# your_project/scripts/fine_tune_model.py
+
+import os
+import sys
+import argparse
+import numpy as np
+import joblib
+from typing import Optional, Tuple
+from scripts.dataset_pipeline import WindowedDataset
+from scripts.dataset_cache import DatasetCache
+from core.model_registry import ModelRegistry
+from core.config import DATASET_CACHE_DIR
+
+def split_recent(dataset: WindowedDataset, recent_windows: int, validation_windows: int,
+                 replay_ratio: float, seed: int = 0) -> Tuple[WindowedDataset, WindowedDataset]:
+    """
+    Splits every series of 'dataset' into (fine-tuning, validation) windows: the newest
+    'validation_windows' per series are held out, the 'recent_windows' before them are
+    trained on, plus a random replay sample of older windows ('replay_ratio' times as
+    many) so the model doesn't forget the rest of the history.
+    """
+    rng = np.random.default_rng(seed)
+    train_starts, val_starts = [], []
+    for first, last in dataset.bounds:
+        starts = np.arange(first, last, dtype=np.int64)
+        validation = starts[-validation_windows:] if validation_windows else starts[:0]
+        starts = starts[:len(starts) - len(validation)]
+        cut = max(0, len(starts) - recent_windows) # not starts[-recent_windows:], which is everything for 0
+        recent, older = starts[cut:], starts[:cut]
+        replay = rng.choice(older, size=min(len(older), int(len(recent) * replay_ratio)), replace=False)
+        train_starts.extend([np.sort(replay), recent])
+        val_starts.append(validation)
+    return dataset.subset(np.concatenate(train_starts)), dataset.subset(np.concatenate(val_starts))
+
+def fine_tune_lstm_model(key: str = "AAPL", period: str = "5y", recent_windows: int = 120,
+                         validation_windows: int = 20, replay_ratio: float = 1.0, epochs: int = 3,
+                         learning_rate: float = 1e-4, max_regression: float = 0.0,
+                         registry_dir: str = "data/model", work_dir: Optional[str] = None,
+                         data_fetcher=None, dataset_cache_dir: Optional[str] = DATASET_CACHE_DIR) -> Optional[dict]:
+    """
+    Warm-starts from the promoted version of 'key' and fine-tunes it for a few epochs on
+    the latest bars plus a replay sample of older ones, keeping the original scaler so
+    inputs stay on the scale the model learned. The result is registered as a new version
+    and promoted only if its loss on the held-out newest windows is no more than
+    'max_regression' (a fraction) worse than the current version's. Returns the new spec,
+    or None when there is no Keras checkpoint to start from or not enough data.
+    """
+    import tensorflow as tf
+
+    registry = ModelRegistry(registry_dir)
+    base = registry.get(key)
+    keras_path = (base or {}).get('artifacts', {}).get('keras_model')
+    if base is None or not keras_path or not os.path.exists(keras_path):
+        print(f"No fine-tunable model registered for {key}; run a full training first.")
+        return None
+    print(f"Fine-tuning {key} {base['version']}...")
+
+    # 1. Recent windows on the base version's scale
+    scaler = joblib.load(base['scaler'])
+    look_back = int(base.get('look_back', 60))
+    try:
+        dataset, _, _ = WindowedDataset.from_price_store(base.get('tickers') or [key], period=period,
+                                                         look_back=look_back, split_ratio=1.0, scaler=scaler,
+                                                         data_fetcher=data_fetcher,
+                                                         cache=DatasetCache(dataset_cache_dir) if dataset_cache_dir else None)
+    except ValueError as e:
+        print(f"Failed to fetch historical data ({e}). Aborting fine-tuning.")
+        return None
+    train_data, val_data = split_recent(dataset, recent_windows, validation_windows, replay_ratio)
+    if len(train_data) == 0 or len(val_data) == 0:
+        print(f"Not enough recent data to fine-tune {key}. Aborting fine-tuning.")
+        return None
+    print(f"Fine-tuning windows: {len(train_data)} ({len(val_data)} held out)")
+    val_X, val_y = val_data.arrays()
+
+    # 2. Warm start
+    model = tf.keras.models.load_model(keras_path, compile=False)
+    model.compile(optimizer=tf.keras.optimizers.Adam(learning_rate=learning_rate), loss='mean_squared_error')
+    base_loss = float(model.evaluate(val_X, val_y, verbose=0))
+    model.fit(train_data.to_tf_dataset(batch_size=32, shuffle=True, seed=42), epochs=epochs, verbose=0)
+    val_loss = float(model.evaluate(val_X, val_y, verbose=0))
+    print(f"Validation loss: {base_loss:.6f} -> {val_loss:.6f}")
+
+    # 3. Publish next to the base version, promoting only if it didn't get worse
+    from scripts.train_model import publish_model
+    work_dir = work_dir or os.path.join(registry_dir, "_build", ModelRegistry._directory_name(key) + "-finetune")
+    os.makedirs(work_dir, exist_ok=True)
+    keras_out = os.path.join(work_dir, "lstm_model.h5")
+    scaler_out = os.path.join(work_dir, "scaler.pkl")
+    model.save(keras_out)
+    joblib.dump(scaler, scaler_out)
+
+    promote = val_loss <= base_loss * (1.0 + max_regression)
+    metadata = {key_: value for key_, value in base.items()
+                if key_ not in ('key', 'version', 'model', 'scaler', 'artifacts', 'created_at')}
+    metadata.update({
+        'fine_tuned_from': base['version'],
+        'fine_tune_epochs': epochs,
+        'recent_windows': recent_windows,
+        'replay_ratio': replay_ratio,
+        'val_loss': val_loss,
+        'base_val_loss': base_loss,
+    })
+    spec = publish_model(keras_out, scaler_out, val_data, key, registry_dir, base.get('tickers') or [key],
+                         metadata, promote=promote)
+    if not promote:
+        print(f"Kept {base['version']} as current: {spec['version']} did worse on the newest bars.")
+    return spec
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fine-tune a registered model on newly arrived bars.")
+    parser.add_argument("key", nargs="?", default="AAPL", help="Registry key: a ticker, 'sector:<name>' or 'default'.")
+    parser.add_argument("--recent-windows", type=int, default=120)
+    parser.add_argument("--validation-windows", type=int, default=20)
+    parser.add_argument("--replay-ratio", type=float, default=1.0)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--max-regression", type=float, default=0.0)
+    parser.add_argument("--registry-dir", default="data/model")
+    args = parser.parse_args()
+    spec = fine_tune_lstm_model(args.key, recent_windows=args.recent_windows, validation_windows=args.validation_windows,
+                                replay_ratio=args.replay_ratio, epochs=args.epochs,
+                                max_regression=args.max_regression, registry_dir=args.registry_dir)
+    sys.exit(0 if spec is not None else 1)
@@ -0,0 +1,109 @@
+# your_project/scripts/quantize_model.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+from typing import Optional, Tuple
+from core.numpy_lstm import NumpyLSTMModel
+
+def quantized_path_for(numpy_path: str) -> str:
+    return os.path.splitext(numpy_path)[0] + ".int8.npz"
+
+def report_path_for(quantized_path: str) -> str:
+    return os.path.splitext(quantized_path)[0] + ".json"
+
+def quantize_numpy_model(numpy_path: str = "data/model/lstm_model.npz", output_path: Optional[str] = None) -> str:
+    """
+    Writes a quantized copy of a NumPy export: kernels as per-channel int8, biases in float.
+    The file is about a quarter of the size; the NumPy engine expands it to float on load.
+    """
+    output_path = output_path or quantized_path_for(numpy_path)
+    with np.load(numpy_path, allow_pickle=False) as data:
+        meta = json.loads(str(data['meta']))
+        arrays = {name: data[name] for name in data.files if name != 'meta'}
+    weights = []
+    for i in range(len(meta['layers'])):
+        prefix = f"layer{i}_"
+        weights.append({name[len(prefix):]: value for name, value in arrays.items() if name.startswith(prefix)})
+    NumpyLSTMModel.save(output_path, meta['layers'], weights, meta['input_shape'], meta.get('dtype', 'float32'), quantize=True)
+    print(f"Quantized {numpy_path} ({os.path.getsize(numpy_path)} bytes) to {output_path} ({os.path.getsize(output_path)} bytes)")
+    return output_path
+
+def serving_latency_ms(model, look_back: int, calls: int = 50) -> float:
+    """Median time of one single-window forecast step, the call the app makes per ticker and step."""
+    window = np.random.default_rng(0).random((1, look_back, 2)).astype('float32')
+    model.predict_on_batch(window)
+    timings = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        model.predict_on_batch(window)
+        timings.append(time.perf_counter() - started)
+    return float(np.median(timings) * 1000)
+
+def quantization_report(numpy_path: str, quantized_path: str, windows: np.ndarray,
+                        targets: Optional[np.ndarray] = None) -> dict:
+    """
+    Compares the quantized model with the float one on held-out windows: the error of its
+    predictions relative to the float model's (in scaled units, where prices span 0..1),
+    their errors against the targets when given, latency, and in-memory and file sizes. Both
+    models are loaded the way the ModelPool loads them, so latency and memory are what serving
+    would see. Without windows the error fields are left out, so the Predictor never serves the variant.
+    """
+    float_model = NumpyLSTMModel.load(numpy_path)
+    quantized_model = NumpyLSTMModel.load(quantized_path)
+    look_back = float_model.input_shape[1]
+    report = {
+        'windows': int(len(windows)),
+        'float_latency_ms': round(serving_latency_ms(float_model, look_back), 3),
+        'quantized_latency_ms': round(serving_latency_ms(quantized_model, look_back), 3),
+        'float_bytes': int(float_model.nbytes),
+        'quantized_bytes': int(quantized_model.nbytes),
+        'float_file_bytes': os.path.getsize(numpy_path),
+        'quantized_file_bytes': os.path.getsize(quantized_path),
+    }
+    if len(windows) == 0:
+        return report
+    float_predictions = float_model.predict(windows)
+    quantized_predictions = quantized_model.predict(windows)
+    difference = np.abs(quantized_predictions - float_predictions)
+    report.update(mean_abs_error=float(difference.mean()), max_abs_error=float(difference.max()))
+    if targets is not None:
+        report['float_mse'] = float(np.mean((float_predictions - targets) ** 2))
+        report['quantized_mse'] = float(np.mean((quantized_predictions - targets) ** 2))
+    return report
+
+def quantize_and_report(numpy_path: str, held_out, max_windows: int = 2048) -> Tuple[str, dict]:
+    """Quantizes a NumPy export and writes its report next to it, measured on (up to 'max_windows' of) a WindowedDataset."""
+    quantized_path = quantize_numpy_model(numpy_path)
+    windows, targets = held_out.take(held_out.starts[-max_windows:])
+    report = quantization_report(numpy_path, quantized_path, windows, targets)
+    with open(report_path_for(quantized_path), 'w') as f:
+        json.dump(report, f, indent=2)
+    accuracy = (f"mean abs error {report['mean_abs_error']:.6f}" if 'mean_abs_error' in report
+                else "no held-out windows, so the int8 variant won't be served")
+    print(f"Quantization: {accuracy}, "
+          f"latency {report['float_latency_ms']:.3f} -> {report['quantized_latency_ms']:.3f} ms, "
+          f"memory {report['float_bytes']} -> {report['quantized_bytes']} bytes")
+    return quantized_path, report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Quantize a NumPy model export to int8 and report its accuracy and latency.")
+    parser.add_argument("numpy_path", nargs="?", default="data/model/lstm_model.npz")
+    parser.add_argument("--ticker", default="AAPL", help="Ticker whose most recent bars are the held-out data.")
+    parser.add_argument("--scaler", default="data/model/scaler.pkl")
+    parser.add_argument("--period", default="1y")
+    args = parser.parse_args()
+    try:
+        import joblib
+        from scripts.dataset_pipeline import WindowedDataset
+        look_back = NumpyLSTMModel.load(args.numpy_path).input_shape[1]
+        held_out, _, _ = WindowedDataset.from_price_store([args.ticker], period=args.period, look_back=look_back,
+                                                          split_ratio=1.0, scaler=joblib.load(args.scaler))
+        _, report = quantize_and_report(args.numpy_path, held_out)
+        print(json.dumps(report, indent=2))
+    except Exception as e:
+        print(f"ERROR: Quantization failed: {e}")
+        sys.exit(1)
@@ -0,0 +1,246 @@
+# your_project/scripts/sweep.py
+
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import itertools
+import numpy as np
+import pandas as pd
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional
+from core.config import DATASET_CACHE_DIR
+from scripts.dataset_cache import DatasetCache
+from scripts.train_universe import limit_threads
+
+# The hyperparameters train_lstm_model used to hard-code, and the values searched by default.
+DEFAULT_SPACE = {
+    'units': [32, 50, 64],
+    'dropout': [0.1, 0.2],
+    'batch_size': [32, 64],
+    'look_back': [30, 60],
+    'patience': [3],
+}
+
+def sample_configs(space: Dict[str, list], num_trials: Optional[int] = None, seed: int = 0) -> List[dict]:
+    """The full grid of 'space', or 'num_trials' distinct configurations drawn from it at random."""
+    names = sorted(space)
+    grid = [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+    if num_trials is None or num_trials >= len(grid):
+        return grid
+    return random.Random(seed).sample(grid, num_trials)
+
+def rung_budgets(min_epochs: int, max_epochs: int, eta: int) -> List[int]:
+    """Cumulative epochs per successive-halving rung, e.g. 2, 6, 18 for eta=3."""
+    budgets = [min_epochs]
+    while budgets[-1] * eta <= max_epochs:
+        budgets.append(budgets[-1] * eta)
+    return budgets
+
+def successive_halving(configs: List[dict], run_rung: Callable[[List[dict]], List[dict]],
+                       budgets: List[int], eta: int = 3) -> List[dict]:
+    """
+    Trains every configuration for the first budget, keeps the best 1/eta by validation loss,
+    trains the survivors up to the next budget, and so on; losing trials are aborted early.
+    'run_rung' takes tasks ({'trial', 'config', 'rung', 'epochs', 'start_epoch'}) and returns one
+    result per task with at least 'trial' and 'val_loss'. Returns the latest result of every trial,
+    with its loss after each rung in 'rung_losses'.
+    """
+    latest = {}
+    survivors = list(range(len(configs)))
+    for rung, epochs in enumerate(budgets):
+        start_epoch = budgets[rung - 1] if rung else 0
+        tasks = [{'trial': trial, 'config': configs[trial], 'rung': rung, 'epochs': epochs, 'start_epoch': start_epoch}
+                 for trial in survivors]
+        for result in run_rung(tasks):
+            history = latest[result['trial']]['rung_losses'] if result['trial'] in latest else []
+            latest[result['trial']] = dict(result, rung_losses=history + [result.get('val_loss')])
+        ranked = sorted(survivors, key=lambda trial: _loss(latest[trial]))
+        if rung < len(budgets) - 1:
+            survivors = ranked[:max(1, math.ceil(len(ranked) / eta))]
+            print(f"Rung {rung} ({epochs} epochs): keeping {len(survivors)}/{len(ranked)} trials.")
+    return [latest[trial] for trial in sorted(latest)]
+
+SWEEP_FILE = "sweep.json"
+
+def _loss(result: dict) -> float:
+    loss = result.get('val_loss')
+    return float('inf') if loss is None or not np.isfinite(loss) else loss
+
+def _serving_latency_ms(numpy_path: str, look_back: int) -> float:
+    """Single-window latency through the NumPy engine the app serves with."""
+    from core.numpy_lstm import NumpyLSTMModel
+    from scripts.quantize_model import serving_latency_ms
+    return serving_latency_ms(NumpyLSTMModel.load(numpy_path), look_back)
+
+def _run_trial(task: dict, options: dict) -> dict:
+    """Trains one trial up to its rung budget, continuing from its previous rung; runs in a worker process."""
+    import joblib
+    import tensorflow as tf
+    from scripts.dataset_pipeline import WindowedDataset
+    from scripts.export_numpy_model import export_numpy_model
+    from scripts.train_model import build_lstm_model
+
+    config = task['config']
+    trial_dir = os.path.join(options['work_dir'], f"trial{task['trial']:03d}")
+    keras_path = os.path.join(trial_dir, "lstm_model.h5")
+    state_path = os.path.join(trial_dir, "state.keras") # native format keeps the optimizer state between rungs
+    result = dict(config, trial=task['trial'], rung=task['rung'], epochs=task['epochs'], val_loss=None,
+                  train_seconds=None, latency_ms=None, params=None, error=None)
+    try:
+        # Every trial with this look-back reads the same memory-mapped rows.
+        data, bounds, scaler = DatasetCache(options['cache_dir']).load(options['dataset_keys'][str(config['look_back'])])
+        train_data, val_data = WindowedDataset.from_rows(data, bounds.tolist(), config['look_back'], options['split_ratio'])
+        os.makedirs(trial_dir, exist_ok=True)
+        start_epoch = task['start_epoch']
+        if start_epoch and os.path.exists(state_path):
+            model = tf.keras.models.load_model(state_path)
+        else:
+            if start_epoch:
+                # Without the previous rung's state, a fresh model gets the whole budget, not just the remainder.
+                print(f"Trial {task['trial']}: no saved state in {trial_dir}; training {task['epochs']} epochs from scratch.")
+                start_epoch = 0
+            model = build_lstm_model(config['look_back'], units=config['units'], dropout=config['dropout'])
+            joblib.dump(scaler, os.path.join(trial_dir, "scaler.pkl"))
+
+        started = time.perf_counter()
+        model.fit(train_data.to_tf_dataset(batch_size=config['batch_size'], shuffle=True, seed=task['trial']),
+                  validation_data=val_data.to_tf_dataset(batch_size=256), epochs=task['epochs'],
+                  initial_epoch=start_epoch, verbose=0,
+                  callbacks=[tf.keras.callbacks.EarlyStopping(monitor='val_loss', patience=config['patience'],
+                                                              restore_best_weights=True)])
+        train_seconds = time.perf_counter() - started
+        val_loss = float(model.evaluate(val_data.to_tf_dataset(batch_size=256), verbose=0))
+        model.save(state_path)
+        model.save(keras_path)
+
+        numpy_path = export_numpy_model(keras_path)
+        previous = options.get('train_seconds', {}).get(str(task['trial']), 0.0)
+        result.update(val_loss=val_loss, train_seconds=round(previous + train_seconds, 2),
+                      latency_ms=round(_serving_latency_ms(numpy_path, config['look_back']), 3),
+                      params=int(model.count_params()))
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    return result
+
+def run_sweep(tickers: List[str], space: Optional[Dict[str, list]] = None, num_trials: Optional[int] = None,
+              period: str = "5y", split_ratio: float = 0.8, min_epochs: int = 2, max_epochs: int = 18, eta: int = 3,
+              workers: Optional[int] = None, threads_per_worker: int = 1, work_dir: str = "data/model/_sweep",
+              report_path: Optional[str] = None, seed: int = 0, data_fetcher=None) -> pd.DataFrame:
+    """
+    Hyperparameter sweep over 'space' (grid, or 'num_trials' random configurations) with
+    successive halving: all trials train for 'min_epochs', the best 1/eta continue to eta times
+    as many epochs, up to 'max_epochs'. Each rung runs in a pool of single-threaded worker
+    processes. Returns (and optionally writes as CSV) one row per trial with the rung it
+    reached, its validation loss, cumulative training time, serving latency and size.
+    """
+    from scripts.dataset_pipeline import WindowedDataset
+
+    configs = sample_configs(space or DEFAULT_SPACE, num_trials, seed)
+    budgets = rung_budgets(min_epochs, max_epochs, eta)
+    cache_dir = DATASET_CACHE_DIR or os.path.join(work_dir, "datasets")
+    cache = DatasetCache(cache_dir)
+
+    # Prepare each look-back's dataset once; workers memory-map the cached rows.
+    dataset_keys = {}
+    for look_back in sorted({config['look_back'] for config in configs}):
+        train_data, _, _ = WindowedDataset.from_price_store(tickers, period=period, look_back=look_back,
+                                                            split_ratio=split_ratio, data_fetcher=data_fetcher, cache=cache)
+        dataset_keys[str(look_back)] = train_data.cache_key
+
+    options = {'work_dir': work_dir, 'cache_dir': cache_dir, 'dataset_keys': dataset_keys,
+               'split_ratio': split_ratio, 'train_seconds': {}}
+    # What export_winner needs to publish a trial like train_model would.
+    os.makedirs(work_dir, exist_ok=True)
+    with open(os.path.join(work_dir, SWEEP_FILE), 'w') as f:
+        json.dump({'tickers': list(tickers), 'period': period, 'split_ratio': split_ratio, 'cache_dir': cache_dir,
+                   'dataset_keys': dataset_keys, 'parameters': sorted(space or DEFAULT_SPACE)}, f, indent=2)
+    cpus = os.cpu_count() or 1
+    workers = max(1, min(workers or cpus // threads_per_worker, len(configs)))
+    print(f"Sweeping {len(configs)} configurations over rungs {budgets} with {workers} workers...")
+
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'),
+                             initializer=limit_threads, initargs=(threads_per_worker,)) as executor:
+        def run_rung(tasks: List[dict]) -> List[dict]:
+            results = list(executor.map(_run_trial, tasks, itertools.repeat(dict(options))))
+            for result in results:
+                if result['train_seconds'] is not None:
+                    options['train_seconds'][str(result['trial'])] = result['train_seconds']
+            return results
+        results = successive_halving(configs, run_rung, budgets, eta)
+
+    table = pd.DataFrame(results).sort_values(['rung', 'val_loss'], ascending=[False, True], na_position='last')
+    table['trial_dir'] = [os.path.join(work_dir, f"trial{trial:03d}") for trial in table['trial']]
+    print(f"Sweep finished in {time.perf_counter() - started:.1f}s.")
+    print(table.drop(columns=['trial_dir', 'error']).to_string(index=False))
+    if report_path:
+        table.to_csv(report_path, index=False)
+    return table
+
+def best_trial(table: pd.DataFrame, max_latency_ms: Optional[float] = None) -> Optional[pd.Series]:
+    """The lowest-loss trial among those that reached the last rung, optionally within a latency budget."""
+    finished = table[(table['rung'] == table['rung'].max()) & table['val_loss'].notna()]
+    if max_latency_ms is not None:
+        finished = finished[finished['latency_ms'] <= max_latency_ms]
+    return None if finished.empty else finished.sort_values('val_loss').iloc[0]
+
+def export_winner(table: pd.DataFrame, key: str, registry_dir: str = "data/model",
+                  max_latency_ms: Optional[float] = None, promote: bool = True, data_fetcher=None) -> Optional[dict]:
+    """
+    Publishes the best trial to the registry under 'key' the way train_model does: exported,
+    quantized against the trial's validation windows and registered with its tickers, searched
+    parameters and results.
+    """
+    from scripts.dataset_pipeline import WindowedDataset
+    from scripts.train_model import publish_model
+
+    winner = best_trial(table, max_latency_ms)
+    if winner is None:
+        print("No trial finished within the latency budget; nothing exported.")
+        return None
+    trial_dir = winner['trial_dir']
+    with open(os.path.join(os.path.dirname(trial_dir), SWEEP_FILE)) as f:
+        sweep = json.load(f)
+    look_back = int(winner['look_back'])
+
+    # The validation windows the trial was scored on, from the cache or rebuilt from the price store.
+    cache = DatasetCache(sweep['cache_dir'])
+    cached = cache.load(sweep['dataset_keys'][str(look_back)])
+    if cached is not None:
+        data, bounds, _ = cached
+        _, held_out = WindowedDataset.from_rows(data, bounds.tolist(), look_back, sweep['split_ratio'])
+    else:
+        _, held_out, _ = WindowedDataset.from_price_store(sweep['tickers'], period=sweep['period'], look_back=look_back,
+                                                          split_ratio=sweep['split_ratio'], data_fetcher=data_fetcher,
+                                                          cache=cache)
+
+    metadata = {name: (value.item() if hasattr(value, 'item') else value) for name, value in winner.items()
+                if name in sweep['parameters'] or name in ('val_loss', 'latency_ms', 'params', 'epochs')}
+    metadata.update({'model_input': "window", 'period': sweep['period'], 'trained_by': "sweep"})
+    return publish_model(os.path.join(trial_dir, "lstm_model.h5"), os.path.join(trial_dir, "scaler.pkl"), held_out,
+                         key, registry_dir, sweep['tickers'], metadata, promote=promote)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Successive-halving hyperparameter sweep for the LSTM model.")
+    parser.add_argument("tickers", nargs="+")
+    parser.add_argument("--space", default=None, help="JSON object of parameter -> list of values.")
+    parser.add_argument("--trials", type=int, default=None, help="Random configurations instead of the full grid.")
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--min-epochs", type=int, default=2)
+    parser.add_argument("--max-epochs", type=int, default=18)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--report", default="sweep_results.csv")
+    parser.add_argument("--export", default=None, help="Registry key to publish the winner under.")
+    parser.add_argument("--max-latency-ms", type=float, default=None)
+    args = parser.parse_args()
+    space = dict(DEFAULT_SPACE, **json.loads(args.space)) if args.space else None
+    table = run_sweep(args.tickers, space=space, num_trials=args.trials, period=args.period, min_epochs=args.min_epochs,
+                      max_epochs=args.max_epochs, eta=args.eta, workers=args.workers, report_path=args.report)
+    if args.export:
+        sys.exit(0 if export_winner(table, args.export, max_latency_ms=args.max_latency_ms) else 1)
@@ -3,100 +3,136 @@
 import pandas as pd
 import numpy as np
 from sklearn.preprocessing import MinMaxScaler
-from sklearn.model_selection import train_test_split
 from tensorflow.keras.models import Sequential
 from tensorflow.keras.layers import LSTM, Dense, Dropout
 from tensorflow.keras.callbacks import EarlyStopping, ModelCheckpoint
 import os
 import joblib
-from core.data_fetcher import DataFetcher
+from typing import List, Optional
+from scripts.export_numpy_model import export_numpy_model
+from scripts.quantize_model import quantize_and_report
+from scripts.dataset_pipeline import WindowedDataset
+from scripts.dataset_cache import DatasetCache
+from core.model_registry import ModelRegistry
+from core.config import DATASET_CACHE_DIR
+
+def build_lstm_model(look_back: int = 60, units: int = 50, dropout: float = 0.2):
+    """The two-layer LSTM trained by train_lstm_model, compiled with Adam and MSE."""
+    model = Sequential([
+        LSTM(units=units, return_sequences=True, input_shape=(look_back, 2)), # Input shape for 2 features
+        Dropout(dropout),
+        LSTM(units=units, return_sequences=False),
+        Dropout(dropout),
+        Dense(units=2) # Output layer for 2 values (Open, Close)
+    ])
+    model.compile(optimizer='adam', loss='mean_squared_error')
+    return model
+
+def publish_model(keras_path: str, scaler_path: str, held_out: WindowedDataset, registry_key: str,
+                  registry_dir: str, tickers: List[str], metadata: dict, promote: bool = True) -> dict:
+    """
+    Exports a trained Keras model for TensorFlow-free serving, quantizes the export (checked on
+    the 'held_out' windows) and registers all of it as a new version of 'registry_key'.
+    """
+    numpy_path = export_numpy_model(keras_path)
+    quantized_path, quantization = quantize_and_report(numpy_path, held_out)
+    record = dict(metadata)
+    record['quantization'] = quantization
+    # Which tickers the model covers; the app serves a sector model to the tickers listed here.
+    record['tickers'] = list(tickers)
+    # The Keras checkpoint is kept with the version so it can be fine-tuned later (scripts/fine_tune_model.py).
+    return ModelRegistry(registry_dir).register(registry_key, numpy_path, scaler_path, metadata=record, promote=promote,
+                                                artifacts={'keras_model': keras_path, 'quantized_model': quantized_path})
 
 def train_lstm_model(ticker_symbol: str = "AAPL", period: str = "5y",
-                     look_back: int = 60, split_ratio: float = 0.8):
+                     look_back: int = 60, split_ratio: float = 0.8,
+                     tickers: Optional[List[str]] = None, registry_key: Optional[str] = None,
+                     model_dir: str = "data/model", registry_dir: Optional[str] = None,
+                     epochs: int = 100, metadata: Optional[dict] = None,
+                     dataset_cache_dir: Optional[str] = DATASET_CACHE_DIR, units: int = 50,
+                     dropout: float = 0.2, batch_size: int = 32, patience: int = 10) -> Optional[dict]:
     """
     Trains and saves a multivariate LSTM model for stock Open and Close price prediction.
     This script is designed to be run locally, and the generated files must be committed to Git.
+    With 'tickers', one model is trained on all of them (e.g. a sector model). Working files go
+    to 'model_dir'; the exported model is published to the registry in 'registry_dir' (default
+    'model_dir') under 'registry_key' (default the ticker). Preprocessed data is reused from
+    'dataset_cache_dir' when the same bars were prepared before. The defaults of units, dropout,
+    batch_size and patience are the hand-tuned ones; scripts/sweep.py searches them. Returns the
+    registered spec.
     """
-    print(f"Starting multivariate LSTM model training for {ticker_symbol}...")
-
-    # 1. Fetch Data
-    data_fetcher = DataFetcher()
-    df = data_fetcher.fetch_historical_data(ticker_symbol, period=period)
-    if df.empty or 'Open' not in df.columns or 'Close' not in df.columns:
-        print("Failed to fetch historical data or required columns missing. Aborting training.")
-        return
-
-    # Use 'Open' and 'Close' prices for training
-    data = df[['Open', 'Close']].values
-
-    # 2. Scale Data
-    scaler = MinMaxScaler(feature_range=(0, 1))
-    scaled_data = scaler.fit_transform(data)
+    tickers = tickers or [ticker_symbol]
+    registry_key = registry_key or ticker_symbol
+    print(f"Starting multivariate LSTM model training for {registry_key}...")
+
+    # 1. Fetch Data and 2. Scale Data ('Open' and 'Close' prices, one scaler across all tickers)
+    try:
+        train_data, test_data, scaler = WindowedDataset.from_price_store(
+            tickers, period=period, look_back=look_back, split_ratio=split_ratio,
+            cache=DatasetCache(dataset_cache_dir) if dataset_cache_dir else None)
+    except ValueError as e:
+        print(f"Failed to fetch historical data or required columns missing ({e}). Aborting training.")
+        return None
 
     # Save the fitted scaler
-    model_dir = "data/model"
     os.makedirs(model_dir, exist_ok=True)
     scaler_path = os.path.join(model_dir, "scaler.pkl")
     joblib.dump(scaler, scaler_path)
     print(f"Scaler saved to {scaler_path}")
 
-    # 3. Create Sequences for LSTM
-    X, y = [], []
-    for i in range(look_back, len(scaled_data)):
-        X.append(scaled_data[i-look_back:i, :])
-        y.append(scaled_data[i, :])
-    X, y = np.array(X), np.array(y)
-
-    if X.shape[0] == 0:
-        print(f"Not enough data points to create sequences with look_back={look_back}. Aborting training.")
-        return
-
-    # Reshape X for LSTM input: (samples, timesteps, features)
-    X = X.reshape(X.shape[0], X.shape[1], 2) # 2 features: Open and Close
-
-    # 4. Split Data
-    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=1-split_ratio, random_state=42, shuffle=False)
-    
-    print(f"Training data shape: {X_train.shape}")
-    print(f"Test data shape: {X_test.shape}")
+    # 3. Create Sequences for LSTM and 4. Split Data (both done by the dataset above)
+    # Windows are strided views over the scaled data, split chronologically per ticker
+    # and only copied one batch at a time.
+    print(f"Training windows: {len(train_data)} x ({look_back}, 2)")
+    print(f"Test windows: {len(test_data)} x ({look_back}, 2)")
+    train_ds = train_data.to_tf_dataset(batch_size=batch_size, shuffle=True, seed=42)
+    # A short history can leave no test windows; then training is monitored on its own loss.
+    test_ds = test_data.to_tf_dataset(batch_size=batch_size) if len(test_data) else None
+    monitor = 'val_loss' if test_ds is not None else 'loss'
 
     # 5. Build LSTM Model
-    model = Sequential([
-        LSTM(units=50, return_sequences=True, input_shape=(look_back, 2)), # Input shape for 2 features
-        Dropout(0.2),
-        LSTM(units=50, return_sequences=False),
-        Dropout(0.2),
-        Dense(units=2) # Output layer for 2 values (Open, Close)
-    ])
-
-    model.compile(optimizer='adam', loss='mean_squared_error')
+    model = build_lstm_model(look_back, units=units, dropout=dropout)
     model.summary()
 
     # Callbacks
-    early_stopping = EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True)
+    early_stopping = EarlyStopping(monitor=monitor, patience=patience, restore_best_weights=True)
     model_checkpoint = ModelCheckpoint(
         filepath=os.path.join(model_dir, "lstm_model.h5"),
-        monitor='val_loss',
+        monitor=monitor,
         save_best_only=True,
         verbose=1
     )
 
     # 6. Train Model
     model.fit(
-        X_train, y_train,
-        epochs=100,
-        batch_size=32,
-        validation_data=(X_test, y_test),
+        train_ds,
+        epochs=epochs,
+        validation_data=test_ds,
         callbacks=[early_stopping, model_checkpoint],
         verbose=1
     )
 
     print("Model training complete.")
-    train_loss = model.evaluate(X_train, y_train, verbose=0)
-    test_loss = model.evaluate(X_test, y_test, verbose=0)
+    train_loss = model.evaluate(train_ds, verbose=0)
+    test_loss = model.evaluate(test_ds, verbose=0) if test_ds is not None else None
     print(f"Train Loss: {train_loss:.4f}")
-    print(f"Test Loss: {test_loss:.4f}")
+    print(f"Test Loss: {test_loss:.4f}" if test_loss is not None else "Test Loss: n/a (no test windows)")
     print(f"Trained model saved to {os.path.join(model_dir, 'lstm_model.h5')}")
 
+    # 7. Export, quantize and publish for this ticker
+    record = dict(metadata or {})
+    record.update({
+        'model_input': "window",
+        'look_back': look_back,
+        'period': period,
+        'units': units,
+        'dropout': dropout,
+        'batch_size': batch_size,
+        'train_loss': float(train_loss),
+        'test_loss': float(test_loss) if test_loss is not None else None,
+    })
+    return publish_model(os.path.join(model_dir, "lstm_model.h5"), scaler_path, test_data, registry_key,
+                         registry_dir or model_dir, tickers, record)
+
 if __name__ == "__main__":
     train_lstm_model(ticker_symbol="AAPL", period="5y", look_back=60)
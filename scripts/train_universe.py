@@ -0,0 +1,161 @@
+# your_project/scripts/train_universe.py
+
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+from core.model_registry import ModelRegistry
+
+# TensorFlow is imported by the training job itself, after the worker has capped its thread pools.
+
+def read_universe(path: str) -> List[Tuple[str, Optional[str]]]:
+    """
+    Reads a universe file: one ticker per line, optionally followed by ',<sector>'.
+    Blank lines, '#' comments and a 'ticker,sector' header are ignored.
+    """
+    universe = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            fields = [field.strip() for field in line.split(',')]
+            if fields[0].lower() == 'ticker':
+                continue
+            universe.append((fields[0].upper(), fields[1] if len(fields) > 1 and fields[1] else None))
+    return universe
+
+def build_jobs(universe: List[Tuple[str, Optional[str]]], by: str = "ticker") -> List[dict]:
+    """One job per ticker, or with by='sector' one per sector trained on all of its tickers."""
+    if by == "ticker":
+        return [{'key': ticker, 'tickers': [ticker]} for ticker, _ in universe]
+    if by != "sector":
+        raise ValueError(f"Unsupported grouping '{by}'.")
+    sectors: Dict[str, List[str]] = {}
+    for ticker, sector in universe:
+        if sector is None:
+            print(f"Skipping {ticker}: no sector in the universe file.")
+            continue
+        sectors.setdefault(sector, []).append(ticker)
+    return [{'key': f"sector:{sector}", 'tickers': tickers} for sector, tickers in sectors.items()]
+
+def limit_threads(num_threads: int):
+    """Caps the BLAS and TensorFlow thread pools of this process; must run before TensorFlow starts."""
+    for name in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+                 'TF_NUM_INTRAOP_THREADS', 'TF_NUM_INTEROP_THREADS'):
+        os.environ[name] = str(num_threads)
+    os.environ.setdefault('TF_CPP_MIN_LOG_LEVEL', '3')
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(num_threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+def _train_job(job: dict, options: dict) -> dict:
+    """Trains and publishes one model; runs in a worker process. Failures are reported, not raised."""
+    from scripts.train_model import train_lstm_model
+    from scripts.fine_tune_model import fine_tune_lstm_model
+
+    started = time.perf_counter()
+    result = {'key': job['key'], 'tickers': job['tickers'], 'status': 'failed', 'version': None,
+              'test_loss': None, 'seconds': None, 'error': None}
+    try:
+        registered = ModelRegistry(options['registry_dir']).get(job['key'])
+        if options.get('incremental') and registered is not None:
+            spec = fine_tune_lstm_model(job['key'], period=options['period'], registry_dir=options['registry_dir'],
+                                        work_dir=os.path.join(options['work_dir'], ModelRegistry._directory_name(job['key'])))
+            if spec is None:
+                # Keep the registered version rather than silently retraining from scratch.
+                has_checkpoint = os.path.exists(registered.get('artifacts', {}).get('keras_model', ''))
+                result.update(status='skipped', version=registered['version'],
+                              error="not enough recent data to fine-tune" if has_checkpoint else "no Keras checkpoint to fine-tune")
+                result['seconds'] = round(time.perf_counter() - started, 2)
+                return result
+        else:
+            # Keys without a registered version get a full training run.
+            spec = train_lstm_model(
+                ticker_symbol=job['tickers'][0], tickers=job['tickers'], registry_key=job['key'],
+                period=options['period'], look_back=options['look_back'], epochs=options['epochs'],
+                model_dir=os.path.join(options['work_dir'], ModelRegistry._directory_name(job['key'])),
+                registry_dir=options['registry_dir'], metadata={'trained_by': "train_universe"})
+        if spec is not None:
+            current = ModelRegistry(options['registry_dir']).get(job['key'])
+            result.update(status='ok', version=spec['version'], test_loss=spec.get('test_loss'),
+                          promoted=current is not None and current['version'] == spec['version'])
+        else:
+            result['error'] = "not enough data"
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.perf_counter() - started, 2)
+    return result
+
+def train_universe(universe_path: str, by: str = "ticker", workers: Optional[int] = None,
+                   threads_per_worker: Optional[int] = None, period: str = "5y", look_back: int = 60,
+                   epochs: int = 100, registry_dir: str = "data/model", report_path: Optional[str] = None,
+                   incremental: bool = False) -> List[dict]:
+    """
+    Trains every model of a universe in a pool of worker processes and publishes each to the
+    model registry as it finishes. Each worker's TensorFlow and BLAS thread pools are capped
+    at 'threads_per_worker', so workers x threads never oversubscribes the CPU; by default
+    every core runs a single-threaded worker, which scales better than threads within one
+    small LSTM. One failing job doesn't stop the others. With 'incremental', registered
+    models are fine-tuned on their newest bars instead (see fine_tune_model.py) and only
+    keys without one are trained from scratch; a registered model that can't be fine-tuned
+    is kept and reported as 'skipped'. Returns one result per job.
+    """
+    jobs = build_jobs(read_universe(universe_path), by=by)
+    cpus = os.cpu_count() or 1
+    threads_per_worker = threads_per_worker or max(1, cpus // (workers or cpus))
+    workers = max(1, min(workers or cpus // threads_per_worker, len(jobs) or 1))
+    options = {'period': period, 'look_back': look_back, 'epochs': epochs, 'registry_dir': registry_dir,
+               'work_dir': os.path.join(registry_dir, "_build"), 'incremental': incremental}
+    print(f"Training {len(jobs)} models with {workers} workers x {threads_per_worker} threads...")
+
+    started = time.perf_counter()
+    results = []
+    # Spawned rather than forked, so workers start without the parent's TensorFlow or thread state.
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context('spawn'),
+                             initializer=limit_threads, initargs=(threads_per_worker,)) as executor:
+        futures = {executor.submit(_train_job, job, options): job for job in jobs}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e: # the worker process itself died
+                job = futures[future]
+                result = {'key': job['key'], 'tickers': job['tickers'], 'status': 'failed', 'version': None,
+                          'test_loss': None, 'seconds': None, 'error': f"{type(e).__name__}: {e}"}
+            results.append(result)
+            print(f"[{len(results)}/{len(jobs)}] {result['key']}: {result['status']}"
+                  f"{' ' + result['version'] if result['version'] else ''}"
+                  f"{' (' + result['error'] + ')' if result['error'] else ''}")
+
+    elapsed = time.perf_counter() - started
+    succeeded = sum(result['status'] == 'ok' for result in results)
+    skipped = sum(result['status'] == 'skipped' for result in results)
+    print(f"Trained {succeeded}/{len(jobs)} models in {elapsed:.1f}s"
+          f"{f' ({skipped} skipped)' if skipped else ''}.")
+    if report_path:
+        with open(report_path, 'w') as f:
+            json.dump({'elapsed_seconds': round(elapsed, 2), 'workers': workers,
+                       'threads_per_worker': threads_per_worker, 'results': results}, f, indent=2)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train and publish models for a universe of tickers in parallel.")
+    parser.add_argument("universe", help="File with one ticker per line, optionally 'TICKER,Sector'.")
+    parser.add_argument("--by", choices=["ticker", "sector"], default="ticker")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per core).")
+    parser.add_argument("--threads-per-worker", type=int, default=None)
+    parser.add_argument("--period", default="5y")
+    parser.add_argument("--look-back", type=int, default=60)
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--registry-dir", default="data/model")
+    parser.add_argument("--report", default=None, help="Write a JSON summary of every job here.")
+    parser.add_argument("--incremental", action="store_true", help="Fine-tune registered models instead of retraining.")
+    args = parser.parse_args()
+    results = train_universe(args.universe, by=args.by, workers=args.workers, threads_per_worker=args.threads_per_worker,
+                             period=args.period, look_back=args.look_back, epochs=args.epochs,
+                             registry_dir=args.registry_dir, report_path=args.report, incremental=args.incremental)
+    sys.exit(0 if results and all(result['status'] in ('ok', 'skipped') for result in results) else 1)
@@ -2,12 +2,16 @@
 
 import pytest
 import pandas as pd
+import numpy as np
 from unittest.mock import patch, MagicMock
 import os
 import ta # Technical Analysis library
 
 # Adjust imports based on your exact project structure
 from core.data_fetcher import DataFetcher
+from core.market_calendar import MarketCalendar
+from core.frame_cache import FrameCache
+from core.indicators import IndicatorCache, IndicatorEngine
 
 # --- Fixtures ---
 
@@ -38,7 +42,9 @@ def data_fetcher_instance():
     os.makedirs(test_cache_dir)
 
     # Patch the cache_dir to point to our test directory
-    with patch('core.data_fetcher.DataFetcher.cache_dir', test_cache_dir):
+    with patch('core.data_fetcher.DataFetcher.cache_dir', test_cache_dir), \
+         patch('core.data_fetcher.DataFetcher._memory_cache', FrameCache(64 * 1024 * 1024)), \
+         patch('core.data_fetcher.DataFetcher._indicator_cache', IndicatorCache(16 * 1024 * 1024)):
         yield DataFetcher()
     
     # Clean up after test
@@ -53,7 +59,7 @@ def test_fetch_historical_data_fresh(data_fetcher_instance, mock_yfinance_histor
     """Test fetching fresh historical data and caching."""
     ticker = "TEST"
     period = "1mo"
-    cache_path = os.path.join(data_fetcher_instance.cache_dir, f"{ticker}_{period}.csv")
+    cache_path = os.path.join(data_fetcher_instance.cache_dir, f"{ticker}.npz")
 
     # Mock yfinance.Ticker and its history method
     with patch('yfinance.Ticker') as mock_ticker:
@@ -73,10 +79,10 @@ def test_fetch_historical_data_from_cache(data_fetcher_instance, mock_yfinance_h
     """Test fetching historical data from cache."""
     ticker = "TEST2"
     period = "1mo"
-    cache_path = os.path.join(data_fetcher_instance.cache_dir, f"{ticker}_{period}.csv")
 
-    # Manually create a cached file
-    mock_yfinance_history.to_csv(cache_path)
+    # Manually populate the price store with a history ending today
+    mock_yfinance_history.index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=len(mock_yfinance_history))
+    data_fetcher_instance.store.save(ticker, mock_yfinance_history, "3mo")
 
     # Mock yfinance.Ticker to ensure it's NOT called
     with patch('yfinance.Ticker') as mock_ticker:
@@ -84,7 +90,49 @@ def test_fetch_historical_data_from_cache(data_fetcher_instance, mock_yfinance_h
 
         mock_ticker.assert_not_called() # Crucial: should not call yfinance if cached
         assert not df.empty
-        pd.testing.assert_frame_equal(df, mock_yfinance_history)
+        pd.testing.assert_frame_equal(df, mock_yfinance_history, check_freq=False)
+
+def test_fetch_historical_data_periods_share_one_file(data_fetcher_instance, mock_yfinance_history):
+    """Test that shorter periods are sliced from the stored history instead of cached separately."""
+    ticker = "TEST3"
+    mock_yfinance_history.index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=len(mock_yfinance_history))
+
+    with patch('yfinance.Ticker') as mock_ticker:
+        mock_ticker.return_value.history.return_value = mock_yfinance_history.copy()
+        data_fetcher_instance.fetch_historical_data(ticker, "1y")
+        df_5d = data_fetcher_instance.fetch_historical_data(ticker, "5d")
+        df_1d = data_fetcher_instance.fetch_historical_data(ticker, "1d")
+
+        mock_ticker.return_value.history.assert_called_once_with(period="1y")
+
+    assert os.listdir(data_fetcher_instance.cache_dir) == [f"{ticker}.npz"]
+    pd.testing.assert_frame_equal(df_5d, mock_yfinance_history.iloc[-5:], check_freq=False)
+    pd.testing.assert_frame_equal(df_1d, mock_yfinance_history.iloc[-1:], check_freq=False)
+
+def test_fetch_historical_data_longer_period_refetches(data_fetcher_instance, mock_yfinance_history):
+    """Test that asking for more history than is stored re-fetches the longer period."""
+    ticker = "TEST4"
+    mock_yfinance_history.index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=len(mock_yfinance_history))
+    data_fetcher_instance.store.save(ticker, mock_yfinance_history, "1mo")
+
+    with patch('yfinance.Ticker') as mock_ticker:
+        mock_ticker.return_value.history.return_value = mock_yfinance_history.copy()
+        data_fetcher_instance.fetch_historical_data(ticker, "5y")
+        mock_ticker.return_value.history.assert_called_once_with(period="5y")
+
+    _, meta = data_fetcher_instance.store.load(ticker)
+    assert meta['period'] == "5y"
+
+def test_price_store_round_trip_keeps_dtypes_and_timezone(data_fetcher_instance, mock_yfinance_history):
+    """Test that the columnar store restores dtypes and a tz-aware index exactly."""
+    df = mock_yfinance_history.copy()
+    df.index = df.index.tz_localize('America/New_York')
+    df.index.name = 'Date'
+    data_fetcher_instance.store.save("TZ", df, "max")
+
+    loaded, meta = data_fetcher_instance.store.load("TZ")
+    assert meta['covered_start'] is None
+    pd.testing.assert_frame_equal(loaded, df, check_freq=False)
 
 def test_calculate_rsi(data_fetcher_instance, mock_yfinance_history):
     """Test RSI calculation."""
@@ -128,3 +176,301 @@ def test_calculate_macd_no_close_column(data_fetcher_instance, mock_yfinance_his
     df_no_close = mock_yfinance_history.drop(columns=['Close'])
     macd_df = data_fetcher_instance.calculate_macd(df_no_close)
     assert macd_df.empty
+
+def test_fetch_historical_data_appends_only_missing_bars(data_fetcher_instance, mock_yfinance_history):
+    """Test that a stale history fetches only bars from the last cached session and reconciles the overlap."""
+    ticker = "DELTA"
+    full = mock_yfinance_history.copy()
+    last_session = data_fetcher_instance.calendar.last_completed_session()
+    full.index = pd.bdate_range(end=last_session, periods=len(full))
+    stale = full.iloc[:-2].copy()
+    stale.iloc[-1, stale.columns.get_loc('Close')] = 1.0 # Partial last session
+    data_fetcher_instance.store.save(ticker, stale, "1mo")
+
+    with patch('yfinance.Ticker') as mock_ticker:
+        mock_ticker.return_value.history.return_value = full.iloc[-3:].copy()
+        df = data_fetcher_instance.fetch_historical_data(ticker, "1mo")
+
+        mock_ticker.return_value.history.assert_called_once_with(start=stale.index[-1].strftime('%Y-%m-%d'))
+
+    pd.testing.assert_frame_equal(df, full, check_freq=False)
+    stored, meta = data_fetcher_instance.store.load(ticker)
+    pd.testing.assert_frame_equal(stored, full, check_freq=False)
+    assert meta['period'] == "1mo"
+
+# --- Trading calendar freshness ---
+
+def _ny(ts: str) -> pd.Timestamp:
+    return pd.Timestamp(ts, tz=MarketCalendar.TIMEZONE)
+
+def test_market_calendar_holidays():
+    """Test a few NYSE holidays, including observed and Easter-based ones."""
+    calendar = MarketCalendar()
+    import datetime
+    assert not calendar.is_trading_day(datetime.date(2024, 3, 29))   # Good Friday
+    assert not calendar.is_trading_day(datetime.date(2024, 11, 28))  # Thanksgiving
+    assert not calendar.is_trading_day(datetime.date(2022, 12, 26))  # Christmas observed on Monday
+    assert not calendar.is_trading_day(datetime.date(2026, 7, 3))    # Independence Day observed on Friday
+    assert calendar.is_trading_day(datetime.date(2021, 12, 31))      # Saturday New Year's is not observed
+    assert calendar.last_completed_session(_ny('2024-07-05 08:00')) == datetime.date(2024, 7, 3)
+
+def test_cache_fresh_over_weekend_and_before_open():
+    """Test that Friday's completed bar stays fresh through the weekend and Monday pre-open."""
+    calendar = MarketCalendar()
+    friday_bar = _ny('2024-06-07')
+    fetched_at = _ny('2024-06-07 18:00')
+    assert calendar.is_fresh(friday_bar, fetched_at, intraday_ttl=900, now=_ny('2024-06-08 12:00'))
+    assert calendar.is_fresh(friday_bar, fetched_at, intraday_ttl=900, now=_ny('2024-06-10 08:30'))
+    # A bar fetched mid-session on Friday was partial and must be refreshed.
+    assert not calendar.is_fresh(friday_bar, _ny('2024-06-07 14:00'), intraday_ttl=900, now=_ny('2024-06-08 12:00'))
+    # Once Monday's session closes, Friday's bar is no longer the latest.
+    assert not calendar.is_fresh(friday_bar, fetched_at, intraday_ttl=900, now=_ny('2024-06-10 16:30'))
+
+def test_cache_intraday_ttl_while_market_open():
+    """Test that during the session a bar is fresh only within the intraday TTL."""
+    calendar = MarketCalendar()
+    today_bar = _ny('2024-06-10')
+    assert calendar.is_fresh(today_bar, _ny('2024-06-10 11:00'), intraday_ttl=900, now=_ny('2024-06-10 11:10'))
+    assert not calendar.is_fresh(today_bar, _ny('2024-06-10 11:00'), intraday_ttl=900, now=_ny('2024-06-10 11:20'))
+    # Yesterday's completed data fetched before the open doesn't cover today's session.
+    assert not calendar.is_fresh(_ny('2024-06-07'), _ny('2024-06-10 09:00'), intraday_ttl=900, now=_ny('2024-06-10 09:40'))
+
+def test_fetch_historical_data_weekend_read_uses_cache(data_fetcher_instance, mock_yfinance_history):
+    """Test that a weekend read of Friday's completed history does not touch the network."""
+    ticker = "WKND"
+    mock_yfinance_history.index = pd.bdate_range(end='2024-06-07', periods=len(mock_yfinance_history))
+    data_fetcher_instance.store.save(ticker, mock_yfinance_history, "max")
+
+    with patch('yfinance.Ticker') as mock_ticker, \
+         patch.object(MarketCalendar, 'now', return_value=_ny('2024-06-09 10:00')):
+        df = data_fetcher_instance.fetch_historical_data(ticker, "max")
+        mock_ticker.assert_not_called()
+    assert len(df) == len(mock_yfinance_history)
+
+def test_fetch_many_populates_cache_and_reports_failures(data_fetcher_instance, mock_yfinance_history):
+    """Test bulk fetching: successes are cached per ticker, failures are reported per ticker."""
+    history = mock_yfinance_history.copy()
+    history.index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=len(history))
+
+    def make_ticker(symbol):
+        ticker = MagicMock()
+        if symbol == "BROKEN":
+            ticker.history.side_effect = RuntimeError("HTTP 404")
+        elif symbol == "EMPTY":
+            ticker.history.return_value = pd.DataFrame()
+        else:
+            ticker.history.return_value = history.copy()
+        return ticker
+
+    with patch('yfinance.Ticker', side_effect=make_ticker) as mock_ticker:
+        frames, failures = data_fetcher_instance.fetch_many(["AAA", "BROKEN", "BBB", "EMPTY", "AAA"], "1mo", max_workers=4)
+        assert mock_ticker.call_count == 4 # Duplicates are fetched once
+
+    assert list(frames) == ["AAA", "BBB"]
+    pd.testing.assert_frame_equal(frames["BBB"], history, check_freq=False)
+    assert failures["BROKEN"] == "HTTP 404"
+    assert "No data found" in failures["EMPTY"]
+    assert sorted(os.listdir(data_fetcher_instance.cache_dir)) == ["AAA.npz", "BBB.npz"]
+
+    # A second warm-up is served entirely from the store.
+    with patch('yfinance.Ticker') as mock_ticker:
+        frames, _ = data_fetcher_instance.fetch_many(["AAA", "BBB"], "1mo")
+        mock_ticker.assert_not_called()
+    assert list(frames) == ["AAA", "BBB"]
+
+def test_concurrent_fetches_share_one_download(data_fetcher_instance, mock_yfinance_history):
+    """Test that concurrent requests for the same ticker and period coalesce into one network call."""
+    import threading
+    history = mock_yfinance_history.copy()
+    history.index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=len(history))
+    release = threading.Event()
+
+    def slow_history(**kwargs):
+        release.wait(timeout=5)
+        return history.copy()
+
+    results = []
+    with patch('yfinance.Ticker') as mock_ticker:
+        mock_ticker.return_value.history.side_effect = slow_history
+        threads = [threading.Thread(target=lambda: results.append(data_fetcher_instance.fetch_historical_data("HOT", "1mo")))
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        while not mock_ticker.return_value.history.called:
+            release.wait(0.01)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert mock_ticker.return_value.history.call_count == 1
+
+    assert len(results) == 8
+    assert len({id(df) for df in results}) == 8 # Every caller owns its frame
+    for df in results:
+        pd.testing.assert_frame_equal(df, history, check_freq=False)
+    assert os.listdir(data_fetcher_instance.cache_dir) == ["HOT.npz"] # No temporary files left behind
+
+# --- In-memory frame cache ---
+
+def test_frame_cache_lru_eviction_by_bytes(mock_yfinance_history):
+    """Test that the cache evicts least recently used frames to stay within its byte budget."""
+    frame_bytes = int(mock_yfinance_history.memory_usage(deep=True).sum())
+    cache = FrameCache(max_bytes=frame_bytes * 2)
+    cache.put("A", mock_yfinance_history)
+    cache.put("B", mock_yfinance_history)
+    assert cache.get("A") is not None # "A" becomes most recently used
+    cache.put("C", mock_yfinance_history)
+
+    assert cache.get("B") is None
+    assert cache.get("A") is not None and cache.get("C") is not None
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 2
+    assert stats['bytes'] <= stats['max_bytes']
+    assert (stats['hits'], stats['misses']) == (3, 1)
+
+def test_frame_cache_returns_read_only_views(mock_yfinance_history):
+    """Test that callers can add columns to cached frames but cannot overwrite shared values."""
+    cache = FrameCache(max_bytes=1024 * 1024)
+    cache.put("A", mock_yfinance_history)
+    view, _ = cache.get("A")
+    view['RSI'] = 50.0
+    with pytest.raises(ValueError):
+        view.iloc[0, 0] = -1.0
+
+    fresh_view, _ = cache.get("A")
+    assert 'RSI' not in fresh_view.columns
+    pd.testing.assert_frame_equal(fresh_view, mock_yfinance_history, check_freq=False)
+
+def test_frame_cache_version_mismatch_invalidates(mock_yfinance_history):
+    """Test that a newer version of the source drops the cached frame."""
+    cache = FrameCache(max_bytes=1024 * 1024)
+    cache.put("A", mock_yfinance_history, version=1)
+    assert cache.get("A", version=2) is None
+    assert cache.stats()['entries'] == 0
+
+def test_fetch_historical_data_served_from_memory(data_fetcher_instance, mock_yfinance_history):
+    """Test that repeated reads skip the disk store and fresher bars replace the cached copy."""
+    ticker = "MEM"
+    mock_yfinance_history.index = pd.date_range(end=pd.Timestamp.today().normalize(), periods=len(mock_yfinance_history))
+    data_fetcher_instance.store.save(ticker, mock_yfinance_history, "3mo")
+    data_fetcher_instance.fetch_historical_data(ticker, "1mo")
+
+    with patch.object(data_fetcher_instance.store, 'load', wraps=data_fetcher_instance.store.load) as mock_load:
+        df = data_fetcher_instance.fetch_historical_data(ticker, "1mo")
+        mock_load.assert_not_called()
+    assert len(df) == len(mock_yfinance_history)
+    assert DataFetcher.cache_stats()['hits'] >= 1
+
+    # Another process rewrote the store with a fresher bar: the memory copy must not be served.
+    fresher = mock_yfinance_history.copy()
+    fresher.iloc[-1, fresher.columns.get_loc('Close')] = 999.0
+    data_fetcher_instance.store.save(ticker, fresher, "3mo")
+    df = data_fetcher_instance.fetch_historical_data(ticker, "1mo")
+    assert df['Close'].iloc[-1] == 999.0
+
+# --- Fused indicator engine ---
+
+@pytest.fixture
+def random_walk_df():
+    """A long random-walk price history, enough for every indicator window."""
+    rng = np.random.default_rng(7)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 500)))
+    return pd.DataFrame({'Close': close}, index=pd.bdate_range('2022-01-03', periods=500))
+
+def test_calculate_indicators_matches_ta(data_fetcher_instance, random_walk_df):
+    """Test that the fused engine matches the 'ta' library (fillna=True) and TradingEngine volatility."""
+    from core.trading_engine import TradingEngine
+    close = random_walk_df['Close']
+    indicators = data_fetcher_instance.calculate_indicators(random_walk_df)
+    macd = ta.trend.MACD(close, window_slow=26, window_fast=12, window_sign=9, fillna=True)
+    bb = ta.volatility.BollingerBands(close, window=20, window_dev=2, fillna=True)
+    expected = {
+        'RSI': ta.momentum.RSIIndicator(close, window=14, fillna=True).rsi(),
+        'MACD': macd.macd(), 'MACD_Signal': macd.macd_signal(), 'MACD_Diff': macd.macd_diff(),
+        'BBL': bb.bollinger_lband(), 'BBM': bb.bollinger_mavg(), 'BBU': bb.bollinger_hband(),
+    }
+    for column, series in expected.items():
+        np.testing.assert_allclose(indicators[column].to_numpy(), series.to_numpy(), rtol=1e-9, atol=1e-8, err_msg=column)
+
+    log_returns = np.log(close / close.shift(1)).dropna()
+    expected_volatility = log_returns.rolling(window=20).std() * np.sqrt(252)
+    np.testing.assert_allclose(indicators['Volatility'].iloc[1:].to_numpy(), expected_volatility.to_numpy(), rtol=1e-9)
+    assert indicators['Volatility'].iloc[-1] == pytest.approx(TradingEngine().calculate_volatility(close))
+
+def test_calculate_bollinger_bands_short_history(data_fetcher_instance, mock_yfinance_history):
+    """Test Bollinger Bands over fewer rows than the window (partial windows, like ta's fillna)."""
+    bands = data_fetcher_instance.calculate_bollinger_bands(mock_yfinance_history.iloc[:5])
+    expected = ta.volatility.BollingerBands(mock_yfinance_history['Close'].iloc[:5], window=20, window_dev=2, fillna=True)
+    np.testing.assert_allclose(bands['BBU'].to_numpy(), expected.bollinger_hband().to_numpy())
+    np.testing.assert_allclose(bands['BBL'].to_numpy(), expected.bollinger_lband().to_numpy())
+
+# --- Streaming indicator state ---
+
+def test_get_indicators_advances_state_for_appended_bars(data_fetcher_instance, random_walk_df):
+    """Test that appended and revised bars are applied incrementally and match a full recompute."""
+    from core.indicators import IndicatorEngine
+    ticker = "STREAM"
+    data_fetcher_instance.store.save(ticker, random_walk_df.iloc[:400], "max")
+    initial = data_fetcher_instance.get_indicators(ticker)
+    pd.testing.assert_frame_equal(initial, IndicatorEngine().compute(random_walk_df["Close"].iloc[:400]), check_freq=False)
+
+    # Append bars, then revise the last (partial) one: neither may trigger a full recompute.
+    revised = random_walk_df.copy()
+    revised.iloc[-1, 0] *= 1.01
+    with patch.object(IndicatorEngine, 'compute', side_effect=AssertionError("full recompute")):
+        data_fetcher_instance.store.save(ticker, random_walk_df, "max")
+        data_fetcher_instance.get_indicators(ticker)
+        data_fetcher_instance.store.save(ticker, revised, "max")
+        streamed = data_fetcher_instance.get_indicators(ticker, revised.iloc[-50:])
+
+    expected = IndicatorEngine().compute(revised['Close']).iloc[-50:]
+    pd.testing.assert_frame_equal(streamed, expected, check_exact=False, rtol=1e-9, check_freq=False)
+
+def test_get_indicators_recomputes_rewritten_history(data_fetcher_instance, random_walk_df):
+    """Test that a history rewritten in the past (e.g. re-adjusted for a split) is fully recomputed."""
+    from core.indicators import IndicatorEngine
+    ticker = "SPLIT"
+    data_fetcher_instance.store.save(ticker, random_walk_df.iloc[:400], "max")
+    data_fetcher_instance.get_indicators(ticker)
+
+    adjusted = random_walk_df.copy()
+    adjusted['Close'] /= 2
+    data_fetcher_instance.store.save(ticker, adjusted, "max")
+    with patch.object(IndicatorEngine, 'compute', wraps=IndicatorEngine().compute) as mock_compute:
+        indicators = data_fetcher_instance.get_indicators(ticker)
+        mock_compute.assert_called_once()
+    pd.testing.assert_frame_equal(indicators, IndicatorEngine().compute(adjusted["Close"]), check_freq=False)
+
+# --- Indicator result cache ---
+
+def test_indicator_results_are_memoized_per_data_and_params(data_fetcher_instance, random_walk_df):
+    """Test that repeated calls skip the math, while new params or new data are recomputed."""
+    random_walk_df.attrs['ticker'] = "MEMO"
+    first = data_fetcher_instance.calculate_macd(random_walk_df)
+    with patch.object(IndicatorEngine, 'macd', side_effect=AssertionError("recomputed")):
+        again = data_fetcher_instance.calculate_macd(random_walk_df.copy())
+    pd.testing.assert_frame_equal(first, again)
+
+    with patch.object(IndicatorEngine, 'macd', wraps=IndicatorEngine.macd) as mock_macd:
+        data_fetcher_instance.calculate_macd(random_walk_df, window_fast=5)
+        changed = random_walk_df.copy()
+        changed.iloc[-1, 0] += 1.0
+        data_fetcher_instance.calculate_macd(changed)
+        assert mock_macd.call_count == 2
+
+    stats = DataFetcher.indicator_cache_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 3
+
+def test_indicator_cache_disk_tier(tmp_path, random_walk_df):
+    """Test that a fresh process (new cache instance) is served from the on-disk tier."""
+    engine = IndicatorEngine()
+    compute = lambda: engine.compute(random_walk_df['Close'])
+    IndicatorCache(1024 * 1024, disk_dir=str(tmp_path)).get_or_compute("DISK", random_walk_df['Close'], 'indicators', vars(engine), compute)
+
+    fresh = IndicatorCache(1024 * 1024, disk_dir=str(tmp_path))
+    result = fresh.get_or_compute("DISK", random_walk_df['Close'], 'indicators', vars(engine),
+                                  lambda: pytest.fail("should be served from disk"))
+    pd.testing.assert_frame_equal(result, compute(), check_freq=False)
+    assert fresh.stats()['disk_hits'] == 1
@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import MagicMock
+from sklearn.preprocessing import MinMaxScaler
+from scripts.dataset_pipeline import WindowedDataset
+
+def _loop_windows(series, look_back):
+    """Reference: the per-window loop train_model.py used to run."""
+    X, y = [], []
+    for i in range(look_back, len(series)):
+        X.append(series[i-look_back:i, :])
+        y.append(series[i, :])
+    return np.array(X), np.array(y)
+
+def test_windows_match_loop_and_share_memory():
+    series = np.random.default_rng(0).random((200, 2)).astype('float32')
+    dataset, validation = WindowedDataset.from_series([series], look_back=20)
+
+    assert validation is None
+    X, y = dataset.arrays()
+    expected_X, expected_y = _loop_windows(series, 20)
+    np.testing.assert_array_equal(X, expected_X)
+    np.testing.assert_array_equal(y, expected_y)
+    # The full window set is only a strided view of the raw rows.
+    assert np.shares_memory(dataset.windows_view, dataset.data)
+    assert dataset.windows_view.shape == (181, 20, 2)
+
+def test_windows_never_cross_tickers():
+    a = np.zeros((50, 2), dtype='float32')
+    b = np.ones((40, 2), dtype='float32')
+    dataset, _ = WindowedDataset.from_series([a, b, np.zeros((5, 2))], look_back=10)
+
+    assert len(dataset) == (50 - 10) + (40 - 10)
+    X, y = dataset.arrays()
+    for window, target in zip(X, y):
+        # Every window and its target come from a single series.
+        assert len(np.unique(np.append(window, target))) == 1
+
+def test_chronological_split_per_series():
+    a = np.arange(120, dtype='float32').reshape(60, 2)
+    b = np.arange(1000, 1120, dtype='float32').reshape(60, 2)
+    train, validation = WindowedDataset.from_series([a, b], look_back=10, split_ratio=0.8)
+
+    assert len(train) == 80 and len(validation) == 20
+    _, train_y = train.arrays()
+    _, val_y = validation.arrays()
+    for lo, hi in ((0, 120), (1000, 1120)):
+        train_rows = train_y[(train_y[:, 0] >= lo) & (train_y[:, 0] < hi)]
+        val_rows = val_y[(val_y[:, 0] >= lo) & (val_y[:, 0] < hi)]
+        assert train_rows[:, 0].max() < val_rows[:, 0].min()
+
+def test_batches_cover_every_window_once():
+    series = np.random.default_rng(1).random((100, 2))
+    dataset, _ = WindowedDataset.from_series([series], look_back=10)
+    batches = list(dataset.batches(batch_size=16, shuffle=True, seed=3))
+
+    assert [len(X) for X, _ in batches] == [16] * 5 + [10]
+    targets = np.concatenate([y for _, y in batches])
+    np.testing.assert_array_equal(np.sort(targets[:, 0]), np.sort(dataset.arrays()[1][:, 0]))
+
+def test_from_price_store_fits_one_scaler_and_skips_short_histories():
+    dates = pd.bdate_range('2023-01-02', periods=80)
+    frames = {
+        'AAA': pd.DataFrame({'Open': np.linspace(10, 20, 80), 'Close': np.linspace(11, 21, 80)}, index=dates),
+        'BBB': pd.DataFrame({'Open': np.linspace(100, 200, 80), 'Close': np.linspace(101, 201, 80)}, index=dates),
+        'NEW': pd.DataFrame({'Open': [1.0], 'Close': [1.0]}, index=dates[:1]),
+    }
+    fetcher = MagicMock()
+    fetcher.fetch_historical_data.side_effect = lambda ticker, period: frames[ticker]
+    train, validation, scaler = WindowedDataset.from_price_store(['AAA', 'BBB', 'NEW'], look_back=20,
+                                                                 split_ratio=0.75, data_fetcher=fetcher)
+
+    assert len(train) + len(validation) == 2 * (80 - 20)
+    np.testing.assert_allclose(scaler.data_min_, [10, 11])
+    np.testing.assert_allclose(scaler.data_max_, [200, 201])
+
+def test_from_series_rejects_short_data():
+    with pytest.raises(ValueError):
+        WindowedDataset.from_series([np.zeros((5, 2))], look_back=10)
+
+def test_tf_dataset_streams_batches():
+    pytest.importorskip("tensorflow")
+    series = np.random.default_rng(2).random((60, 2))
+    dataset, _ = WindowedDataset.from_series([series], look_back=10)
+    tf_dataset = dataset.to_tf_dataset(batch_size=8, shuffle=True, seed=0)
+
+    epochs = [[y.numpy() for _, y in tf_dataset] for _ in range(2)]
+    assert [len(y) for y in epochs[0]] == [8] * 6 + [2]
+    assert sum(len(y) for y in epochs[1]) == 50
+    # A new shuffle order each epoch.
+    assert not np.array_equal(np.concatenate(epochs[0]), np.concatenate(epochs[1]))
+
+def _price_frames():
+    dates = pd.bdate_range('2023-01-02', periods=120)
+    return {
+        'AAA': pd.DataFrame({'Open': np.linspace(10, 20, 120), 'Close': np.linspace(11, 21, 120)}, index=dates),
+        'BBB': pd.DataFrame({'Open': np.linspace(100, 200, 120), 'Close': np.linspace(101, 201, 120)}, index=dates),
+    }
+
+def _fetcher(frames):
+    fetcher = MagicMock()
+    fetcher.fetch_historical_data.side_effect = lambda ticker, period: frames[ticker]
+    return fetcher
+
+def test_dataset_cache_serves_memory_mapped_rows(tmp_path):
+    from scripts.dataset_cache import DatasetCache
+    frames = _price_frames()
+    cache = DatasetCache(str(tmp_path / "datasets"))
+    first = WindowedDataset.from_price_store(['AAA', 'BBB'], look_back=20, data_fetcher=_fetcher(frames), cache=cache)
+    second = WindowedDataset.from_price_store(['AAA', 'BBB'], look_back=20, data_fetcher=_fetcher(frames), cache=cache)
+
+    assert cache.stats() == {'hits': 1, 'misses': 1}
+    for train in (first[0], second[0]):
+        assert isinstance(train.data, np.memmap) and train.data.mode == 'r'
+    for a, b in zip(first[:2], second[:2]):
+        np.testing.assert_array_equal(a.starts, b.starts)
+        for x, y in zip(a.arrays(), b.arrays()):
+            np.testing.assert_array_equal(x, y)
+    np.testing.assert_allclose(second[2].data_max_, first[2].data_max_)
+
+    # A revised bar, a different look-back or a given scaler is a different entry.
+    frames['AAA'].iloc[-1, 1] += 1.0
+    WindowedDataset.from_price_store(['AAA', 'BBB'], look_back=20, data_fetcher=_fetcher(frames), cache=cache)
+    WindowedDataset.from_price_store(['AAA', 'BBB'], look_back=30, data_fetcher=_fetcher(frames), cache=cache)
+    WindowedDataset.from_price_store(['AAA', 'BBB'], look_back=30, scaler=MinMaxScaler().fit([[0, 0], [500, 500]]),
+                                     data_fetcher=_fetcher(frames), cache=cache)
+    assert cache.stats() == {'hits': 1, 'misses': 4}
+
+def test_dataset_cache_evicts_oldest_entries(tmp_path):
+    from scripts.dataset_cache import DatasetCache
+    cache = DatasetCache(str(tmp_path / "datasets"), max_entries=2)
+    scaler = MinMaxScaler().fit([[0, 0], [1, 1]])
+    for key in ('a', 'b', 'c'):
+        cache.store(key, np.zeros((10, 2)), np.array([[0, 5]]), scaler)
+    assert cache.load('a') is None
+    assert cache.load('c') is not None
@@ -0,0 +1,75 @@
+import os
+import joblib
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock
+from sklearn.preprocessing import MinMaxScaler
+from core.model_registry import ModelRegistry
+from scripts.dataset_pipeline import WindowedDataset
+from scripts.fine_tune_model import split_recent, fine_tune_lstm_model
+
+def test_split_recent_holds_out_newest_and_replays_older():
+    a = np.arange(400, dtype='float32').reshape(200, 2)
+    b = np.arange(1000, 1300, dtype='float32').reshape(150, 2)
+    dataset, _ = WindowedDataset.from_series([a, b], look_back=10)
+    train, validation = split_recent(dataset, recent_windows=30, validation_windows=5, replay_ratio=0.5)
+
+    assert len(validation) == 2 * 5
+    assert len(train) == 2 * (30 + 15)
+    for first, last in dataset.bounds:
+        in_series = lambda starts: starts[(starts >= first) & (starts < last)]
+        held_out, trained = in_series(validation.starts), in_series(train.starts)
+        np.testing.assert_array_equal(held_out, np.arange(last - 5, last))
+        assert trained.max() < held_out.min()
+        # All of the recent windows, plus a sample of the older ones.
+        assert set(range(last - 35, last - 5)) <= set(trained.tolist())
+        assert (trained < last - 35).sum() == 15
+
+def test_split_recent_without_recent_windows_trains_on_nothing():
+    dataset, _ = WindowedDataset.from_series([np.arange(400, dtype='float32').reshape(200, 2)], look_back=10)
+    train, validation = split_recent(dataset, recent_windows=0, validation_windows=5, replay_ratio=1.0)
+    assert len(train) == 0 and len(validation) == 5
+
+def _ohlc_frame(n=300, seed=0):
+    close = 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, n))
+    return pd.DataFrame({'Open': close, 'Close': close}, index=pd.bdate_range('2022-01-03', periods=n))
+
+@pytest.fixture
+def registered_model(tmp_path):
+    tf = pytest.importorskip("tensorflow")
+    build = tmp_path / "build"
+    build.mkdir()
+    model = tf.keras.Sequential([tf.keras.Input((20, 2)), tf.keras.layers.LSTM(4), tf.keras.layers.Dense(2)])
+    model.save(str(build / "lstm_model.h5"))
+    model.save(str(build / "stand_in.h5")) # the exported .npz isn't used by fine-tuning
+    joblib.dump(MinMaxScaler().fit(_ohlc_frame()[['Open', 'Close']].to_numpy()), str(build / "scaler.pkl"))
+    registry = ModelRegistry(str(tmp_path / "model"))
+    registry.register("AAA", str(build / "stand_in.h5"), str(build / "scaler.pkl"),
+                      metadata={'look_back': 20, 'model_input': "window"},
+                      artifacts={'keras_model': str(build / "lstm_model.h5")})
+    fetcher = MagicMock()
+    fetcher.fetch_historical_data.return_value = _ohlc_frame()
+    return registry, fetcher
+
+def test_fine_tune_registers_gated_version(registered_model):
+    registry, fetcher = registered_model
+    spec = fine_tune_lstm_model("AAA", recent_windows=60, validation_windows=10, epochs=1,
+                                registry_dir=registry.root, data_fetcher=fetcher,
+                                dataset_cache_dir=os.path.join(registry.root, "datasets"))
+
+    assert spec['version'] == "v2" and spec['fine_tuned_from'] == "v1"
+    assert spec['look_back'] == 20 and os.path.exists(spec['artifacts']['keras_model'])
+    promoted = spec['val_loss'] <= spec['base_val_loss']
+    assert registry.get("AAA")['version'] == ("v2" if promoted else "v1")
+
+    # A gate nothing can pass keeps the current version.
+    current = registry.get("AAA")['version']
+    spec = fine_tune_lstm_model("AAA", recent_windows=60, validation_windows=10, epochs=1, max_regression=-1.0,
+                                registry_dir=registry.root, data_fetcher=fetcher,
+                                dataset_cache_dir=os.path.join(registry.root, "datasets"))
+    assert spec['version'] == "v3"
+    assert registry.get("AAA")['version'] == current
+
+def test_fine_tune_needs_a_keras_checkpoint(tmp_path):
+    assert fine_tune_lstm_model("AAA", registry_dir=str(tmp_path / "model")) is None
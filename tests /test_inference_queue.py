@@ -0,0 +1,113 @@
+# your_project/tests/test_inference_queue.py
+
+import time
+import threading
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock
+from sklearn.preprocessing import MinMaxScaler
+
+from core.inference_queue import MicroBatcher, BatchStats
+from core.predictor import Predictor
+
+def _run_concurrently(fn, args_list):
+    results = [None] * len(args_list)
+    barrier = threading.Barrier(len(args_list))
+    def run(i, args):
+        barrier.wait()
+        results[i] = fn(*args)
+    threads = [threading.Thread(target=run, args=(i, args)) for i, args in enumerate(args_list)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def _slow_echo(calls):
+    def run_batch(windows, horizon, seeds):
+        calls.append(len(windows))
+        time.sleep(0.02)
+        # Each step of the forecast is the window's last value plus the step number.
+        return windows[:, -1:, :] + np.arange(horizon, dtype=float)[None, :, None]
+    return run_batch
+
+def test_concurrent_requests_share_forward_passes():
+    calls = []
+    batcher = MicroBatcher(_slow_echo(calls), max_wait=0.05)
+    requests = [(np.full((1, 3, 2), float(i)), 1 + i % 3) for i in range(12)]
+    results = _run_concurrently(batcher.submit, requests)
+
+    assert sum(calls) == 12
+    assert len(calls) < 12
+    for (windows, horizon), result in zip(requests, results):
+        assert result.shape == (1, horizon, 2)
+        np.testing.assert_allclose(result[0, :, 0], windows[0, -1, 0] + np.arange(horizon))
+    stats = batcher.stats.snapshot()
+    assert stats['requests'] == 12 and stats['batches'] == len(calls)
+    assert sum(stats['batch_size_histogram'].values()) == len(calls)
+
+def test_batch_errors_reach_every_caller():
+    def failing(windows, horizon, seeds):
+        raise RuntimeError("model crashed")
+    batcher = MicroBatcher(failing, max_wait=0.05)
+    def submit():
+        try:
+            batcher.submit(np.zeros((1, 3, 2)), 1)
+        except RuntimeError as e:
+            return str(e)
+    assert _run_concurrently(submit, [()] * 4) == ["model crashed"] * 4
+
+def test_idle_worker_exits_and_restarts():
+    idle = threading.Event()
+    batcher = MicroBatcher(_slow_echo([]), max_wait=0.0, idle_timeout=0.05, on_idle=idle.set)
+    batcher.submit(np.zeros((1, 3, 2)), 1)
+    assert idle.wait(2)
+    assert batcher.submit(np.ones((1, 3, 2)), 2).shape == (1, 2, 2)
+
+def test_predictor_coalesces_sessions_and_matches_solo_runs():
+    model = MagicMock()
+    model.predict_on_batch.side_effect = lambda x: (time.sleep(0.01), x[:, -1, :])[1]
+    scaler = MinMaxScaler().fit(np.array([[0.0, 0.0], [1000.0, 1000.0]]))
+    frames = []
+    for i in range(8):
+        close = 100.0 + 10 * i + np.arange(70, dtype=float)
+        frames.append(pd.DataFrame({'Open': close, 'Close': close}, index=pd.bdate_range('2023-01-02', periods=70)))
+
+    def session(df, micro_batching=True):
+        predictor = Predictor()
+        predictor.model, predictor.scaler, predictor.sampling_seed = model, scaler, 3
+        predictor.micro_batching = micro_batching
+        return predictor.predict_prices(df, num_predictions=2)
+
+    solo = [session(df, micro_batching=False) for df in frames]
+    model.predict_on_batch.reset_mock()
+    before = Predictor.inference_stats()['batches']
+    together = _run_concurrently(session, [(df,) for df in frames])
+
+    assert model.predict_on_batch.call_count < len(frames)
+    assert Predictor.inference_stats()['batches'] - before < len(frames)
+    for expected, actual in zip(solo, together):
+        pd.testing.assert_frame_equal(expected, actual)
+
+def test_predictor_batcher_pins_model_and_settings():
+    first, second = MagicMock(), MagicMock()
+    for model in (first, second):
+        model.predict_on_batch.side_effect = lambda x: x[:, -1, :]
+    predictor = Predictor()
+    predictor.model, predictor.model_input, predictor.max_batch_size = first, "window", 4
+    batcher = predictor._batcher()
+    assert predictor._batcher() is batcher
+    key = (id(first), "window", 4)
+    assert Predictor._batchers[key] == (first, batcher)
+
+    # A different model that lands on the same key must not reuse the old batcher or its model.
+    Predictor._batchers[key] = (second, batcher)
+    rebuilt = predictor._batcher()
+    assert rebuilt is not batcher and Predictor._batchers[key] == (first, rebuilt)
+
+    # Settings changed after the batcher was built don't leak into its batch runs.
+    predictor.max_batch_size = 1
+    rebuilt.submit(np.zeros((3, 5, 2), dtype='float32'), 2)
+    assert first.predict_on_batch.call_count == 2 and len(first.predict_on_batch.call_args[0][0]) == 3
+    Predictor._discard_batcher(key, rebuilt)
@@ -0,0 +1,179 @@
+# your_project/tests/test_inference_workers.py
+
+import os
+import time
+import signal
+import threading
+import joblib
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import MagicMock, patch
+from sklearn.preprocessing import MinMaxScaler
+
+from core.inference_workers import InferenceWorkerPool, RemoteModel
+from core.model_pool import ModelPool
+from core.numpy_lstm import NumpyLSTMModel
+from core.prediction_cache import PredictionCache
+from core.predictor import Predictor
+
+LOOK_BACK = 60
+
+@pytest.fixture
+def artifacts(tmp_path):
+    """A one-layer NumPy model that halves its input, plus a fitted scaler."""
+    model_path, scaler_path = str(tmp_path / "lstm_model.npz"), str(tmp_path / "scaler.pkl")
+    NumpyLSTMModel.save(model_path, [{'type': 'dense', 'units': 2, 'activation': 'linear'}],
+                        [{'kernel': np.eye(2) * 0.5, 'bias': None}], (LOOK_BACK, 2))
+    joblib.dump(MinMaxScaler().fit(np.array([[0.0, 0.0], [1000.0, 1000.0]])), scaler_path)
+    return model_path, scaler_path
+
+@pytest.fixture
+def worker_pool(artifacts):
+    pool = InferenceWorkerPool(*artifacts, look_back=LOOK_BACK, num_workers=2, timeout=60, health_interval=0.2)
+    yield pool
+    pool.close()
+
+def _wait_for(condition, timeout=60):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.05)
+
+def test_worker_forecast_matches_in_process(worker_pool, artifacts):
+    windows = np.random.default_rng(0).random((5, LOOK_BACK, 2)).astype('float32')
+    remote = worker_pool.forecast(windows, 3, None, "window")
+
+    local = Predictor()
+    local.model = NumpyLSTMModel.load(artifacts[0])
+    local.model_input = "window"
+    np.testing.assert_allclose(remote, local._forward(windows, 3), atol=1e-6)
+    np.testing.assert_allclose(worker_pool.predict_on_batch(windows)[:, -1, :], windows[:, -1, :] * 0.5, atol=1e-6)
+
+def test_dead_worker_is_restarted(worker_pool):
+    windows = np.ones((1, LOOK_BACK, 2), dtype='float32')
+    worker_pool.forecast(windows, 1, None, "window")
+    _wait_for(lambda: worker_pool.stats()['idle'] == 2)
+
+    victim = worker_pool._workers[0].process
+    os.kill(victim.pid, signal.SIGKILL)
+    victim.join(timeout=10)
+
+    # Requests keep succeeding while the health check replaces the dead worker.
+    for _ in range(4):
+        np.testing.assert_allclose(worker_pool.forecast(windows, 1, None, "window"), 0.5)
+    _wait_for(lambda: worker_pool.stats()['restarts'] >= 1 and worker_pool.stats()['alive'] == 2)
+
+def test_worker_errors_are_reported(worker_pool):
+    with pytest.raises(RuntimeError, match="Inference worker error"):
+        worker_pool.forecast(np.ones((1, LOOK_BACK, 3), dtype='float32'), 1, None, "window")
+    # The worker survives a bad request.
+    assert worker_pool.forecast(np.ones((1, LOOK_BACK, 2), dtype='float32'), 1, None, "window").shape == (1, 1, 2)
+
+def test_predictor_runs_through_workers(artifacts):
+    model_path, scaler_path = artifacts
+    close = 100.0 + np.arange(70, dtype=float)
+    df = pd.DataFrame({'Open': close, 'Close': close}, index=pd.bdate_range('2023-01-02', periods=70))
+
+    ModelPool.clear()
+    with patch.object(ModelPool, 'remote_workers', 2), \
+         patch.object(Predictor, '_prediction_cache', PredictionCache(10**6)):
+        predictor = Predictor()
+        predictor._bind({'model': model_path, 'scaler': scaler_path, 'model_input': "window", 'look_back': LOOK_BACK})
+        try:
+            assert isinstance(predictor.model, RemoteModel)
+            predicted = predictor.predict_prices(df, num_predictions=2)
+        finally:
+            predictor.model.close()
+            ModelPool.clear()
+
+    assert predicted['Predicted Close'].iloc[0] == pytest.approx(169.0 * 0.5)
+    assert predicted['Predicted Close'].iloc[1] == pytest.approx(169.0 * 0.25)
+
+def test_evicted_remote_models_stop_their_workers(tmp_path, artifacts):
+    _, scaler_path = artifacts
+    model_paths = []
+    for i in range(3):
+        model_path = str(tmp_path / f"model{i}.npz")
+        NumpyLSTMModel.save(model_path, [{'type': 'dense', 'units': 2, 'activation': 'linear'}],
+                            [{'kernel': np.eye(2) * (i + 1), 'bias': None}], (LOOK_BACK, 2))
+        model_paths.append(model_path)
+
+    ModelPool.clear()
+    with patch.object(ModelPool, 'remote_workers', 1), patch.object(ModelPool, 'max_remote_models', 2):
+        try:
+            models = [ModelPool.acquire(model_path, scaler_path, LOOK_BACK).model for model_path in model_paths]
+            assert all(model.nbytes > 0 for model in models)
+            assert ModelPool.stats()['models'] == 2
+
+            oldest = models[0].pool
+            _wait_for(lambda: oldest.stats()['alive'] == 0)
+            np.testing.assert_allclose(models[-1].forecast(np.ones((1, LOOK_BACK, 2), dtype='float32'), 1, None, "window"), 3.0)
+        finally:
+            ModelPool.clear()
+    assert all(model.pool.stats()['alive'] == 0 for model in models)
+
+def test_evicting_a_remote_model_waits_for_forecasts_in_flight(tmp_path, artifacts):
+    model_path, scaler_path = artifacts
+    other_path = str(tmp_path / "other.npz")
+    NumpyLSTMModel.save(other_path, [{'type': 'dense', 'units': 2, 'activation': 'linear'}],
+                        [{'kernel': np.eye(2), 'bias': None}], (LOOK_BACK, 2))
+    close = 100.0 + np.arange(70, dtype=float)
+    df = pd.DataFrame({'Open': close, 'Close': close}, index=pd.bdate_range('2023-01-02', periods=70))
+
+    ModelPool.clear()
+    with patch.object(ModelPool, 'remote_workers', 1), patch.object(ModelPool, 'max_remote_models', 1), \
+         patch.object(Predictor, '_prediction_cache', PredictionCache(10**6)):
+        try:
+            predictor = Predictor()
+            predictor._bind({'model': model_path, 'scaler': scaler_path, 'model_input': "window", 'look_back': LOOK_BACK})
+            evicted = predictor.model
+            started, release = threading.Event(), threading.Event()
+            forecast = evicted.pool.forecast
+            def held_forecast(*args):
+                started.set()
+                release.wait(30)
+                return forecast(*args)
+            evicted.pool.forecast = held_forecast
+
+            results = []
+            thread = threading.Thread(target=lambda: results.append(predictor.predict_prices(df, num_predictions=1)))
+            thread.start()
+            assert started.wait(30)
+            ModelPool.acquire(other_path, scaler_path, LOOK_BACK) # evicts the model mid-forecast
+            assert evicted.pool.stats()['alive'] == 1
+            release.set()
+            thread.join(60)
+
+            assert results[0]['Predicted Close'].iloc[0] == pytest.approx(169.0 * 0.5)
+            _wait_for(lambda: evicted.pool.stats()['alive'] == 0)
+
+            # The predictor still holds the closed model; it binds it again from the pool and retries.
+            predicted = predictor.predict_prices(df.iloc[:-1], num_predictions=1)
+            assert predictor.model is not evicted
+            assert predicted['Predicted Close'].iloc[0] == pytest.approx(168.0 * 0.5)
+        finally:
+            ModelPool.clear()
+
+def test_inference_errors_give_an_empty_forecast():
+    model = MagicMock()
+    model.predict_on_batch.side_effect = RuntimeError("Inference worker failed")
+    predictor = Predictor()
+    predictor.model, predictor.scaler = model, MinMaxScaler().fit(np.array([[0.0, 0.0], [1000.0, 1000.0]]))
+    predictor.micro_batching = False
+    close = 100.0 + np.arange(70, dtype=float)
+    df = pd.DataFrame({'Open': close, 'Close': close}, index=pd.bdate_range('2023-01-02', periods=70))
+    assert predictor.predict_prices(df, num_predictions=2).empty
+
+def test_worker_that_cannot_load_the_model_is_restarted_with_backoff(tmp_path, artifacts):
+    _, scaler_path = artifacts
+    pool = InferenceWorkerPool(str(tmp_path / "missing.npz"), scaler_path, look_back=LOOK_BACK, num_workers=1,
+                               timeout=2, health_interval=60)
+    try:
+        _wait_for(lambda: pool.stats()['restarts'] >= 2)
+        assert pool.stats()['idle'] == 0 and pool._start_failures[0] >= 2
+        with pytest.raises(TimeoutError):
+            pool.forecast(np.ones((1, LOOK_BACK, 2), dtype='float32'), 1, None, "window")
+    finally:
+        pool.close()
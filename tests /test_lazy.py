@@ -0,0 +1,53 @@
+# your_project/tests/test_lazy.py
+
+import os
+import sys
+import time
+import subprocess
+import pytest
+
+from core.lazy import LazyService, ImportReport
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture(autouse=True)
+def clean_report():
+    ImportReport.clear()
+    yield
+    ImportReport.clear()
+
+def test_lazy_service_constructs_on_first_use():
+    service = LazyService("collections", "Counter", "abca")
+    assert not service.loaded
+    assert service.most_common(1) == [('a', 2)]
+    assert service.loaded
+    assert [e['module'] for e in ImportReport.entries()] == ['collections']
+
+def test_lazy_service_warm_runs_callback():
+    seen = []
+    service = LazyService("collections", "OrderedDict")
+    service.warm(lambda instance: seen.append(instance))
+    deadline = time.time() + 5
+    while not seen and time.time() < deadline:
+        time.sleep(0.01)
+    assert service.loaded
+    assert seen and seen[0] is service._resolve()
+
+def test_lazy_service_warms_once_per_process():
+    seen = []
+    first = LazyService("collections", "ChainMap")
+    assert first.warm(lambda instance: seen.append(instance))
+    # A rerun builds a new proxy for the same service; it must not start another thread.
+    assert not LazyService("collections", "ChainMap").warm(lambda instance: seen.append(instance))
+    deadline = time.time() + 5
+    while not seen and time.time() < deadline:
+        time.sleep(0.01)
+    time.sleep(0.05)
+    assert len(seen) == 1
+
+def test_app_import_defers_heavy_subsystems():
+    code = ("import sys, streamlit, app; "
+            "print(sorted(m for m in ('tensorflow', 'nltk', 'mplfinance', 'yfinance', 'matplotlib.pyplot') if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,158 @@
+# your_project/tests/test_model_registry.py
+
+import os
+import joblib
+import pytest
+import numpy as np
+import pandas as pd
+from unittest.mock import patch
+from sklearn.preprocessing import MinMaxScaler
+
+from core.model_registry import ModelRegistry
+from core.model_pool import ModelPool
+from core.numpy_lstm import NumpyLSTMModel
+from core.prediction_cache import PredictionCache
+from core.predictor import Predictor
+
+def _write_artifacts(directory, scale: float, price_range=(0.0, 1000.0)):
+    """A one-layer model that multiplies its input by 'scale', plus a fitted scaler."""
+    os.makedirs(directory, exist_ok=True)
+    model_path = os.path.join(directory, "lstm_model.npz")
+    scaler_path = os.path.join(directory, "scaler.pkl")
+    NumpyLSTMModel.save(model_path, [{'type': 'dense', 'units': 2, 'activation': 'linear'}],
+                        [{'kernel': np.eye(2) * scale, 'bias': None}], (60, 2))
+    joblib.dump(MinMaxScaler().fit(np.array([[price_range[0]] * 2, [price_range[1]] * 2])), scaler_path)
+    return model_path, scaler_path
+
+def _ohlc_frame(n=70, start=100.0):
+    close = start + np.arange(n, dtype=float)
+    return pd.DataFrame({'Open': close, 'Close': close}, index=pd.bdate_range('2023-01-02', periods=n))
+
+@pytest.fixture
+def registry(tmp_path):
+    return ModelRegistry(str(tmp_path / "model"))
+
+@pytest.fixture(autouse=True)
+def clean_pool():
+    ModelPool.clear()
+    with patch.object(Predictor, '_prediction_cache', PredictionCache(10**6)):
+        yield
+    ModelPool.clear()
+
+def test_register_versions_and_promotion(registry, tmp_path):
+    model_path, scaler_path = _write_artifacts(str(tmp_path / "build"), 1.0)
+    first = registry.register("AAPL", model_path, scaler_path, {'look_back': 60})
+    second = registry.register("AAPL", model_path, scaler_path, promote=False)
+
+    assert (first['version'], second['version']) == ("v1", "v2")
+    assert registry.get("AAPL")['version'] == "v1"
+    assert os.path.exists(second['model']) and second['model'] != first['model']
+    registry.promote("AAPL", "v2")
+    assert registry.get("AAPL")['version'] == "v2"
+    assert set(registry.versions("AAPL")) == {"v1", "v2"}
+    with pytest.raises(KeyError):
+        registry.promote("AAPL", "v9")
+
+    # A second registry instance (e.g. another process) sees the same index.
+    assert ModelRegistry(registry.root).get("AAPL")['version'] == "v2"
+
+def test_resolve_prefers_ticker_then_sector_then_default(registry, tmp_path):
+    model_path, scaler_path = _write_artifacts(str(tmp_path / "build"), 1.0)
+    assert registry.resolve("MSFT") is None
+    registry.register("default", model_path, scaler_path)
+    registry.register("sector:Technology", model_path, scaler_path)
+    registry.register("AAPL", model_path, scaler_path)
+
+    assert registry.resolve("AAPL", sector="Technology")['key'] == "AAPL"
+    assert registry.resolve("MSFT", sector="Technology")['key'] == "sector:Technology"
+    assert registry.resolve("XOM", sector="Energy")['key'] == "default"
+
+def test_predictor_uses_per_ticker_models(registry, tmp_path):
+    aapl = _write_artifacts(str(tmp_path / "aapl"), 1.0)
+    default = _write_artifacts(str(tmp_path / "default"), 0.5)
+    registry.register("AAPL", *aapl, {'model_input': "window"})
+    registry.register("default", *default, {'model_input': "window"})
+
+    predictor = Predictor()
+    predictor.registry = registry
+    frames = {'AAPL': _ohlc_frame(start=100.0), 'MSFT': _ohlc_frame(start=100.0)}
+    results = predictor.predict_prices_batch(frames, num_predictions=1)
+
+    # Same inputs, different models: the AAPL model echoes the last bar, the default halves it.
+    assert results['AAPL']['Predicted Close'].iloc[0] == pytest.approx(169.0)
+    assert results['MSFT']['Predicted Close'].iloc[0] == pytest.approx(84.5)
+    assert ModelPool.stats()['models'] == 2
+
+    predictor.load_model("AAPL")
+    assert predictor.spec['key'] == "AAPL"
+    assert predictor.predict_prices(frames['AAPL'].copy(), num_predictions=1)['Predicted Close'].iloc[0] == pytest.approx(169.0)
+
+def test_predictor_serves_sector_model_to_its_tickers(registry, tmp_path):
+    registry.register("default", *_write_artifacts(str(tmp_path / "default"), 0.5), {'model_input': "window"})
+    registry.register("sector:Technology", *_write_artifacts(str(tmp_path / "tech"), 1.0),
+                      {'model_input': "window", 'tickers': ["AAPL", "MSFT"]})
+    assert registry.sector_of("MSFT") == "Technology"
+    assert registry.sector_of("XOM") is None
+
+    predictor = Predictor()
+    predictor.registry = registry
+    predictor.load_model("MSFT")
+    assert predictor.spec['key'] == "sector:Technology"
+
+    results = predictor.predict_prices_batch({'MSFT': _ohlc_frame(), 'XOM': _ohlc_frame()}, num_predictions=1)
+    assert results['MSFT']['Predicted Close'].iloc[0] == pytest.approx(169.0)
+    assert results['XOM']['Predicted Close'].iloc[0] == pytest.approx(84.5)
+
+def test_model_pool_evicts_least_recently_used(tmp_path):
+    paths = [_write_artifacts(str(tmp_path / f"m{i}"), 1.0) for i in range(3)]
+    model_bytes = NumpyLSTMModel.load(paths[0][0]).nbytes
+    with patch.object(ModelPool, 'max_bytes', 2 * model_bytes):
+        first = ModelPool.acquire(*paths[0], look_back=60)
+        ModelPool.acquire(*paths[1], look_back=60)
+        assert ModelPool.acquire(*paths[0], look_back=60) is first # touch: m1 is now least recent
+        ModelPool.acquire(*paths[2], look_back=60)
+
+        assert ModelPool.stats()['models'] == 2
+        assert ModelPool.acquire(*paths[0], look_back=60) is first
+        reloaded = ModelPool.acquire(*paths[1], look_back=60)
+        assert reloaded.version > first.version
+
+def test_predictor_serves_quantized_variant_within_budget(registry, tmp_path):
+    build = str(tmp_path / "build")
+    model_path, scaler_path = _write_artifacts(build, 1.0)
+    quantized_path = os.path.join(build, "lstm_model.int8.npz")
+    NumpyLSTMModel.save(quantized_path, [{'type': 'dense', 'units': 2, 'activation': 'linear'}],
+                        [{'kernel': np.eye(2), 'bias': None}], (60, 2), quantize=True)
+    registry.register("AAPL", model_path, scaler_path, {'look_back': 60, 'model_input': "window",
+                                                        'quantization': {'mean_abs_error': 0.001}},
+                      artifacts={'quantized_model': quantized_path})
+
+    assert Predictor().serving_artifact(registry.get("AAPL")) == registry.get("AAPL")['model'] # off by default
+    predictor = Predictor()
+    predictor.registry = registry
+    predictor.quantized_max_error = 0.002
+    predictor.load_model("AAPL")
+    assert predictor.model.quantization == "int8-per-channel"
+    assert not predictor.predict_prices(_ohlc_frame()).empty
+
+    strict = Predictor()
+    strict.registry = registry
+    strict.quantized_max_error = 0.0005
+    strict.load_model("AAPL")
+    assert strict.model.quantization is None
+
+def test_fallback_model_uses_sidecar_quantization_report(tmp_path):
+    import json
+    model_path, scaler_path = _write_artifacts(str(tmp_path), 1.0)
+    predictor = Predictor()
+    predictor.model_path, predictor.scaler_path = str(tmp_path / "lstm_model.h5"), scaler_path
+    assert predictor.serving_artifact(predictor.default_spec()) == model_path
+
+    quantized_path = str(tmp_path / "lstm_model.int8.npz")
+    NumpyLSTMModel.save(quantized_path, [{'type': 'dense', 'units': 2, 'activation': 'linear'}],
+                        [{'kernel': np.eye(2), 'bias': None}], (60, 2), quantize=True)
+    with open(str(tmp_path / "lstm_model.int8.json"), 'w') as f:
+        json.dump({'mean_abs_error': 0.01}, f)
+    assert predictor.serving_artifact(predictor.default_spec()) == model_path # over budget
+    predictor.quantized_max_error = 0.05
+    assert predictor.serving_artifact(predictor.default_spec()) == quantized_path
@@ -0,0 +1,157 @@
+# your_project/tests/test_numpy_lstm.py
+
+import os
+import sys
+import subprocess
+import pytest
+import numpy as np
+
+from core.numpy_lstm import NumpyLSTMModel
+from core.predictor import Predictor
+from core.model_pool import ModelPool
+
+LOOK_BACK = 60
+
+@pytest.fixture
+def keras_lstm(tmp_path):
+    """Saves a small model with the same layer stack as scripts/train_model.py."""
+    import tensorflow as tf
+    tf.keras.utils.set_random_seed(42)
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(LOOK_BACK, 2)),
+        tf.keras.layers.LSTM(units=50, return_sequences=True),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.LSTM(units=50, return_sequences=False),
+        tf.keras.layers.Dropout(0.2),
+        tf.keras.layers.Dense(units=2),
+    ])
+    # Random biases, so the gate order is actually exercised.
+    for layer in model.layers:
+        weights = layer.get_weights()
+        if weights:
+            layer.set_weights([w + np.random.default_rng(0).normal(0, 0.3, w.shape).astype(w.dtype) for w in weights])
+    model_path = tmp_path / "lstm_model.h5"
+    model.save(model_path)
+    return model, str(model_path)
+
+def test_export_matches_keras(keras_lstm):
+    from scripts.export_numpy_model import export_numpy_model
+    model, model_path = keras_lstm
+    npz_path = export_numpy_model(model_path)
+    assert npz_path.endswith("lstm_model.npz")
+
+    engine = NumpyLSTMModel.load(npz_path)
+    assert engine.input_shape == (None, LOOK_BACK, 2)
+    x = np.random.default_rng(1).random((17, LOOK_BACK, 2)).astype('float32')
+    np.testing.assert_allclose(engine.predict_on_batch(x), model.predict_on_batch(x), atol=1e-5)
+    np.testing.assert_allclose(engine.predict(x, batch_size=4), model.predict_on_batch(x), atol=1e-5)
+
+def test_predictor_prefers_numpy_export(keras_lstm, tmp_path):
+    from scripts.export_numpy_model import export_numpy_model
+    model, model_path = keras_lstm
+    predictor = Predictor()
+    predictor.model_path = model_path
+    predictor.scaler_path = str(tmp_path / "scaler.pkl")
+    assert predictor.artifact_path() == model_path
+
+    export_numpy_model(model_path)
+    ModelPool.clear()
+    try:
+        predictor.load_model()
+    finally:
+        ModelPool.clear()
+    assert isinstance(predictor.model, NumpyLSTMModel)
+    assert predictor.artifact_path().endswith(".npz")
+
+def test_generator_export_serves_default_path(tmp_path):
+    """The GAN generator maps a noise sequence to a price sequence; its export is what the fallback path serves."""
+    import tensorflow as tf
+    from scripts.export_numpy_model import export_numpy_model
+    tf.keras.utils.set_random_seed(7)
+    generator = tf.keras.Sequential([
+        tf.keras.Input(shape=(LOOK_BACK, 2)),
+        tf.keras.layers.LSTM(units=32, return_sequences=True),
+        tf.keras.layers.TimeDistributed(tf.keras.layers.Dense(units=2, activation='tanh')),
+    ])
+    model_path = str(tmp_path / "generator_model.h5")
+    generator.save(model_path)
+    assert export_numpy_model(model_path).endswith("generator_model.npz")
+
+    predictor = Predictor()
+    predictor.model_path = model_path
+    predictor.scaler_path = str(tmp_path / "scaler.pkl")
+    ModelPool.clear()
+    try:
+        predictor.load_model()
+    finally:
+        ModelPool.clear()
+    assert isinstance(predictor.model, NumpyLSTMModel)
+    assert predictor.model_input == "noise"
+
+    windows = np.zeros((3, LOOK_BACK, 2), dtype='float32')
+    keras_predictor = Predictor()
+    keras_predictor.model = generator
+    np.testing.assert_allclose(predictor._forward(windows, 4, seeds=[1, 2, 3]),
+                               keras_predictor._forward(windows, 4, seeds=[1, 2, 3]), atol=1e-5)
+
+def test_sigmoid_is_stable_for_large_inputs():
+    from core.numpy_lstm import _sigmoid
+    with np.errstate(over='raise'):
+        out = _sigmoid(np.array([-1000.0, 0.0, 1000.0]))
+    np.testing.assert_allclose(out, [0.0, 0.5, 1.0])
+
+def test_predictor_import_does_not_load_tensorflow():
+    code = "import sys, core.predictor; print('tensorflow' in sys.modules)"
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+    assert result.stdout.strip() == "False", result.stderr
+
+def test_int8_export_tracks_float_model(keras_lstm, tmp_path):
+    from scripts.export_numpy_model import export_numpy_model
+    from scripts.quantize_model import quantize_numpy_model, quantization_report
+    _, model_path = keras_lstm
+    npz_path = export_numpy_model(model_path)
+    quantized_path = quantize_numpy_model(npz_path)
+    assert quantized_path.endswith("lstm_model.int8.npz")
+
+    quantized = NumpyLSTMModel.load(quantized_path)
+    assert quantized.quantization == "int8-per-channel"
+    # Expanded once on load: the forward pass runs on float32 weights.
+    assert quantized.layers[0].recurrent_kernel.dtype == np.float32
+    assert os.path.getsize(quantized_path) < os.path.getsize(npz_path) / 2
+
+    x = np.random.default_rng(3).random((64, LOOK_BACK, 2)).astype('float32')
+    report = quantization_report(npz_path, quantized_path, x, targets=np.zeros((64, 2)))
+    assert report['windows'] == 64
+    assert 0 < report['mean_abs_error'] < 0.02
+    assert report['quantized_file_bytes'] < report['float_file_bytes']
+    assert {'float_latency_ms', 'quantized_latency_ms', 'float_mse', 'quantized_mse'} <= set(report)
+
+def test_quantized_format_is_rejected_by_float_only_loaders(tmp_path):
+    import json
+    from core import numpy_lstm
+    path = str(tmp_path / "model.int8.npz")
+    NumpyLSTMModel.save(path, [{'type': 'dense', 'units': 2, 'activation': 'linear'}],
+                        [{'kernel': np.eye(2), 'bias': np.zeros(2)}], (LOOK_BACK, 2), quantize=True)
+    with np.load(path) as data:
+        assert json.loads(str(data['meta']))['format'] == numpy_lstm.QUANTIZED_FORMAT_VERSION
+        assert data['layer0_kernel'].dtype == np.int8
+    np.testing.assert_allclose(NumpyLSTMModel.load(path).predict_on_batch(np.ones((1, 2))), [[1.0, 1.0]], atol=1e-6)
+
+def test_quantization_report_without_held_out_windows(tmp_path):
+    from scripts.dataset_pipeline import WindowedDataset
+    from scripts.quantize_model import quantize_and_report
+    numpy_path = str(tmp_path / "lstm_model.npz")
+    NumpyLSTMModel.save(numpy_path, [{'type': 'dense', 'units': 2, 'activation': 'linear'}],
+                        [{'kernel': np.eye(2), 'bias': None}], (LOOK_BACK, 2))
+    # Every window went to training, as with a short history.
+    train, empty = WindowedDataset.from_series([np.ones((LOOK_BACK + 1, 2), dtype='float32')], look_back=LOOK_BACK,
+                                               split_ratio=0.8)
+    assert len(empty) == 0
+
+    quantized_path, report = quantize_and_report(numpy_path, empty)
+    assert report['windows'] == 0 and 'mean_abs_error' not in report
+    predictor = Predictor()
+    predictor.quantized_max_error = 1.0
+    spec = {'model': numpy_path, 'artifacts': {'quantized_model': quantized_path}, 'quantization': report}
+    assert predictor.serving_artifact(spec) == numpy_path
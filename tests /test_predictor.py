@@ -149,3 +149,315 @@ def test_predict_prices_not_enough_data(predictor_instance):
     
     predicted_series = predictor_instance.predict_prices(short_df)
     assert predicted_series.empty
+
+# --- Model pool ---
+
+@pytest.fixture
+def pooled_artifacts(tmp_path):
+    """Writes model/scaler artifacts to a temp dir and resets the process-wide pool."""
+    from core.model_pool import ModelPool
+    model_path = tmp_path / "generator_model.h5"
+    scaler_path = tmp_path / "scaler.pkl"
+    model_path.write_bytes(b"weights-v1")
+    scaler = MinMaxScaler().fit(np.array([[1.0, 2.0], [3.0, 4.0]]))
+    import joblib
+    joblib.dump(scaler, scaler_path)
+    ModelPool.clear()
+    yield str(model_path), str(scaler_path)
+    ModelPool.clear()
+
+def _pooled_predictor(model_path, scaler_path):
+    predictor = Predictor()
+    predictor.model_path = model_path
+    predictor.scaler_path = scaler_path
+    return predictor
+
+def test_model_pool_loads_once_and_warms_up(pooled_artifacts):
+    model = MagicMock()
+    with patch('tensorflow.keras.models.load_model', return_value=model) as load:
+        first = _pooled_predictor(*pooled_artifacts)
+        second = _pooled_predictor(*pooled_artifacts)
+        first.load_model()
+        second.load_model()
+        first.load_model()
+
+    assert load.call_count == 1
+    assert first.model is model and second.model is model
+    assert first.scaler is second.scaler
+    model.predict_on_batch.assert_called_once()
+    assert model.predict_on_batch.call_args[0][0].shape == (1, first.look_back, 2)
+
+def test_model_pool_hot_reloads_changed_artifact(pooled_artifacts):
+    model_path, scaler_path = pooled_artifacts
+    old_model, new_model = MagicMock(), MagicMock()
+    with patch('tensorflow.keras.models.load_model', side_effect=[old_model, new_model]) as load:
+        predictor = _pooled_predictor(model_path, scaler_path)
+        predictor.load_model()
+        first_version = predictor.model_version
+        scaler = predictor.scaler
+
+        # Touching the file without changing its content keeps the loaded model.
+        stat = os.stat(model_path)
+        os.utime(model_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        predictor.load_model()
+        assert load.call_count == 1
+        assert predictor.model is old_model
+
+        with open(model_path, 'wb') as f:
+            f.write(b"weights-v2")
+        predictor.load_model()
+
+    assert load.call_count == 2
+    assert predictor.model is new_model
+    assert predictor.scaler is scaler # unchanged scaler is not reloaded
+    assert predictor.model_version != first_version
+
+def test_model_pool_missing_model(pooled_artifacts):
+    model_path, scaler_path = pooled_artifacts
+    os.remove(model_path)
+    predictor = _pooled_predictor(model_path, scaler_path)
+    predictor.load_model()
+    assert predictor.model is None
+    assert predictor.scaler is not None
+
+# --- Batched inference ---
+
+def _ohlc_frame(n, start=100.0):
+    dates = pd.bdate_range(start='2023-01-02', periods=n)
+    close = start + np.arange(n, dtype=float)
+    return pd.DataFrame({'Open': close - 0.5, 'Close': close}, index=dates)
+
+@pytest.fixture
+def batch_predictor():
+    predictor = Predictor()
+    predictor.model_input = "window"
+    predictor.scaler = MinMaxScaler().fit(np.array([[0.0, 0.0], [1000.0, 1000.0]]))
+    model = MagicMock()
+    # Echo the last row of each window, so each ticker's prediction is its own last bar.
+    model.predict_on_batch.side_effect = lambda x: x[:, -1, :]
+    predictor.model = model
+    return predictor
+
+def test_predict_prices_batch_stacks_windows(batch_predictor):
+    frames = {'AAA': _ohlc_frame(80, 100.0), 'BBB': _ohlc_frame(70, 500.0), 'SHORT': _ohlc_frame(10)}
+    results = batch_predictor.predict_prices_batch(frames, num_predictions=5)
+
+    assert set(results) == {'AAA', 'BBB'}
+    # One batched call per forecast step, never one per ticker.
+    assert batch_predictor.model.predict_on_batch.call_count == 5
+    assert batch_predictor.model.predict_on_batch.call_args[0][0].shape == (2, batch_predictor.look_back, 2)
+    for ticker in ('AAA', 'BBB'):
+        last = frames[ticker].iloc[-1]
+        predicted = results[ticker]
+        assert list(predicted.columns) == ['Predicted Open', 'Predicted Close']
+        assert len(predicted) == 5
+        assert predicted.index[0] > frames[ticker].index[-1]
+        np.testing.assert_allclose(predicted.values, np.tile([last['Open'], last['Close']], (5, 1)))
+
+def test_predict_prices_batch_chunks_large_batches(batch_predictor):
+    batch_predictor.max_batch_size = 2
+    frames = {f"T{i}": _ohlc_frame(61, 100.0 + i) for i in range(5)}
+    results = batch_predictor.predict_prices_batch(frames, num_predictions=1)
+
+    assert len(results) == 5
+    assert batch_predictor.model.predict_on_batch.call_count == 3
+    np.testing.assert_allclose(results['T4']['Predicted Close'].iloc[0], frames['T4']['Close'].iloc[-1])
+
+def test_predict_prices_matches_batch(batch_predictor):
+    df = _ohlc_frame(90)
+    single = batch_predictor.predict_prices(df)
+    batched = batch_predictor.predict_prices_batch({'X': df})['X']
+    pd.testing.assert_frame_equal(single, batched)
+
+def test_compiled_rollout_matches_step_loop():
+    import tensorflow as tf
+    tf.keras.utils.set_random_seed(0)
+    look_back = 8
+    model = tf.keras.Sequential([
+        tf.keras.Input(shape=(look_back, 2)),
+        tf.keras.layers.LSTM(4),
+        tf.keras.layers.Dense(2),
+    ])
+    predictor = Predictor()
+    predictor.model = model
+    windows = np.random.default_rng(0).random((3, look_back, 2)).astype('float32')
+
+    compiled = predictor._rollout(windows, 4)
+    compiled_again = predictor._rollout(windows[:2], 7) # other batch size and horizon, same graph
+
+    expected, window = [], windows
+    for _ in range(7):
+        step = model.predict_on_batch(window)
+        expected.append(step)
+        window = np.concatenate([window[:, 1:, :], step[:, None, :]], axis=1)
+    expected = np.stack(expected, axis=1)
+
+    assert compiled.shape == (3, 4, 2)
+    np.testing.assert_allclose(compiled, expected[:, :4], atol=1e-5)
+    np.testing.assert_allclose(compiled_again, expected[:2], atol=1e-5)
+    assert Predictor._compiled_rollout(model).experimental_get_tracing_count() == 1
+
+def test_model_pool_warm_up_traces_rollout_for_window_models(tmp_path):
+    import joblib
+    import tensorflow as tf
+    from core.model_pool import ModelPool
+    look_back = 8
+    model_path, scaler_path = str(tmp_path / "window_model.h5"), str(tmp_path / "scaler.pkl")
+    tf.keras.Sequential([tf.keras.Input(shape=(look_back, 2)), tf.keras.layers.LSTM(4), tf.keras.layers.Dense(2)]).save(model_path)
+    joblib.dump(MinMaxScaler().fit(np.array([[1.0, 2.0], [3.0, 4.0]])), scaler_path)
+
+    ModelPool.clear()
+    try:
+        model = ModelPool.acquire(model_path, scaler_path, look_back, model_input="window").model
+        # Traced during warm-up, so the first forecast reuses the graph.
+        assert Predictor._compiled_rollout(model).experimental_get_tracing_count() == 1
+        predictor = Predictor()
+        predictor.model = model
+        predictor._rollout(np.zeros((3, look_back, 2), dtype='float32'), 5)
+        assert Predictor._compiled_rollout(model).experimental_get_tracing_count() == 1
+    finally:
+        ModelPool.clear()
+
+def test_noise_model_forecasts_horizon_in_one_pass():
+    predictor = Predictor()
+    predictor.scaler = MinMaxScaler().fit(np.array([[0.0, 0.0], [1000.0, 1000.0]]))
+    model = MagicMock()
+    model.predict_on_batch.side_effect = lambda x: np.full((len(x), 2), 0.5)
+    predictor.model = model
+    predicted = predictor.predict_prices(_ohlc_frame(70), num_predictions=20)
+
+    assert len(predicted) == 20
+    model.predict_on_batch.assert_called_once()
+    assert model.predict_on_batch.call_args[0][0].shape == (20, predictor.look_back, 2)
+
+# --- Prediction cache ---
+
+@pytest.fixture
+def cached_predictor(pooled_artifacts, tmp_path):
+    """A Predictor bound to pooled artifacts, with a fresh prediction cache that has a disk tier."""
+    from core.prediction_cache import PredictionCache
+    model_path, scaler_path = pooled_artifacts
+    model = MagicMock()
+    model.predict_on_batch.side_effect = lambda x: x[:, -1, :] * 0 + x.mean(axis=(1, 2))[:, None]
+    cache = PredictionCache(10**6, disk_dir=str(tmp_path / "predictions"))
+    with patch('tensorflow.keras.models.load_model', return_value=model), \
+         patch.object(Predictor, '_prediction_cache', cache):
+        predictor = _pooled_predictor(model_path, scaler_path)
+        predictor.load_model()
+        model.predict_on_batch.reset_mock() # ignore the warm-up call
+        yield predictor, model, cache
+
+def test_prediction_cache_serves_repeat_requests(cached_predictor):
+    predictor, model, cache = cached_predictor
+    df = _ohlc_frame(70)
+    first = predictor.predict_prices(df)
+    calls = model.predict_on_batch.call_count
+
+    other_session = _pooled_predictor(predictor.model_path, predictor.scaler_path)
+    other_session.load_model()
+    second = other_session.predict_prices(df)
+
+    assert model.predict_on_batch.call_count == calls
+    pd.testing.assert_frame_equal(first, second)
+    second['Predicted Open'] *= 2 # callers get writable copies
+    pd.testing.assert_frame_equal(first, predictor.predict_prices(df))
+
+    # A new bar or a different horizon is a different forecast.
+    predictor.predict_prices(_ohlc_frame(71))
+    predictor.predict_prices(df, num_predictions=3)
+    assert model.predict_on_batch.call_count == 3 * calls
+
+def test_prediction_cache_invalidated_on_hot_reload(cached_predictor):
+    predictor, model, cache = cached_predictor
+    df = _ohlc_frame(70)
+    predictor.predict_prices(df)
+    calls = model.predict_on_batch.call_count
+
+    with open(predictor.model_path, 'wb') as f:
+        f.write(b"weights-v2")
+    predictor.load_model()
+    model.predict_on_batch.reset_mock() # ignore the warm-up of the reloaded model
+    predictor.predict_prices(df)
+    assert model.predict_on_batch.call_count == calls
+
+def test_prediction_cache_disk_tier(cached_predictor):
+    predictor, model, cache = cached_predictor
+    df = _ohlc_frame(70)
+    first = predictor.predict_prices(df)
+    cache.clear()
+    calls = model.predict_on_batch.call_count
+
+    second = predictor.predict_prices(df)
+    assert model.predict_on_batch.call_count == calls
+    assert cache.stats()['disk_hits'] == 1
+    pd.testing.assert_frame_equal(first, second, check_freq=False)
+
+def test_seeded_sampling_is_deterministic_per_ticker():
+    predictor = Predictor()
+    predictor.sampling_seed = 7
+    predictor.scaler = MinMaxScaler().fit(np.array([[0.0, 0.0], [1000.0, 1000.0]]))
+    model = MagicMock()
+    model.predict_on_batch.side_effect = lambda x: x[:, -1, :] # echo the noise
+    predictor.model = model
+    frames = {'AAA': _ohlc_frame(70, 100.0), 'BBB': _ohlc_frame(70, 300.0)}
+
+    alone = predictor.predict_prices_batch({'AAA': frames['AAA']})['AAA']
+    together = predictor.predict_prices_batch(frames)
+    pd.testing.assert_frame_equal(alone, together['AAA'])
+    assert not np.allclose(together['AAA'].values, together['BBB'].values)
+
+    predictor.sampling_seed = None
+    unseeded = [predictor.predict_prices_batch({'AAA': frames['AAA']})['AAA'] for _ in range(2)]
+    assert not np.allclose(unseeded[0].values, unseeded[1].values)
+
+@pytest.fixture
+def sampling_predictor():
+    predictor = Predictor()
+    predictor.sampling_seed = 7
+    predictor.scaler = MinMaxScaler().fit(np.array([[0.0, 0.0], [1000.0, 1000.0]]))
+    model = MagicMock()
+    model.predict_on_batch.side_effect = lambda x: x[:, -1, :] # echo the noise
+    predictor.model = model
+    return predictor
+
+def test_monte_carlo_bands_in_one_pass(sampling_predictor):
+    df = _ohlc_frame(70)
+    predicted = sampling_predictor.predict_prices(df, num_predictions=5, num_samples=256)
+
+    # 256 samples x 5 days fit one forward pass.
+    assert sampling_predictor.model.predict_on_batch.call_count == 1
+    assert sampling_predictor.model.predict_on_batch.call_args[0][0].shape[0] == 256 * 5
+    assert len(predicted) == 5
+    for name in ('Predicted Open', 'Predicted Close'):
+        assert (predicted[f"{name} P10"] <= predicted[f"{name} Median"]).all()
+        assert (predicted[f"{name} Median"] <= predicted[f"{name} P90"]).all()
+        assert (predicted[f"{name} P10"] < predicted[f"{name} P90"]).all()
+        assert predicted[name].between(predicted[f"{name} P10"], predicted[f"{name} P90"]).all()
+
+def test_single_sample_matches_plain_forecast(sampling_predictor):
+    df = _ohlc_frame(70)
+    plain = sampling_predictor.predict_prices(df)
+    single = sampling_predictor.predict_prices(df, num_samples=1)
+    assert list(single.columns) == ['Predicted Open', 'Predicted Close']
+    pd.testing.assert_frame_equal(plain, single)
+    # More samples average in more noise draws, so the mean moves off the single draw.
+    sampled = sampling_predictor.predict_prices(df, num_samples=2)
+    assert not np.allclose(sampled['Predicted Close'].values, plain['Predicted Close'].values)
+
+def test_window_models_ignore_num_samples(batch_predictor):
+    predicted = batch_predictor.predict_prices(_ohlc_frame(70), num_predictions=3, num_samples=64)
+    assert list(predicted.columns) == ['Predicted Open', 'Predicted Close']
+    assert batch_predictor.model.predict_on_batch.call_args[0][0].shape[0] == 1
+
+def test_prediction_chart_draws_band():
+    from core.visualization import Visualization
+    dates = pd.bdate_range('2023-04-03', periods=3)
+    fig = Visualization().plot_prediction_chart(
+        _ohlc_frame(10), pd.Series([110.0, 111.0, 112.0], index=dates),
+        lower_series=pd.Series([105.0, 104.0, 103.0], index=dates),
+        upper_series=pd.Series([115.0, 118.0, 121.0], index=dates))
+    names = [trace.name for trace in fig.data]
+    assert 'Confidence Band' in names and 'Predicted Close' in names
+    band = fig.data[names.index('Confidence Band')]
+    assert band.fill == 'tonexty'
+    assert list(fig.data[names.index('Confidence Band') - 1].y) == [105.0, 104.0, 103.0]
@@ -0,0 +1,97 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+from scripts import sweep
+
+def test_sample_configs_grid_and_random():
+    space = {'units': [16, 32], 'dropout': [0.1, 0.2, 0.3]}
+    grid = sweep.sample_configs(space)
+    assert len(grid) == 6 and {'units': 32, 'dropout': 0.3} in grid
+    sampled = sweep.sample_configs(space, num_trials=4, seed=1)
+    assert len(sampled) == 4 and all(config in grid for config in sampled)
+    assert sampled == sweep.sample_configs(space, num_trials=4, seed=1)
+
+def test_rung_budgets():
+    assert sweep.rung_budgets(2, 18, 3) == [2, 6, 18]
+    assert sweep.rung_budgets(1, 10, 2) == [1, 2, 4, 8]
+
+def test_successive_halving_aborts_losing_trials():
+    configs = [{'quality': q} for q in (5, 1, 9, 3, 7, 2, 8, 4, 6)]
+    seen = []
+    def run_rung(tasks):
+        seen.append([(task['trial'], task['start_epoch'], task['epochs']) for task in tasks])
+        return [{'trial': task['trial'], 'val_loss': task['config']['quality'] / task['epochs']} for task in tasks]
+
+    results = sweep.successive_halving(configs, run_rung, [1, 3, 9], eta=3)
+
+    assert [len(rung) for rung in seen] == [9, 3, 1]
+    # Survivors continue from where their previous rung stopped.
+    assert {(start, end) for _, start, end in seen[1]} == {(1, 3)}
+    assert [trial for trial, _, _ in seen[2]] == [1] # quality 1 is the best
+    assert len(results) == 9
+    assert {result['trial']: result['val_loss'] for result in results}[1] == 1 / 9
+    assert results[1]['rung_losses'] == [1.0, 1 / 3, 1 / 9]
+
+def test_best_trial_respects_latency_budget():
+    table = pd.DataFrame([
+        {'trial': 0, 'rung': 2, 'val_loss': 0.010, 'latency_ms': 3.0, 'trial_dir': 'a'},
+        {'trial': 1, 'rung': 2, 'val_loss': 0.012, 'latency_ms': 1.0, 'trial_dir': 'b'},
+        {'trial': 2, 'rung': 0, 'val_loss': 0.001, 'latency_ms': 0.5, 'trial_dir': 'c'},
+    ])
+    assert sweep.best_trial(table)['trial'] == 0
+    assert sweep.best_trial(table, max_latency_ms=2.0)['trial'] == 1
+    assert sweep.best_trial(table, max_latency_ms=0.1) is None
+
+class _InProcessExecutor(ThreadPoolExecutor):
+    def __init__(self, max_workers, mp_context=None, initializer=None, initargs=()):
+        super().__init__(max_workers=1)
+
+def test_run_sweep_and_export_winner(tmp_path):
+    pytest.importorskip("tensorflow")
+    close = 100 + np.cumsum(np.random.default_rng(0).normal(0, 1, 160))
+    frame = pd.DataFrame({'Open': close, 'Close': close}, index=pd.bdate_range('2023-01-02', periods=160))
+    fetcher = MagicMock()
+    fetcher.fetch_historical_data.return_value = frame
+    space = {'units': [4, 8], 'dropout': [0.0], 'batch_size': [32], 'look_back': [10, 20], 'patience': [2]}
+
+    with patch.object(sweep, 'ProcessPoolExecutor', _InProcessExecutor), \
+         patch.object(sweep, 'DATASET_CACHE_DIR', str(tmp_path / "datasets")):
+        table = sweep.run_sweep(['AAA'], space=space, min_epochs=1, max_epochs=2, eta=2,
+                                work_dir=str(tmp_path / "sweep"), report_path=str(tmp_path / "results.csv"),
+                                data_fetcher=fetcher)
+
+    assert len(table) == 4 and table['error'].isna().all()
+    assert (table['rung'] == 1).sum() == 2
+    assert (table['latency_ms'] > 0).all() and (table['train_seconds'] > 0).all()
+    assert len(pd.read_csv(tmp_path / "results.csv")) == 4
+
+    spec = sweep.export_winner(table, "AAA", registry_dir=str(tmp_path / "model"))
+    winner = sweep.best_trial(table)
+    assert spec['units'] == winner['units'] and spec['look_back'] == winner['look_back']
+    assert os.path.exists(spec['model']) and os.path.exists(spec['artifacts']['keras_model'])
+    # Published like train_model's models: covered tickers, quantized variant and its report.
+    assert spec['tickers'] == ['AAA'] and spec['period'] == "5y"
+    assert os.path.exists(spec['artifacts']['quantized_model']) and spec['quantization']['windows'] > 0
+
+    # A continuing rung whose saved state is gone trains its whole budget from epoch 0.
+    with open(os.path.join(str(tmp_path / "sweep"), sweep.SWEEP_FILE)) as f:
+        saved = json.load(f)
+    options = {'work_dir': str(tmp_path / "sweep"), 'cache_dir': saved['cache_dir'], 'dataset_keys': saved['dataset_keys'],
+               'split_ratio': saved['split_ratio']}
+    from scripts import train_model
+    initial_epochs = []
+    def build(*args, **kwargs):
+        model = real_build(*args, **kwargs)
+        fit = model.fit
+        model.fit = lambda *a, **k: initial_epochs.append(k['initial_epoch']) or fit(*a, **k)
+        return model
+    real_build = train_model.build_lstm_model
+    task = {'trial': 99, 'config': dict(space, units=4, look_back=10, dropout=0.0, batch_size=32, patience=2),
+            'rung': 1, 'epochs': 2, 'start_epoch': 1}
+    with patch.object(train_model, 'build_lstm_model', side_effect=build):
+        result = sweep._run_trial(task, options)
+    assert result['error'] is None and initial_epochs == [0]
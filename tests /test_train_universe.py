@@ -0,0 +1,84 @@
+import os
+import sys
+import json
+import subprocess
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from scripts import train_universe as orchestrator
+
+@pytest.fixture
+def universe_file(tmp_path):
+    path = tmp_path / "universe.csv"
+    path.write_text("ticker,sector\n# large caps\naapl,Technology\nMSFT,Technology\n\nXOM,Energy\nNEW\n")
+    return str(path)
+
+def test_read_universe(universe_file):
+    assert orchestrator.read_universe(universe_file) == [
+        ('AAPL', 'Technology'), ('MSFT', 'Technology'), ('XOM', 'Energy'), ('NEW', None)]
+
+def test_build_jobs_per_ticker_and_per_sector(universe_file):
+    universe = orchestrator.read_universe(universe_file)
+    assert [job['key'] for job in orchestrator.build_jobs(universe)] == ['AAPL', 'MSFT', 'XOM', 'NEW']
+    assert orchestrator.build_jobs(universe, by="sector") == [
+        {'key': 'sector:Technology', 'tickers': ['AAPL', 'MSFT']},
+        {'key': 'sector:Energy', 'tickers': ['XOM']}]
+    with pytest.raises(ValueError):
+        orchestrator.build_jobs(universe, by="industry")
+
+class _InProcessExecutor(ThreadPoolExecutor):
+    """Stands in for the process pool, so the test can patch the training function."""
+    def __init__(self, max_workers, mp_context=None, initializer=None, initargs=()):
+        super().__init__(max_workers=max_workers)
+        self.threads_per_worker = initargs[0]
+
+def _fake_train(ticker_symbol, tickers, registry_key, model_dir, registry_dir, **kwargs):
+    if ticker_symbol == 'NEW':
+        return None
+    if ticker_symbol == 'XOM':
+        raise RuntimeError("boom")
+    assert model_dir.startswith(os.path.join(registry_dir, "_build"))
+    return {'key': registry_key, 'version': 'v1', 'test_loss': 0.01}
+
+def test_train_universe_runs_every_job_and_reports_failures(universe_file, tmp_path):
+    report = tmp_path / "report.json"
+    with patch.object(orchestrator, 'ProcessPoolExecutor', _InProcessExecutor), \
+         patch('scripts.train_model.train_lstm_model', side_effect=_fake_train):
+        results = orchestrator.train_universe(universe_file, workers=2, threads_per_worker=1,
+                                              registry_dir=str(tmp_path / "model"), report_path=str(report))
+
+    by_key = {result['key']: result for result in results}
+    assert set(by_key) == {'AAPL', 'MSFT', 'XOM', 'NEW'}
+    assert by_key['AAPL']['status'] == 'ok' and by_key['AAPL']['version'] == 'v1'
+    assert by_key['XOM']['status'] == 'failed' and 'boom' in by_key['XOM']['error']
+    assert by_key['NEW']['error'] == "not enough data"
+    saved = json.loads(report.read_text())
+    assert saved['workers'] == 2 and len(saved['results']) == 4
+
+def test_incremental_keeps_registered_models_it_cannot_fine_tune(universe_file, tmp_path):
+    from core.model_registry import ModelRegistry
+    registry_dir = str(tmp_path / "model")
+    (tmp_path / "lstm_model.npz").write_bytes(b"model")
+    (tmp_path / "scaler.pkl").write_bytes(b"scaler")
+    ModelRegistry(registry_dir).register("AAPL", str(tmp_path / "lstm_model.npz"), str(tmp_path / "scaler.pkl"))
+
+    with patch.object(orchestrator, 'ProcessPoolExecutor', _InProcessExecutor), \
+         patch('scripts.fine_tune_model.fine_tune_lstm_model', return_value=None) as fine_tune, \
+         patch('scripts.train_model.train_lstm_model', side_effect=_fake_train) as train:
+        results = orchestrator.train_universe(universe_file, workers=1, threads_per_worker=1,
+                                              registry_dir=registry_dir, incremental=True)
+
+    by_key = {result['key']: result for result in results}
+    assert by_key['AAPL']['status'] == 'skipped' and by_key['AAPL']['version'] == 'v1'
+    assert by_key['AAPL']['error'] == "no Keras checkpoint to fine-tune"
+    assert by_key['MSFT']['status'] == 'ok'
+    assert [call.args[0] for call in fine_tune.call_args_list] == ['AAPL']
+    assert 'AAPL' not in [call.kwargs['registry_key'] for call in train.call_args_list]
+
+def test_limit_threads_caps_tensorflow():
+    pytest.importorskip("tensorflow")
+    code = ("from scripts.train_universe import limit_threads; limit_threads(2); import tensorflow as tf; "
+            "print(tf.config.threading.get_intra_op_parallelism_threads(), tf.config.threading.get_inter_op_parallelism_threads())")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, timeout=300)
+    assert output.stdout.split()[-2:] == ['2', '1']